@@ -9,6 +9,7 @@ from sqlalchemy import engine_from_config, pool
 
 from app.core.config import settings
 from app.db.base import Base
+from app.db.ddl import is_raw_ddl_object
 
 config = context.config
 
@@ -24,6 +25,13 @@ if sqlalchemy_url:
 target_metadata = Base.metadata
 
 
+def include_object(object_, name, type_, reflected, compare_to):
+    # Full-text search objects and the PostgreSQL title pattern index are
+    # created by raw DDL (app/db/ddl.py) and have no metadata counterpart;
+    # do not offer to drop them.
+    return not (reflected and compare_to is None and is_raw_ddl_object(name, type_))
+
+
 def run_migrations_offline() -> None:
     url = config.get_main_option("sqlalchemy.url")
     context.configure(
@@ -32,6 +40,7 @@ def run_migrations_offline() -> None:
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
         compare_type=True,
+        include_object=include_object,
     )
 
     with context.begin_transaction():
@@ -50,6 +59,7 @@ def run_migrations_online() -> None:
             connection=connection,
             target_metadata=target_metadata,
             compare_type=True,
+            include_object=include_object,
         )
 
         with context.begin_transaction():
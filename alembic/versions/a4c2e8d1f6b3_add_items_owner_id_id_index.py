@@ -0,0 +1,41 @@
+"""add items owner_id id index
+
+Revision ID: a4c2e8d1f6b3
+Revises: 5b0c9e3f1a2d
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+
+from __future__ import annotations
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = "a4c2e8d1f6b3"
+down_revision = "5b0c9e3f1a2d"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name == "postgresql":
+        # Build without blocking writes to a large items table.
+        with op.get_context().autocommit_block():
+            op.create_index(
+                "ix_items_owner_id_id",
+                "items",
+                ["owner_id", "id"],
+                unique=False,
+                postgresql_concurrently=True,
+            )
+    else:
+        op.create_index("ix_items_owner_id_id", "items", ["owner_id", "id"], unique=False)
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == "postgresql":
+        with op.get_context().autocommit_block():
+            op.drop_index("ix_items_owner_id_id", table_name="items", postgresql_concurrently=True)
+    else:
+        op.drop_index("ix_items_owner_id_id", table_name="items")
@@ -0,0 +1,36 @@
+"""add items title pattern index
+
+Revision ID: a9c1e3f5b7d0
+Revises: d5e7f9a1b3c4
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+
+from __future__ import annotations
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = "a9c1e3f5b7d0"
+down_revision = "d5e7f9a1b3c4"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # PostgreSQL only: lets title_prefix (LIKE 'prefix%') seek under any
+    # collation. SQLite serves the prefix from ix_items_owner_id_title_id.
+    if op.get_bind().dialect.name == "postgresql":
+        # Build without blocking writes to a large items table.
+        with op.get_context().autocommit_block():
+            op.execute(
+                "CREATE INDEX CONCURRENTLY ix_items_owner_id_title_pattern "
+                "ON items (owner_id, title text_pattern_ops)"
+            )
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == "postgresql":
+        with op.get_context().autocommit_block():
+            op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_items_owner_id_title_pattern")
@@ -0,0 +1,45 @@
+"""add item sort indexes
+
+Revision ID: b8d2f4a6c0e1
+Revises: f3a1c5e7b9d2
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+
+from __future__ import annotations
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = "b8d2f4a6c0e1"
+down_revision = "f3a1c5e7b9d2"
+branch_labels = None
+depends_on = None
+
+INDEXES = {
+    "ix_items_owner_id_created_at_id": ["owner_id", "created_at", "id"],
+    "ix_items_owner_id_updated_at_id": ["owner_id", "updated_at", "id"],
+    "ix_items_owner_id_title_id": ["owner_id", "title", "id"],
+}
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name == "postgresql":
+        # Build without blocking writes to a large items table.
+        with op.get_context().autocommit_block():
+            for name, columns in INDEXES.items():
+                op.create_index(name, "items", columns, unique=False, postgresql_concurrently=True)
+    else:
+        for name, columns in INDEXES.items():
+            op.create_index(name, "items", columns, unique=False)
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == "postgresql":
+        with op.get_context().autocommit_block():
+            for name in INDEXES:
+                op.drop_index(name, table_name="items", postgresql_concurrently=True)
+    else:
+        for name in INDEXES:
+            op.drop_index(name, table_name="items")
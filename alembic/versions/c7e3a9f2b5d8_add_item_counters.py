@@ -0,0 +1,108 @@
+"""add item counters
+
+Revision ID: c7e3a9f2b5d8
+Revises: a4c2e8d1f6b3
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "c7e3a9f2b5d8"
+down_revision = "a4c2e8d1f6b3"
+branch_labels = None
+depends_on = None
+
+SQLITE_TRIGGERS = [
+    """
+    CREATE TRIGGER items_count_insert AFTER INSERT ON items
+    BEGIN
+        INSERT INTO item_counters (owner_id, item_count) VALUES (NEW.owner_id, 1)
+        ON CONFLICT (owner_id) DO UPDATE SET item_count = item_count + 1;
+    END
+    """,
+    """
+    CREATE TRIGGER items_count_delete AFTER DELETE ON items
+    BEGIN
+        UPDATE item_counters SET item_count = item_count - 1 WHERE owner_id = OLD.owner_id;
+    END
+    """,
+]
+
+POSTGRESQL_TRIGGERS = [
+    """
+    CREATE FUNCTION item_counters_after_insert() RETURNS trigger
+    LANGUAGE plpgsql AS $$
+    BEGIN
+        INSERT INTO item_counters (owner_id, item_count)
+        SELECT owner_id, count(*) FROM inserted_items GROUP BY owner_id ORDER BY owner_id
+        ON CONFLICT (owner_id)
+        DO UPDATE SET item_count = item_counters.item_count + EXCLUDED.item_count;
+        RETURN NULL;
+    END
+    $$
+    """,
+    """
+    CREATE FUNCTION item_counters_after_delete() RETURNS trigger
+    LANGUAGE plpgsql AS $$
+    BEGIN
+        UPDATE item_counters AS counters
+        SET item_count = counters.item_count - removed.item_count
+        FROM (
+            SELECT owner_id, count(*) AS item_count FROM deleted_items GROUP BY owner_id
+        ) AS removed
+        WHERE counters.owner_id = removed.owner_id;
+        RETURN NULL;
+    END
+    $$
+    """,
+    """
+    CREATE TRIGGER items_count_insert AFTER INSERT ON items
+    REFERENCING NEW TABLE AS inserted_items
+    FOR EACH STATEMENT EXECUTE FUNCTION item_counters_after_insert()
+    """,
+    """
+    CREATE TRIGGER items_count_delete AFTER DELETE ON items
+    REFERENCING OLD TABLE AS deleted_items
+    FOR EACH STATEMENT EXECUTE FUNCTION item_counters_after_delete()
+    """,
+]
+
+
+def upgrade() -> None:
+    op.create_table(
+        "item_counters",
+        sa.Column("owner_id", sa.Integer(), nullable=False),
+        sa.Column("item_count", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(["owner_id"], ["users.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("owner_id"),
+    )
+    dialect = op.get_bind().dialect.name
+    if dialect == "postgresql":
+        # Block writers so no insert/delete slips between backfill and triggers.
+        op.execute("LOCK TABLE items IN SHARE ROW EXCLUSIVE MODE")
+    for statement in {"sqlite": SQLITE_TRIGGERS, "postgresql": POSTGRESQL_TRIGGERS}.get(
+        dialect, []
+    ):
+        op.execute(statement)
+    op.execute(
+        "INSERT INTO item_counters (owner_id, item_count) "
+        "SELECT owner_id, count(*) FROM items GROUP BY owner_id"
+    )
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == "postgresql":
+        op.execute("DROP TRIGGER IF EXISTS items_count_insert ON items")
+        op.execute("DROP TRIGGER IF EXISTS items_count_delete ON items")
+        op.execute("DROP FUNCTION IF EXISTS item_counters_after_insert()")
+        op.execute("DROP FUNCTION IF EXISTS item_counters_after_delete()")
+    else:
+        op.execute("DROP TRIGGER IF EXISTS items_count_insert")
+        op.execute("DROP TRIGGER IF EXISTS items_count_delete")
+    op.drop_table("item_counters")
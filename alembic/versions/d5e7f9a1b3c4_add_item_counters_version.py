@@ -0,0 +1,169 @@
+"""add item counters version
+
+Revision ID: d5e7f9a1b3c4
+Revises: b8d2f4a6c0e1
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "d5e7f9a1b3c4"
+down_revision = "b8d2f4a6c0e1"
+branch_labels = None
+depends_on = None
+
+SQLITE_TRIGGERS = [
+    """
+    CREATE TRIGGER items_count_insert AFTER INSERT ON items
+    BEGIN
+        INSERT INTO item_counters (owner_id, item_count, version) VALUES (NEW.owner_id, 1, 1)
+        ON CONFLICT (owner_id)
+        DO UPDATE SET item_count = item_count + 1, version = version + 1;
+    END
+    """,
+    """
+    CREATE TRIGGER items_count_delete AFTER DELETE ON items
+    BEGIN
+        UPDATE item_counters SET item_count = item_count - 1, version = version + 1
+        WHERE owner_id = OLD.owner_id;
+    END
+    """,
+    """
+    CREATE TRIGGER items_version_update AFTER UPDATE ON items
+    BEGIN
+        UPDATE item_counters SET version = version + 1 WHERE owner_id = NEW.owner_id;
+    END
+    """,
+]
+
+SQLITE_PREVIOUS_TRIGGERS = [
+    """
+    CREATE TRIGGER items_count_insert AFTER INSERT ON items
+    BEGIN
+        INSERT INTO item_counters (owner_id, item_count) VALUES (NEW.owner_id, 1)
+        ON CONFLICT (owner_id) DO UPDATE SET item_count = item_count + 1;
+    END
+    """,
+    """
+    CREATE TRIGGER items_count_delete AFTER DELETE ON items
+    BEGIN
+        UPDATE item_counters SET item_count = item_count - 1 WHERE owner_id = OLD.owner_id;
+    END
+    """,
+]
+
+POSTGRESQL_FUNCTIONS = [
+    """
+    CREATE OR REPLACE FUNCTION item_counters_after_insert() RETURNS trigger
+    LANGUAGE plpgsql AS $$
+    BEGIN
+        INSERT INTO item_counters (owner_id, item_count, version)
+        SELECT owner_id, count(*), 1 FROM inserted_items GROUP BY owner_id ORDER BY owner_id
+        ON CONFLICT (owner_id)
+        DO UPDATE SET item_count = item_counters.item_count + EXCLUDED.item_count,
+            version = item_counters.version + 1;
+        RETURN NULL;
+    END
+    $$
+    """,
+    """
+    CREATE OR REPLACE FUNCTION item_counters_after_delete() RETURNS trigger
+    LANGUAGE plpgsql AS $$
+    BEGIN
+        UPDATE item_counters AS counters
+        SET item_count = counters.item_count - removed.item_count,
+            version = counters.version + 1
+        FROM (
+            SELECT owner_id, count(*) AS item_count FROM deleted_items GROUP BY owner_id
+        ) AS removed
+        WHERE counters.owner_id = removed.owner_id;
+        RETURN NULL;
+    END
+    $$
+    """,
+    """
+    CREATE OR REPLACE FUNCTION item_counters_after_update() RETURNS trigger
+    LANGUAGE plpgsql AS $$
+    BEGIN
+        UPDATE item_counters AS counters
+        SET version = counters.version + 1
+        FROM (SELECT DISTINCT owner_id FROM updated_items ORDER BY owner_id) AS changed
+        WHERE counters.owner_id = changed.owner_id;
+        RETURN NULL;
+    END
+    $$
+    """,
+    """
+    CREATE TRIGGER items_version_update AFTER UPDATE ON items
+    REFERENCING NEW TABLE AS updated_items
+    FOR EACH STATEMENT EXECUTE FUNCTION item_counters_after_update()
+    """,
+]
+
+POSTGRESQL_PREVIOUS_FUNCTIONS = [
+    """
+    CREATE OR REPLACE FUNCTION item_counters_after_insert() RETURNS trigger
+    LANGUAGE plpgsql AS $$
+    BEGIN
+        INSERT INTO item_counters (owner_id, item_count)
+        SELECT owner_id, count(*) FROM inserted_items GROUP BY owner_id ORDER BY owner_id
+        ON CONFLICT (owner_id)
+        DO UPDATE SET item_count = item_counters.item_count + EXCLUDED.item_count;
+        RETURN NULL;
+    END
+    $$
+    """,
+    """
+    CREATE OR REPLACE FUNCTION item_counters_after_delete() RETURNS trigger
+    LANGUAGE plpgsql AS $$
+    BEGIN
+        UPDATE item_counters AS counters
+        SET item_count = counters.item_count - removed.item_count
+        FROM (
+            SELECT owner_id, count(*) AS item_count FROM deleted_items GROUP BY owner_id
+        ) AS removed
+        WHERE counters.owner_id = removed.owner_id;
+        RETURN NULL;
+    END
+    $$
+    """,
+]
+
+
+def upgrade() -> None:
+    op.add_column(
+        "item_counters",
+        sa.Column("version", sa.BigInteger(), server_default="0", nullable=False),
+    )
+    dialect = op.get_bind().dialect.name
+    if dialect == "postgresql":
+        # Functions are replaced in place; the insert/delete triggers keep
+        # pointing at them.
+        for statement in POSTGRESQL_FUNCTIONS:
+            op.execute(statement)
+    elif dialect == "sqlite":
+        op.execute("DROP TRIGGER IF EXISTS items_count_insert")
+        op.execute("DROP TRIGGER IF EXISTS items_count_delete")
+        for statement in SQLITE_TRIGGERS:
+            op.execute(statement)
+
+
+def downgrade() -> None:
+    dialect = op.get_bind().dialect.name
+    if dialect == "postgresql":
+        op.execute("DROP TRIGGER IF EXISTS items_version_update ON items")
+        op.execute("DROP FUNCTION IF EXISTS item_counters_after_update()")
+        for statement in POSTGRESQL_PREVIOUS_FUNCTIONS:
+            op.execute(statement)
+    elif dialect == "sqlite":
+        for trigger in ("items_count_insert", "items_count_delete", "items_version_update"):
+            op.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+        for statement in SQLITE_PREVIOUS_TRIGGERS:
+            op.execute(statement)
+    op.drop_column("item_counters", "version")
@@ -0,0 +1,39 @@
+"""add users email lower index
+
+Revision ID: e2b6d4a8c1f7
+Revises: c7e3a9f2b5d8
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "e2b6d4a8c1f7"
+down_revision = "c7e3a9f2b5d8"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name == "postgresql":
+        # Build without blocking signups on a large users table.
+        with op.get_context().autocommit_block():
+            op.execute(
+                "CREATE INDEX CONCURRENTLY ix_users_email_lower "
+                "ON users (lower(email) text_pattern_ops)"
+            )
+    else:
+        op.create_index("ix_users_email_lower", "users", [sa.text("lower(email)")], unique=False)
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == "postgresql":
+        with op.get_context().autocommit_block():
+            op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_users_email_lower")
+    else:
+        op.drop_index("ix_users_email_lower", table_name="users")
@@ -0,0 +1,88 @@
+"""add item full-text search
+
+Revision ID: f3a1c5e7b9d2
+Revises: e2b6d4a8c1f7
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+
+from __future__ import annotations
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = "f3a1c5e7b9d2"
+down_revision = "e2b6d4a8c1f7"
+branch_labels = None
+depends_on = None
+
+SQLITE_SEARCH = [
+    """
+    CREATE VIRTUAL TABLE items_fts USING fts5(
+        title, description, content='items', content_rowid='id',
+        tokenize='porter unicode61'
+    )
+    """,
+    """
+    CREATE TRIGGER items_fts_insert AFTER INSERT ON items
+    BEGIN
+        INSERT INTO items_fts (rowid, title, description)
+        VALUES (NEW.id, NEW.title, NEW.description);
+    END
+    """,
+    """
+    CREATE TRIGGER items_fts_delete AFTER DELETE ON items
+    BEGIN
+        INSERT INTO items_fts (items_fts, rowid, title, description)
+        VALUES ('delete', OLD.id, OLD.title, OLD.description);
+    END
+    """,
+    """
+    CREATE TRIGGER items_fts_update AFTER UPDATE OF title, description ON items
+    BEGIN
+        INSERT INTO items_fts (items_fts, rowid, title, description)
+        VALUES ('delete', OLD.id, OLD.title, OLD.description);
+        INSERT INTO items_fts (rowid, title, description)
+        VALUES (NEW.id, NEW.title, NEW.description);
+    END
+    """,
+    # Index the rows that already exist.
+    "INSERT INTO items_fts (items_fts) VALUES ('rebuild')",
+]
+
+
+def upgrade() -> None:
+    dialect = op.get_bind().dialect.name
+    if dialect == "postgresql":
+        # Adding a stored generated column rewrites items once; the GIN index
+        # is then built without blocking writes.
+        op.execute(
+            """
+            ALTER TABLE items ADD COLUMN search_vector tsvector
+            GENERATED ALWAYS AS (
+                setweight(to_tsvector('english', coalesce(title, '')), 'A')
+                || setweight(to_tsvector('english', coalesce(description, '')), 'B')
+            ) STORED
+            """
+        )
+        with op.get_context().autocommit_block():
+            op.execute(
+                "CREATE INDEX CONCURRENTLY ix_items_search_vector "
+                "ON items USING gin (search_vector)"
+            )
+    elif dialect == "sqlite":
+        for statement in SQLITE_SEARCH:
+            op.execute(statement)
+
+
+def downgrade() -> None:
+    dialect = op.get_bind().dialect.name
+    if dialect == "postgresql":
+        with op.get_context().autocommit_block():
+            op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_items_search_vector")
+        op.execute("ALTER TABLE items DROP COLUMN IF EXISTS search_vector")
+    elif dialect == "sqlite":
+        for trigger in ("items_fts_insert", "items_fts_delete", "items_fts_update"):
+            op.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+        op.execute("DROP TABLE IF EXISTS items_fts")
@@ -1,17 +1,25 @@
 # Shared FastAPI dependencies for database sessions and auth.
 
-from collections.abc import AsyncGenerator
+from collections.abc import AsyncGenerator, AsyncIterator
+from contextlib import asynccontextmanager
+from typing import Any
 
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordBearer
-from jose import JWTError, jwt
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.admission import AdmissionRejected, auth_admission
 from app.core.config import settings
-from app.core.security import ALGORITHM
-from app.db.models import User
+from app.core.jwt_codec import InvalidTokenError, access_token_codec
+from app.core.rate_limit import get_rate_limit_key
+from app.core.security import SESSION_EPOCH_CLAIM
+from app.core.token_cache import verified_token_cache
+from app.db.replicas import PRINCIPAL_ID_KEY, replica_router
 from app.db.session import SessionLocal
-from app.schemas.auth import TokenPayload
+from app.schemas.auth import Principal, TokenPayload
+from app.services.item_cache import item_cache
+from app.services.principal_cache import principal_cache
+from app.services.session_epoch_service import get_session_epoch
 from app.services.user_service import get_user_by_id
 
 
@@ -31,43 +39,130 @@ async def get_db() -> AsyncGenerator[AsyncSession, None]:
         await db.close()
 
 
+@asynccontextmanager
+async def cpu_heavy_admission(request: Request) -> AsyncIterator[None]:
+    # Hold an auth admission slot around the bcrypt-heavy part of a request.
+    #
+    # Entered inside the handler, after the rate limit and cheap validation,
+    # so requests that are about to be rejected never take a queue slot.
+    # Clients are keyed like the rate limiter (peer IP, or X-Forwarded-For
+    # from trusted proxies) for fair queueing. Overload fails fast with 503.
+    try:
+        await auth_admission.acquire(get_rate_limit_key(request))
+    except AdmissionRejected:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Server is busy, retry later",
+            headers={"Retry-After": str(settings.AUTH_ADMISSION_RETRY_AFTER_SECONDS)},
+        )
+    try:
+        yield
+    finally:
+        auth_admission.release()
+
+
+def _principal_from_claims(user_id: int, payload: dict[str, Any]) -> Principal | None:
+    email = payload.get("email")
+    is_active = payload.get("is_active")
+    is_admin = payload.get("is_admin")
+    if not isinstance(email, str) or not isinstance(is_active, bool):
+        return None
+    if not isinstance(is_admin, bool):
+        return None
+    return Principal(id=user_id, email=email, is_active=is_active, is_admin=is_admin)
+
+
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl=f"{settings.API_V1_STR}/auth/login")
 
 
 async def get_current_user(
     db: AsyncSession = Depends(get_db),
     token: str = Depends(oauth2_scheme),
-) -> User:
-    # Decode the JWT and load the current user or fail with 401.
+) -> Principal:
+    # Decode the JWT and resolve the current user or fail with 401.
+    #
+    # The user snapshot comes from the principal cache when possible; a miss
+    # falls back to the users table, so deleted users are still rejected.
+    # Inactive users are rejected on every path.
+    # Lookups stay on the primary: a lagging replica must not revive a
+    # deactivated or deleted user.
+    # Stateless tokens (ACCESS_TOKEN_STATELESS) carry the snapshot as claims.
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
     )
     try:
-        payload = jwt.decode(
-            token,
-            settings.SECRET_KEY,
-            algorithms=[ALGORITHM],
-            audience=settings.JWT_AUDIENCE,
-            issuer=settings.JWT_ISSUER,
-            options={
-                "require_exp": True,
-                "require_iat": True,
-                "require_sub": True,
-                "leeway": settings.CLOCK_SKEW_SECONDS,
-            },
-        )
+        payload = verified_token_cache.get(token)
+        if payload is None:
+            payload = access_token_codec.decode(token)
+            verified_token_cache.put(token, payload)
         subject = payload.get("sub")
         if not isinstance(subject, str):
             raise credentials_exception
         token_data = TokenPayload(sub=subject)
-    except JWTError:
+    except InvalidTokenError:
         raise credentials_exception
     try:
         user_id = int(token_data.sub)
     except (TypeError, ValueError):
         raise credentials_exception
-    user = await get_user_by_id(db, user_id)
-    if user is None:
+    # Writes committed on this session pin the user to the primary (replicas).
+    db.info[PRINCIPAL_ID_KEY] = user_id
+    token_epoch = payload.get(SESSION_EPOCH_CLAIM)
+    if settings.ACCESS_TOKEN_STATELESS and isinstance(token_epoch, int):
+        # Stateless token: authorize from claims; only the epoch is looked up.
+        principal = _principal_from_claims(user_id, payload)
+        if principal is None:
+            raise credentials_exception
+        # No epoch row means the user was deleted.
+        epoch = await get_session_epoch(db, user_id)
+        if epoch is None or token_epoch < epoch:
+            raise credentials_exception
+    else:
+        principal = await principal_cache.get(user_id)
+        if principal is None:
+            user = await get_user_by_id(db, user_id)
+            if user is None:
+                raise credentials_exception
+            principal = Principal.model_validate(user)
+            await principal_cache.set(principal)
+    # Deactivated users keep their rows (and cached snapshots) but not access.
+    if not principal.is_active:
         raise credentials_exception
-    return user
+    return principal
+
+
+async def get_read_db(
+    current_user: Principal = Depends(get_current_user),
+) -> AsyncGenerator[AsyncSession, None]:
+    # Session for read-only routes: a healthy replica when configured, or the
+    # primary when none is available or the user wrote recently.
+    db = await replica_router.read_session(current_user.id)
+    try:
+        yield db
+    except Exception:
+        await db.rollback()
+        raise
+    finally:
+        await db.close()
+
+
+async def get_item_read_db(
+    current_user: Principal = Depends(get_current_user),
+) -> AsyncGenerator[AsyncSession, None]:
+    # Session for item reads that may fill the item response cache. A cached
+    # page is shared by every worker for CACHE_TTL_SECONDS, so one read from a
+    # lagging replica would outlive the lag; misses read the primary instead.
+    # Sessions connect lazily, so cache hits still touch no database.
+    db: AsyncSession
+    if item_cache.enabled:
+        db = SessionLocal()
+    else:
+        db = await replica_router.read_session(current_user.id)
+    try:
+        yield db
+    except Exception:
+        await db.rollback()
+        raise
+    finally:
+        await db.close()
@@ -0,0 +1,90 @@
+# ETags and conditional request handling (If-None-Match, If-Match).
+#
+# All ETags are strong. An item's is built from its id and updated_at, so it
+# can be checked against a one-column lookup, and an If-Match value can be
+# turned back into an updated_at and enforced in a write's WHERE clause.
+# Item lists use the owner's item_counters.version plus the query string;
+# the profile hashes the principal snapshot, which needs no database access.
+
+from datetime import datetime, timedelta, timezone
+import hashlib
+
+from fastapi import Response, status
+
+from app.schemas.auth import Principal
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_MICROSECOND = timedelta(microseconds=1)
+# Validators are private to the user; clients must revalidate before reuse.
+CACHE_CONTROL = "private, no-cache"
+
+
+def _quoted(value: str) -> str:
+    return f'"{value}"'
+
+
+def _digest(*parts: object) -> str:
+    raw = "\x1f".join(str(part) for part in parts).encode("utf-8")
+    return hashlib.blake2b(raw, digest_size=12).hexdigest()
+
+
+def _as_utc(value: datetime) -> datetime:
+    # SQLite returns naive UTC timestamps.
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value
+
+
+def item_etag(item_id: int, updated_at: datetime) -> str:
+    return _quoted(f"{item_id}-{(_as_utc(updated_at) - _EPOCH) // _MICROSECOND}")
+
+
+def item_list_etag(owner_id: int, version: int, query: str) -> str:
+    return _quoted(f"l-{_digest(owner_id, version, query)}")
+
+
+def principal_etag(principal: Principal) -> str:
+    return _quoted(
+        f"u-{_digest(principal.id, principal.email, principal.is_active, principal.is_admin)}"
+    )
+
+
+def _entity_tags(header: str) -> list[str]:
+    return [tag.strip() for tag in header.split(",") if tag.strip()]
+
+
+def none_match(if_none_match: str | None, etag: str) -> bool:
+    # True when If-None-Match names the current representation (weak
+    # comparison, so W/ tags from intermediaries still count).
+    if if_none_match is None:
+        return False
+    for tag in _entity_tags(if_none_match):
+        if tag == "*" or tag.removeprefix("W/") == etag:
+            return True
+    return False
+
+
+def if_match_versions(if_match: str, item_id: int) -> list[datetime] | None:
+    # The updated_at values an If-Match header accepts for an item; None
+    # means "*" (any current version). Weak and foreign tags never match,
+    # so an empty list fails the precondition.
+    versions = []
+    for tag in _entity_tags(if_match):
+        if tag == "*":
+            return None
+        if not (tag.startswith('"') and tag.endswith('"')):
+            continue
+        tag_id, _, micros = tag[1:-1].partition("-")
+        if tag_id == str(item_id) and micros.isdigit():
+            versions.append(_EPOCH + int(micros) * _MICROSECOND)
+    return versions
+
+
+def set_validators(response: Response, etag: str) -> None:
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = CACHE_CONTROL
+
+
+def not_modified(etag: str) -> Response:
+    return Response(
+        status_code=status.HTTP_304_NOT_MODIFIED,
+        headers={"ETag": etag, "Cache-Control": CACHE_CONTROL},
+    )
@@ -3,7 +3,7 @@
 from fastapi import APIRouter, Depends, HTTPException, Request, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.api.deps import get_db
+from app.api.deps import cpu_heavy_admission, get_db
 from app.core.config import settings
 from app.schemas.auth import LoginRequest, RefreshRequest, Token
 from app.services.auth_service import (
@@ -25,7 +25,8 @@ async def login(
     data: LoginRequest,
     db: AsyncSession = Depends(get_db),
 ) -> Token:
-    user = await authenticate_user(db, data.email, data.password)
+    async with cpu_heavy_admission(request):
+        user = await authenticate_user(db, data.email, data.password)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
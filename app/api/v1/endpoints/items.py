@@ -1,86 +1,433 @@
 # Item CRUD endpoints scoped to the current user.
 
+from collections.abc import AsyncIterator
+from datetime import datetime
 from typing import Annotated
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
-from sqlalchemy import func, select
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.api.deps import get_current_user, get_db
-from app.db.models import Item, User
-from app.schemas.item import ItemCreate, ItemListResponse, ItemOut, ItemUpdate
+from app.api.deps import get_current_user, get_db, get_item_read_db, get_read_db
+from app.api.etag import (
+    if_match_versions,
+    item_etag,
+    item_list_etag,
+    none_match,
+    not_modified,
+    set_validators,
+)
+from app.core.config import settings
+from app.core.metrics import ITEM_EXPORTS_ABORTED, ITEMS_EXPORTED
+from app.db.models import Item
+from app.db.replicas import replica_router
+from app.schemas.auth import Principal
+from app.schemas.item import (
+    ItemBulkCreate,
+    ItemBulkDelete,
+    ItemBulkResponse,
+    ItemBulkResult,
+    ItemBulkUpdate,
+    ItemCreate,
+    ItemImportResponse,
+    ItemListResponse,
+    ItemOut,
+    ItemSearchResponse,
+    ItemUpdate,
+)
+from app.services import item_import, item_service
+from app.services.item_cache import CachedResponse, item_cache
+from app.services.item_export import (
+    EXPORT_MEDIA_TYPES,
+    ExportFormat,
+    csv_header,
+    iter_item_export,
+)
+from app.services.item_service import (
+    ItemSort,
+    TotalKind,
+    decode_item_cursor,
+    encode_item_cursor,
+    fetch_item_page,
+    item_filters,
+    item_page_statement,
+)
+from app.utils.pagination import InvalidCursorError
 
 router = APIRouter()
 
 
+def _replay(cached: CachedResponse, if_none_match: str | None) -> Response:
+    # Serve a cached (or just cached) body as-is, or 304 if the client has it.
+    if cached.etag is not None and none_match(if_none_match, cached.etag):
+        return not_modified(cached.etag)
+    response = Response(cached.body, media_type="application/json")
+    if cached.etag is not None:
+        set_validators(response, cached.etag)
+    return response
+
+
 @router.post("/", response_model=ItemOut, status_code=status.HTTP_201_CREATED)
 async def create_item(
     data: ItemCreate,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
 ) -> Item:
-    item = Item(
-        title=data.title,
-        description=data.description,
-        owner_id=current_user.id,
-    )
-    db.add(item)
+    item = await item_service.create_item(db, current_user.id, data)
     await db.commit()
-    await db.refresh(item)
+    await item_cache.invalidate(current_user.id)
     return item
 
 
 @router.get("/", response_model=ItemListResponse)
 async def read_items(
+    response: Response,
     skip: Annotated[int, Query(ge=0, description="Number of items to skip")] = 0,
     limit: Annotated[int, Query(ge=1, le=100, description="Max items to return")] = 50,
-    db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user),
-) -> ItemListResponse:
-    # List items for the current user with pagination.
-    total_result = await db.execute(
-        select(func.count()).select_from(Item).where(Item.owner_id == current_user.id)
+    db: AsyncSession = Depends(get_item_read_db),
+    current_user: Principal = Depends(get_current_user),
+    after: Annotated[
+        str | None, Query(description="Cursor: return items after this position")
+    ] = None,
+    before: Annotated[
+        str | None, Query(description="Cursor: return items before this position")
+    ] = None,
+    include_total: Annotated[
+        bool | None,
+        Query(description="Return the item count (default: only for unfiltered skip pages)"),
+    ] = None,
+    total_mode: Annotated[
+        TotalKind | None,
+        Query(description="How to compute the total (default: ITEMS_TOTAL_MODE)"),
+    ] = None,
+    sort: Annotated[
+        ItemSort, Query(description="Sort column; prefix with - for descending")
+    ] = "id",
+    created_after: Annotated[
+        datetime | None, Query(description="Only items created after this time")
+    ] = None,
+    updated_after: Annotated[
+        datetime | None, Query(description="Only items updated after this time")
+    ] = None,
+    title_prefix: Annotated[
+        str | None,
+        Query(min_length=1, max_length=255, description="Only titles starting with this"),
+    ] = None,
+    if_none_match: Annotated[str | None, Header()] = None,
+) -> ItemListResponse | Response:
+    # List items for the current user in the requested order (id by default).
+    #
+    # With after/before the page is found by keyset on (owner_id, sort
+    # column, id), so deep pages cost the same as the first one; skip
+    # (OFFSET) is kept for existing clients and also returns cursors to
+    # switch over. Cursors are tied to the sort they were issued for.
+    if after is not None and before is not None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Use either after or before, not both",
+        )
+    if (after is not None or before is not None) and skip:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="skip cannot be combined with a cursor",
+        )
+    try:
+        after_position = decode_item_cursor(after, sort) if after is not None else None
+        before_position = decode_item_cursor(before, sort) if before is not None else None
+    except InvalidCursorError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+    filters = item_filters(
+        db.get_bind().dialect.name,
+        created_after=created_after,
+        updated_after=updated_after,
+        title_prefix=title_prefix,
     )
-    total = int(total_result.scalar_one())
-    items_result = await db.execute(
-        select(Item).where(Item.owner_id == current_user.id).offset(skip).limit(limit)
+    if include_total is None:
+        include_total = after_position is None and before_position is None and not filters
+    total_kind = (total_mode or settings.ITEMS_TOTAL_MODE) if include_total else None
+    page_key = (skip, limit, after, before, total_kind, sort)
+    query_key = repr((page_key, (created_after, updated_after, title_prefix)))
+
+    # A cache hit needs no database access at all.
+    generation = await item_cache.generation(current_user.id)
+    if generation is not None:
+        cached = await item_cache.get(current_user.id, generation, "list", query_key)
+        if cached is not None:
+            return _replay(cached, if_none_match)
+
+    # Conditional GET: the owner's list version is one primary-key lookup,
+    # checked before the page is queried. Planner estimates drift without
+    # writes, so pages carrying one get no validator.
+    etag = None
+    if total_kind != "estimated":
+        version = await item_service.item_list_version(db, current_user.id)
+        etag = item_list_etag(current_user.id, version, query_key)
+        if none_match(if_none_match, etag):
+            return not_modified(etag)
+
+    # One extra row tells whether another page follows.
+    statement = item_page_statement(
+        current_user.id, sort, filters, after=after_position, before=before_position
     )
-    items = list(items_result.scalars().all())
+    if after_position is None and before_position is None:
+        statement = statement.offset(skip)
+    items, total, total_kind = await fetch_item_page(
+        db, statement.limit(limit + 1), current_user.id, total_kind, filters
+    )
+    has_more = len(items) > limit
+    items = items[:limit]
+    if before_position is not None:
+        # Walked backwards from the cursor; restore the requested order.
+        items.reverse()
+        has_previous, has_next = has_more, True
+    else:
+        has_previous, has_next = after_position is not None or skip > 0, has_more
     # Convert ORM models to Pydantic schemas for type safety
     item_schemas = [ItemOut.model_validate(item) for item in items]
-    return ItemListResponse(items=item_schemas, total=total, skip=skip, limit=limit)
+    page = ItemListResponse(
+        items=item_schemas,
+        total=total,
+        total_kind=total_kind,
+        skip=skip,
+        limit=limit,
+        next_cursor=encode_item_cursor(items[-1], sort) if items and has_next else None,
+        prev_cursor=encode_item_cursor(items[0], sort) if items and has_previous else None,
+    )
+    if generation is None:
+        if etag is not None:
+            set_validators(response, etag)
+        return page
+    cached = CachedResponse(etag, page.model_dump_json().encode("utf-8"))
+    await item_cache.set(current_user.id, generation, "list", query_key, cached)
+    return _replay(cached, None)
+
+
+@router.get("/search", response_model=ItemSearchResponse)
+async def search_items(
+    q: Annotated[str, Query(min_length=1, max_length=200, description="Search words")],
+    skip: Annotated[int, Query(ge=0, description="Number of hits to skip")] = 0,
+    limit: Annotated[int, Query(ge=1, le=100, description="Max hits to return")] = 50,
+    db: AsyncSession = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_user),
+) -> ItemSearchResponse:
+    # Full-text search over the current user's item titles and descriptions.
+    items = await item_service.search_items(db, current_user.id, q, skip=skip, limit=limit)
+    return ItemSearchResponse(
+        items=[ItemOut.model_validate(item) for item in items[:limit]],
+        skip=skip,
+        limit=limit,
+        has_more=len(items) > limit,
+    )
+
+
+async def _export_chunks(
+    request: Request, owner_id: int, export_format: ExportFormat
+) -> AsyncIterator[bytes]:
+    # The export outlives the request's dependencies, so it opens (and
+    # always closes) its own read session. A disconnect seen between chunks
+    # ends the stream and releases the cursor without reading further rows.
+    db = await replica_router.read_session(owner_id)
+    try:
+        if export_format == "csv":
+            yield csv_header()
+        batches = iter_item_export(db, owner_id, export_format, settings.ITEMS_EXPORT_BATCH_SIZE)
+        try:
+            async for chunk, rows in batches:
+                if await request.is_disconnected():
+                    ITEM_EXPORTS_ABORTED.inc()
+                    return
+                yield chunk
+                ITEMS_EXPORTED.labels(format=export_format).inc(rows)
+        finally:
+            await batches.aclose()
+    finally:
+        await db.close()
+
+
+@router.get(
+    "/export",
+    response_class=StreamingResponse,
+    responses={200: {"content": {media_type: {} for media_type in EXPORT_MEDIA_TYPES.values()}}},
+)
+async def export_items(
+    request: Request,
+    current_user: Principal = Depends(get_current_user),
+    export_format: Annotated[
+        ExportFormat, Query(alias="format", description="ndjson (default) or csv")
+    ] = "ndjson",
+) -> StreamingResponse:
+    # Stream every item of the current user in id order, chunked.
+    return StreamingResponse(
+        _export_chunks(request, current_user.id, export_format),
+        media_type=EXPORT_MEDIA_TYPES[export_format],
+        headers={"Content-Disposition": f'attachment; filename="items.{export_format}"'},
+    )
+
+
+@router.post(
+    "/import",
+    response_model=ItemImportResponse,
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {"application/x-ndjson": {"schema": {"type": "string"}}},
+        }
+    },
+)
+async def import_items(
+    request: Request,
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_user),
+) -> ItemImportResponse:
+    # Import an NDJSON upload, one ItemCreate object per line. The body is
+    # consumed as it arrives; bad lines are reported, not fatal.
+    return await item_import.import_items(db, current_user.id, request.stream())
+
+
+# Bulk routes are registered before /{item_id} so "bulk" is never parsed as an id.
+
+
+@router.post("/bulk", response_model=ItemBulkResponse, status_code=status.HTTP_201_CREATED)
+async def create_items(
+    data: ItemBulkCreate,
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_user),
+) -> ItemBulkResponse:
+    # All entries are created in one transaction, or none are.
+    items = await item_service.create_items(db, current_user.id, data.items)
+    await db.commit()
+    await item_cache.invalidate(current_user.id)
+    return ItemBulkResponse(
+        results=[
+            ItemBulkResult(
+                index=index,
+                id=item.id,
+                status=status.HTTP_201_CREATED,
+                item=ItemOut.model_validate(item),
+            )
+            for index, item in enumerate(items)
+        ]
+    )
+
+
+@router.patch("/bulk", response_model=ItemBulkResponse)
+async def update_items(
+    data: ItemBulkUpdate,
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_user),
+) -> ItemBulkResponse:
+    # Entries for missing or foreign items report 404; the rest are applied.
+    updated = await item_service.update_items(db, current_user.id, data.items)
+    await db.commit()
+    await item_cache.invalidate(current_user.id)
+    results = []
+    for index, entry in enumerate(data.items):
+        item = updated.get(entry.id)
+        if item is None:
+            results.append(
+                ItemBulkResult(index=index, id=entry.id, status=status.HTTP_404_NOT_FOUND)
+            )
+        else:
+            results.append(
+                ItemBulkResult(
+                    index=index,
+                    id=entry.id,
+                    status=status.HTTP_200_OK,
+                    item=ItemOut.model_validate(item),
+                )
+            )
+    return ItemBulkResponse(results=results)
+
+
+@router.delete("/bulk", response_model=ItemBulkResponse)
+async def delete_items(
+    data: ItemBulkDelete,
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_user),
+) -> ItemBulkResponse:
+    deleted = await item_service.delete_items(db, current_user.id, data.ids)
+    await db.commit()
+    await item_cache.invalidate(current_user.id)
+    return ItemBulkResponse(
+        results=[
+            ItemBulkResult(
+                index=index,
+                id=item_id,
+                status=status.HTTP_204_NO_CONTENT
+                if item_id in deleted
+                else status.HTTP_404_NOT_FOUND,
+            )
+            for index, item_id in enumerate(data.ids)
+        ]
+    )
 
 
 @router.get("/{item_id}", response_model=ItemOut)
 async def read_item(
     item_id: int,
-    db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user),
-) -> Item:
+    response: Response,
+    db: AsyncSession = Depends(get_item_read_db),
+    current_user: Principal = Depends(get_current_user),
+    if_none_match: Annotated[str | None, Header()] = None,
+) -> Item | Response:
+    generation = await item_cache.generation(current_user.id)
+    if generation is not None:
+        cached = await item_cache.get(current_user.id, generation, "item", str(item_id))
+        if cached is not None:
+            return _replay(cached, if_none_match)
+    if if_none_match is not None:
+        # Revalidation: compare against updated_at before loading the row.
+        updated_at = await item_service.item_updated_at(db, current_user.id, item_id)
+        if updated_at is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Item not found")
+        etag = item_etag(item_id, updated_at)
+        if none_match(if_none_match, etag):
+            return not_modified(etag)
     result = await db.execute(select(Item).where(Item.id == item_id))
     item = result.scalars().first()
     if not item or item.owner_id != current_user.id:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Item not found")
-    return item
+    etag = item_etag(item.id, item.updated_at)
+    if generation is None:
+        set_validators(response, etag)
+        return item
+    cached = CachedResponse(etag, ItemOut.model_validate(item).model_dump_json().encode("utf-8"))
+    await item_cache.set(current_user.id, generation, "item", str(item_id), cached)
+    return _replay(cached, None)
+
+
+async def _write_miss(
+    db: AsyncSession, owner_id: int, item_id: int, versions: list[datetime] | None
+) -> HTTPException:
+    # A conditional write matched nothing: 412 if the item is there but at
+    # another version, 404 otherwise.
+    if versions is not None and await item_service.item_updated_at(db, owner_id, item_id):
+        return HTTPException(
+            status_code=status.HTTP_412_PRECONDITION_FAILED,
+            detail="Item has been modified",
+        )
+    return HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Item not found")
 
 
 @router.put("/{item_id}", response_model=ItemOut)
 async def update_item(
     item_id: int,
     data: ItemUpdate,
+    response: Response,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
+    if_match: Annotated[str | None, Header()] = None,
 ) -> Item:
-    result = await db.execute(select(Item).where(Item.id == item_id))
-    item = result.scalars().first()
-    if not item or item.owner_id != current_user.id:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Item not found")
-    if data.title is not None:
-        item.title = data.title
-    if data.description is not None:
-        item.description = data.description
+    # With If-Match the update only applies to the version the client saw;
+    # the check is part of the UPDATE's WHERE clause, so it cannot race.
+    versions = if_match_versions(if_match, item_id) if if_match is not None else None
+    item = await item_service.update_item(db, current_user.id, item_id, data, versions)
+    if item is None:
+        raise await _write_miss(db, current_user.id, item_id, versions)
     await db.commit()
-    await db.refresh(item)
+    await item_cache.invalidate(current_user.id)
+    set_validators(response, item_etag(item.id, item.updated_at))
     return item
 
 
@@ -88,12 +435,12 @@ async def update_item(
 async def delete_item(
     item_id: int,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
+    if_match: Annotated[str | None, Header()] = None,
 ) -> None:
-    result = await db.execute(select(Item).where(Item.id == item_id))
-    item = result.scalars().first()
-    if not item or item.owner_id != current_user.id:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Item not found")
-    await db.delete(item)
+    versions = if_match_versions(if_match, item_id) if if_match is not None else None
+    if not await item_service.delete_item(db, current_user.id, item_id, versions):
+        raise await _write_miss(db, current_user.id, item_id, versions)
     await db.commit()
+    await item_cache.invalidate(current_user.id)
     return None
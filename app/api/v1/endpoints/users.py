@@ -1,59 +1,160 @@
 # User registration and profile endpoints.
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from typing import Annotated
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.api.deps import get_current_user, get_db
+from app.api.deps import cpu_heavy_admission, get_current_user, get_db, get_read_db
+from app.api.etag import none_match, not_modified, principal_etag, set_validators
 from app.db.models import User
-from app.schemas.user import UserCreate, UserOut, UserPasswordChange
+from app.schemas.auth import Principal
+from app.schemas.user import UserAdminUpdate, UserCreate, UserOut, UserPasswordChange
 from app.services.user_service import (
     change_user_password,
     create_user,
+    delete_user,
     get_user_by_email,
+    get_user_by_id,
     list_users,
+    set_user_active,
+    set_user_admin,
 )
+from app.utils.pagination import InvalidCursorError, decode_cursor, encode_cursor
 
 router = APIRouter()
 
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def _require_admin(principal: Principal) -> None:
+    if not principal.is_admin:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Insufficient permissions",
+        )
+
 
 @router.post("/", response_model=UserOut, status_code=status.HTTP_201_CREATED)
-async def register_user(data: UserCreate, db: AsyncSession = Depends(get_db)) -> User:
+async def register_user(
+    request: Request,
+    data: UserCreate,
+    db: AsyncSession = Depends(get_db),
+) -> User:
     if await get_user_by_email(db, data.email):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Email already registered",
         )
-    return await create_user(db, data)
+    async with cpu_heavy_admission(request):
+        return await create_user(db, data)
 
 
 @router.get("/", response_model=list[UserOut])
 async def read_users(
-    db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    response: Response,
+    db: AsyncSession = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_user),
+    limit: Annotated[int, Query(ge=1, le=100, description="Max users to return")] = 50,
+    after: Annotated[
+        str | None, Query(description="Cursor: return users after this position")
+    ] = None,
+    is_active: Annotated[bool | None, Query(description="Only active or inactive users")] = None,
+    is_admin: Annotated[bool | None, Query(description="Only admins or non-admins")] = None,
+    email_prefix: Annotated[
+        str | None,
+        Query(min_length=1, max_length=255, description="Case-insensitive email prefix"),
+    ] = None,
 ) -> list[User]:
-    if not current_user.is_admin:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Insufficient permissions",
-        )
-    return await list_users(db)
+    # Admin-only user listing, newest first, paged by keyset on id so each
+    # page costs the same and never loads the whole table. The body stays a
+    # plain array; the cursor for the next page is in X-Next-Cursor.
+    _require_admin(current_user)
+    try:
+        before_id = decode_cursor(after) if after is not None else None
+    except InvalidCursorError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+    users, has_more = await list_users(
+        db,
+        limit=limit,
+        before_id=before_id,
+        is_active=is_active,
+        is_admin=is_admin,
+        email_prefix=email_prefix,
+    )
+    if users and has_more:
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(users[-1].id)
+    return users
 
 
 @router.get("/me", response_model=UserOut)
-def read_me(current_user: User = Depends(get_current_user)) -> User:
+def read_me(
+    response: Response,
+    current_user: Principal = Depends(get_current_user),
+    if_none_match: Annotated[str | None, Header()] = None,
+) -> Principal | Response:
+    # The ETag hashes the principal snapshot, so revalidation needs no query.
+    etag = principal_etag(current_user)
+    if none_match(if_none_match, etag):
+        return not_modified(etag)
+    set_validators(response, etag)
     return current_user
 
 
 @router.post("/me/password", status_code=status.HTTP_204_NO_CONTENT)
 async def change_password(
+    request: Request,
     data: UserPasswordChange,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
 ) -> None:
-    changed = await change_user_password(db, current_user, data.current_password, data.new_password)
+    # The principal is a cached snapshot; password checks need the stored hash.
+    user = await get_user_by_id(db, current_user.id)
+    if user is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+        )
+    async with cpu_heavy_admission(request):
+        changed = await change_user_password(db, user, data.current_password, data.new_password)
     if not changed:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Current password is incorrect",
         )
     return None
+
+
+@router.patch("/{user_id}", response_model=UserOut)
+async def update_user(
+    user_id: int,
+    data: UserAdminUpdate,
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_user),
+) -> User:
+    # Admin-only. Each change bumps the user's session epoch and drops
+    # their cached principal, so it applies from their next request.
+    _require_admin(current_user)
+    user = await get_user_by_id(db, user_id)
+    if user is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
+    if data.is_active is not None and data.is_active != user.is_active:
+        user = await set_user_active(db, user, data.is_active)
+    if data.is_admin is not None and data.is_admin != user.is_admin:
+        user = await set_user_admin(db, user, data.is_admin)
+    return user
+
+
+@router.delete("/{user_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def remove_user(
+    user_id: int,
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_user),
+) -> None:
+    # Admin-only; deletes the user's items and refresh tokens too.
+    _require_admin(current_user)
+    user = await get_user_by_id(db, user_id)
+    if user is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
+    await delete_user(db, user)
+    return None
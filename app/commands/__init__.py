@@ -0,0 +1 @@
+# Command-line entry points for operational tasks (python -m app.commands.<name>).
@@ -0,0 +1,81 @@
+# Build the breached-password Bloom filter from a hash or password list.
+#
+# Usage: python -m app.commands.build_breached_password_filter INPUT OUTPUT
+#            [--false-positive-rate P] [--format sha1|plaintext] [--expected-items N]
+#
+# INPUT is a file (or "-" for stdin) with one entry per line. The sha1 format
+# accepts the Have I Been Pwned download ("<SHA1 HEX>:<count>"); plaintext
+# hashes each line. Point BREACHED_PASSWORD_FILTER_PATH at OUTPUT.
+
+import argparse
+from collections.abc import Iterator
+import sys
+from typing import TextIO
+
+from app.core.breached_passwords import build_filter_file, password_digest
+
+
+def _iter_digests(lines: TextIO, input_format: str) -> Iterator[bytes]:
+    for line in lines:
+        entry = line.rstrip("\r\n")
+        if input_format == "plaintext":
+            if entry:
+                yield password_digest(entry)
+            continue
+        hex_digest = entry.split(":", 1)[0].strip()
+        if not hex_digest:
+            continue
+        try:
+            digest = bytes.fromhex(hex_digest)
+        except ValueError:
+            raise SystemExit(f"Invalid SHA-1 hash: {hex_digest!r}")
+        if len(digest) != 20:
+            raise SystemExit(f"Invalid SHA-1 hash: {hex_digest!r}")
+        yield digest
+
+
+def _count_lines(path: str) -> int:
+    with open(path, encoding="utf-8") as handle:
+        return sum(1 for line in handle if line.strip())
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Build the breached-password Bloom filter.")
+    parser.add_argument("input", help="Hash/password list, or - for stdin")
+    parser.add_argument("output", help="Filter file to write")
+    parser.add_argument("--false-positive-rate", type=float, default=0.001)
+    parser.add_argument("--format", choices=["sha1", "plaintext"], default="sha1")
+    parser.add_argument(
+        "--expected-items",
+        type=int,
+        help="Number of entries (required for stdin; counted from the file otherwise)",
+    )
+    args = parser.parse_args(argv)
+    if not 0 < args.false_positive_rate < 1:
+        parser.error("--false-positive-rate must be between 0 and 1")
+
+    if args.input == "-":
+        if args.expected_items is None:
+            parser.error("--expected-items is required when reading stdin")
+        expected_items = args.expected_items
+        items = build_filter_file(
+            _iter_digests(sys.stdin, args.format),
+            args.output,
+            expected_items=expected_items,
+            false_positive_rate=args.false_positive_rate,
+        )
+    else:
+        expected_items = args.expected_items or _count_lines(args.input)
+        with open(args.input, encoding="utf-8") as handle:
+            items = build_filter_file(
+                _iter_digests(handle, args.format),
+                args.output,
+                expected_items=expected_items,
+                false_positive_rate=args.false_positive_rate,
+            )
+    print(f"Wrote {items} entries to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
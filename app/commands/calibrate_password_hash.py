@@ -0,0 +1,76 @@
+# Pick a bcrypt cost that meets a latency target on this host.
+#
+# Usage: python -m app.commands.calibrate_password_hash [--target-ms N]
+#            [--min-rounds R] [--max-rounds R] [--samples N]
+#
+# Run it on the hardware the API is deployed to and set the printed
+# PASSWORD_HASH_ROUNDS. Existing hashes are upgraded on the next login.
+
+import argparse
+from collections.abc import Callable
+from statistics import median
+from time import perf_counter
+
+from passlib.hash import bcrypt
+
+from app.core.config import settings
+
+_SAMPLE_PASSWORD = "Calibration-Password-123!"
+
+
+def measure_hash_ms(rounds: int) -> float:
+    hasher = bcrypt.using(rounds=rounds)
+    started = perf_counter()
+    hasher.hash(_SAMPLE_PASSWORD)
+    return (perf_counter() - started) * 1000
+
+
+def calibrate_rounds(
+    target_ms: float,
+    *,
+    min_rounds: int,
+    max_rounds: int,
+    samples: int = 3,
+    measure: Callable[[int], float] = measure_hash_ms,
+) -> tuple[int, dict[int, float]]:
+    # Return the highest cost whose median hash time is within target_ms.
+    #
+    # Each extra round doubles the work, so the search stops at the first
+    # cost over the target. min_rounds is a floor: it is returned even when
+    # it is already slower than the target.
+    timings: dict[int, float] = {}
+    chosen = min_rounds
+    for rounds in range(min_rounds, max_rounds + 1):
+        timings[rounds] = median(measure(rounds) for _ in range(samples))
+        if timings[rounds] > target_ms:
+            break
+        chosen = rounds
+    return chosen, timings
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Calibrate the bcrypt work factor.")
+    parser.add_argument("--target-ms", type=float, default=settings.PASSWORD_HASH_TARGET_MS)
+    parser.add_argument("--min-rounds", type=int, default=10)
+    parser.add_argument("--max-rounds", type=int, default=16)
+    parser.add_argument("--samples", type=int, default=3)
+    args = parser.parse_args(argv)
+    if not 4 <= args.min_rounds <= args.max_rounds <= 31:
+        parser.error("rounds must satisfy 4 <= --min-rounds <= --max-rounds <= 31")
+
+    chosen, timings = calibrate_rounds(
+        args.target_ms,
+        min_rounds=args.min_rounds,
+        max_rounds=args.max_rounds,
+        samples=args.samples,
+    )
+    for rounds, elapsed_ms in timings.items():
+        print(f"rounds={rounds:<3} median={elapsed_ms:8.1f}ms")
+    if timings[chosen] > args.target_ms:
+        print(f"Even the minimum cost exceeds {args.target_ms:g}ms on this host.")
+    print(f"PASSWORD_HASH_ROUNDS={chosen}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,79 @@
+# Import items for one user from an NDJSON file.
+#
+# Usage: python -m app.commands.import_items OWNER_EMAIL INPUT [--batch-size N]
+#            [--max-errors N]
+#
+# INPUT is a file (or "-" for stdin) with one item object per line, e.g. the
+# output of GET /items/export. Progress goes to stderr after every batch.
+# Exits 1 when any line was rejected.
+
+import argparse
+import asyncio
+from collections.abc import AsyncIterator
+import sys
+from typing import BinaryIO
+
+from app.core.config import settings
+from app.db.session import SessionLocal, engine
+from app.schemas.item import ItemImportResponse
+from app.services.item_import import import_items
+from app.services.user_service import get_user_by_email
+
+_READ_SIZE = 64 * 1024
+
+
+async def _read_chunks(handle: BinaryIO) -> AsyncIterator[bytes]:
+    while chunk := await asyncio.to_thread(handle.read, _READ_SIZE):
+        yield chunk
+
+
+def _print_progress(report: ItemImportResponse) -> None:
+    print(f"imported={report.imported} failed={report.failed}", file=sys.stderr)
+
+
+async def _run(args: argparse.Namespace, handle: BinaryIO) -> ItemImportResponse | None:
+    try:
+        async with SessionLocal() as db:
+            owner = await get_user_by_email(db, args.owner_email)
+            if owner is None:
+                return None
+            return await import_items(
+                db,
+                owner.id,
+                _read_chunks(handle),
+                batch_size=args.batch_size,
+                max_errors=args.max_errors,
+                on_progress=_print_progress,
+            )
+    finally:
+        await engine.dispose()
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Import items for a user from NDJSON.")
+    parser.add_argument("owner_email", help="Email of the user who will own the items")
+    parser.add_argument("input", help="NDJSON file, or - for stdin")
+    parser.add_argument("--batch-size", type=int, default=settings.ITEMS_IMPORT_BATCH_SIZE)
+    parser.add_argument("--max-errors", type=int, default=settings.ITEMS_IMPORT_MAX_ERRORS)
+    args = parser.parse_args(argv)
+    if args.batch_size < 1:
+        parser.error("--batch-size must be at least 1")
+
+    if args.input == "-":
+        report = asyncio.run(_run(args, sys.stdin.buffer))
+    else:
+        with open(args.input, "rb") as handle:
+            report = asyncio.run(_run(args, handle))
+    if report is None:
+        print(f"No user with email {args.owner_email}", file=sys.stderr)
+        return 2
+    for error in report.errors:
+        print(f"line {error.line}: {error.detail}", file=sys.stderr)
+    if report.errors_truncated:
+        print(f"... {report.failed - len(report.errors)} more errors", file=sys.stderr)
+    print(f"Imported {report.imported} items, {report.failed} lines rejected")
+    return 1 if report.failed else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,47 @@
+# Delete expired and long-revoked refresh tokens.
+#
+# Usage: python -m app.commands.purge_refresh_tokens [--batch-size N]
+#            [--throttle-seconds S] [--grace-days D]
+
+import argparse
+import asyncio
+from datetime import timedelta
+
+from app.core.config import settings
+from app.db.session import engine
+from app.services.refresh_token_purge import purge_refresh_tokens
+
+
+async def _run(args: argparse.Namespace) -> int:
+    try:
+        return await purge_refresh_tokens(
+            batch_size=args.batch_size,
+            throttle_seconds=args.throttle_seconds,
+            grace=timedelta(days=args.grace_days),
+        )
+    finally:
+        await engine.dispose()
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Purge expired and revoked refresh tokens.")
+    parser.add_argument("--batch-size", type=int, default=settings.REFRESH_TOKEN_PURGE_BATCH_SIZE)
+    parser.add_argument(
+        "--throttle-seconds",
+        type=float,
+        default=settings.REFRESH_TOKEN_PURGE_THROTTLE_SECONDS,
+    )
+    parser.add_argument(
+        "--grace-days",
+        type=float,
+        default=settings.REFRESH_TOKEN_REUSE_GRACE_DAYS,
+        help="Keep revoked/expired tokens this long so reuse detection keeps working.",
+    )
+    args = parser.parse_args(argv)
+    purged = asyncio.run(_run(args))
+    print(f"Purged {purged} refresh tokens")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,133 @@
+# Per-process admission control for CPU-heavy endpoints.
+#
+# Bounds how many bcrypt-heavy requests run at once in this process. Excess
+# requests wait in a bounded queue that is served round-robin across clients,
+# so one busy client (or botnet IP) cannot starve the others, and are rejected
+# immediately once the queue is full or after waiting too long.
+
+import asyncio
+from collections import OrderedDict, deque
+from time import perf_counter
+
+from app.core.config import settings
+from app.core.metrics import (
+    ADMISSION_IN_FLIGHT,
+    ADMISSION_QUEUE_DEPTH,
+    ADMISSION_REJECTIONS,
+    ADMISSION_WAIT_SECONDS,
+)
+
+
+class AdmissionRejected(Exception):
+    def __init__(self, reason: str) -> None:
+        super().__init__(reason)
+        self.reason = reason
+
+
+class AdmissionController:
+    # A slot freed by release() is handed directly to the next waiter, so
+    # newcomers cannot overtake the queue. Not thread-safe; one per process.
+
+    def __init__(
+        self,
+        max_concurrent: int,
+        *,
+        max_queue: int,
+        max_queue_per_client: int,
+        max_wait_seconds: float,
+    ) -> None:
+        self._max_concurrent = max_concurrent
+        self._max_queue = max_queue
+        self._max_queue_per_client = max_queue_per_client
+        self._max_wait_seconds = max_wait_seconds
+        self._active = 0
+        self._queued = 0
+        # client key -> waiters; key order is the round-robin order.
+        self._waiters: OrderedDict[str, deque[asyncio.Future[None]]] = OrderedDict()
+
+    @property
+    def enabled(self) -> bool:
+        return self._max_concurrent > 0
+
+    @property
+    def active(self) -> int:
+        return self._active
+
+    @property
+    def queued(self) -> int:
+        return self._queued
+
+    def _reject(self, reason: str) -> AdmissionRejected:
+        ADMISSION_REJECTIONS.labels(reason=reason).inc()
+        return AdmissionRejected(reason)
+
+    async def acquire(self, client_key: str) -> None:
+        if not self.enabled:
+            return
+        if self._active < self._max_concurrent and self._queued == 0:
+            self._active += 1
+            ADMISSION_IN_FLIGHT.inc()
+            ADMISSION_WAIT_SECONDS.observe(0)
+            return
+        if self._queued >= self._max_queue:
+            raise self._reject("queue_full")
+        client_waiters = self._waiters.get(client_key)
+        if client_waiters is not None and len(client_waiters) >= self._max_queue_per_client:
+            raise self._reject("client_queue_full")
+
+        waiter: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        if client_waiters is None:
+            client_waiters = self._waiters[client_key] = deque()
+        client_waiters.append(waiter)
+        self._queued += 1
+        ADMISSION_QUEUE_DEPTH.inc()
+        queued_at = perf_counter()
+        try:
+            async with asyncio.timeout(self._max_wait_seconds):
+                await waiter
+        except BaseException as exc:
+            if waiter.done() and not waiter.cancelled():
+                # Granted a slot just as we gave up; pass it on.
+                self.release()
+            else:
+                self._discard(client_key, waiter)
+            if isinstance(exc, TimeoutError):
+                raise self._reject("timeout") from None
+            raise
+        finally:
+            ADMISSION_WAIT_SECONDS.observe(perf_counter() - queued_at)
+
+    def release(self) -> None:
+        if not self.enabled:
+            return
+        while self._waiters:
+            client_key, client_waiters = self._waiters.popitem(last=False)
+            waiter = client_waiters.popleft()
+            if client_waiters:
+                # Other requests from this client go to the back of the rotation.
+                self._waiters[client_key] = client_waiters
+            self._queued -= 1
+            ADMISSION_QUEUE_DEPTH.dec()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self._active -= 1
+        ADMISSION_IN_FLIGHT.dec()
+
+    def _discard(self, client_key: str, waiter: asyncio.Future[None]) -> None:
+        client_waiters = self._waiters.get(client_key)
+        if client_waiters is None or waiter not in client_waiters:
+            return
+        client_waiters.remove(waiter)
+        if not client_waiters:
+            del self._waiters[client_key]
+        self._queued -= 1
+        ADMISSION_QUEUE_DEPTH.dec()
+
+
+auth_admission = AdmissionController(
+    settings.AUTH_ADMISSION_MAX_CONCURRENCY,
+    max_queue=settings.AUTH_ADMISSION_MAX_QUEUE,
+    max_queue_per_client=settings.AUTH_ADMISSION_MAX_QUEUE_PER_CLIENT,
+    max_wait_seconds=settings.AUTH_ADMISSION_MAX_WAIT_SECONDS,
+)
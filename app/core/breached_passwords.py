@@ -0,0 +1,147 @@
+# Offline breached-password check backed by a memory-mapped Bloom filter.
+#
+# The filter is built ahead of time (python -m app.commands.build_breached_password_filter)
+# from SHA-1 hashes such as the Have I Been Pwned download, and opened
+# read-only with mmap so every worker process shares the same page cache.
+#
+# File layout (little endian):
+#   magic "BPBLOOM1" | num_bits: u64 | num_hashes: u32 | reserved: u32 | items: u64 | bits
+#
+# Bit positions use double hashing over the SHA-1 digest of the UTF-8
+# password: (h1 + i * h2) mod num_bits, with h1/h2 taken from digest bytes.
+
+from collections.abc import Iterable
+from functools import lru_cache
+import hashlib
+import math
+import mmap
+import os
+import struct
+import tempfile
+
+from app.core.config import settings
+
+_MAGIC = b"BPBLOOM1"
+_HEADER = struct.Struct("<8sQIIQ")
+_DIGEST_WORDS = struct.Struct("<QQ")
+
+
+class BloomFilterError(Exception):
+    pass
+
+
+def password_digest(password: str) -> bytes:
+    return hashlib.sha1(password.encode("utf-8")).digest()
+
+
+def _bit_positions(digest: bytes, num_bits: int, num_hashes: int) -> Iterable[int]:
+    h1, h2 = _DIGEST_WORDS.unpack_from(digest)
+    h2 |= 1
+    return ((h1 + i * h2) % num_bits for i in range(num_hashes))
+
+
+def filter_parameters(expected_items: int, false_positive_rate: float) -> tuple[int, int]:
+    # Optimal bit count and hash count for the expected size and target rate.
+    if expected_items < 1:
+        expected_items = 1
+    if not 0 < false_positive_rate < 1:
+        raise ValueError("false_positive_rate must be between 0 and 1")
+    num_bits = math.ceil(-expected_items * math.log(false_positive_rate) / math.log(2) ** 2)
+    num_bits = max(8, num_bits + (-num_bits % 8))
+    num_hashes = max(1, round(num_bits / expected_items * math.log(2)))
+    return num_bits, num_hashes
+
+
+def build_filter_file(
+    digests: Iterable[bytes],
+    output_path: str,
+    *,
+    expected_items: int,
+    false_positive_rate: float,
+) -> int:
+    # Write a filter file atomically; returns the number of digests added.
+    num_bits, num_hashes = filter_parameters(expected_items, false_positive_rate)
+    bits = bytearray(num_bits // 8)
+    items = 0
+    for digest in digests:
+        for position in _bit_positions(digest, num_bits, num_hashes):
+            bits[position >> 3] |= 1 << (position & 7)
+        items += 1
+
+    directory = os.path.dirname(os.path.abspath(output_path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".bloom-")
+    try:
+        with os.fdopen(fd, "wb") as handle:
+            handle.write(_HEADER.pack(_MAGIC, num_bits, num_hashes, 0, items))
+            handle.write(bits)
+        os.replace(tmp_path, output_path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+    return items
+
+
+class BreachedPasswordFilter:
+    def __init__(self, path: str) -> None:
+        with open(path, "rb") as handle:
+            try:
+                self._mmap = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError as exc:
+                raise BloomFilterError(f"{path} is empty") from exc
+        try:
+            num_bits, num_hashes, items = self._read_header(path)
+        except BloomFilterError:
+            self._mmap.close()
+            raise
+        self._bits = memoryview(self._mmap)[_HEADER.size :]
+        self.num_bits = num_bits
+        self.num_hashes = num_hashes
+        self.items = items
+
+    def _read_header(self, path: str) -> tuple[int, int, int]:
+        if len(self._mmap) < _HEADER.size:
+            raise BloomFilterError(f"{path} is not a breached password filter")
+        magic, num_bits, num_hashes, _, items = _HEADER.unpack_from(self._mmap)
+        if magic != _MAGIC or num_bits <= 0 or num_hashes <= 0 or num_bits % 8:
+            raise BloomFilterError(f"{path} is not a breached password filter")
+        if len(self._mmap) != _HEADER.size + num_bits // 8:
+            raise BloomFilterError(f"{path} is truncated")
+        return num_bits, num_hashes, items
+
+    def contains_digest(self, digest: bytes) -> bool:
+        # Same positions as _bit_positions, inlined for the hot path. About
+        # 1.5-3.7us per lookup in CPython (benchmarks/bench_password_policy.py);
+        # the sub-microsecond goal was dropped: blocked layouts and single-int
+        # masks measured slower, and closure-bound variants only ~15% faster.
+        bits = self._bits
+        num_bits = self.num_bits
+        h1, h2 = _DIGEST_WORDS.unpack_from(digest)
+        position = h1 % num_bits
+        step = (h2 | 1) % num_bits
+        for _ in range(self.num_hashes):
+            if not bits[position >> 3] >> (position & 7) & 1:
+                return False
+            position += step
+            if position >= num_bits:
+                position -= num_bits
+        return True
+
+    def __contains__(self, password: str) -> bool:
+        # May return false positives at the configured rate, never false negatives.
+        return self.contains_digest(password_digest(password))
+
+    def close(self) -> None:
+        self._bits.release()
+        self._mmap.close()
+
+
+@lru_cache
+def get_breached_password_filter() -> BreachedPasswordFilter | None:
+    if not settings.BREACHED_PASSWORD_FILTER_PATH:
+        return None
+    return BreachedPasswordFilter(settings.BREACHED_PASSWORD_FILTER_PATH)
+
+
+def is_breached_password(password: str) -> bool:
+    breached = get_breached_password_filter()
+    return breached is not None and password in breached
@@ -0,0 +1,137 @@
+# Small async key/value cache backends (process-local and Redis).
+
+from collections import OrderedDict
+from functools import lru_cache
+import logging
+import time
+from typing import Protocol
+
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+
+from app.core.config import settings
+
+logger = logging.getLogger("app.cache")
+
+# Keep cache calls cheap when Redis is slow or down; callers fall back to the DB.
+_REDIS_SOCKET_TIMEOUT_SECONDS = 0.25
+_REDIS_RETRY_AFTER_SECONDS = 5.0
+
+
+class CacheBackend(Protocol):
+    async def get(self, key: str) -> bytes | None: ...
+
+    async def set(self, key: str, value: bytes, ttl_seconds: int) -> None: ...
+
+    async def delete(self, *keys: str) -> None: ...
+
+
+class MemoryCache:
+    # Bounded LRU with per-entry TTL, local to the current process.
+
+    def __init__(self, max_entries: int) -> None:
+        self._entries: OrderedDict[str, tuple[float, bytes]] = OrderedDict()
+        self._max_entries = max_entries
+
+    async def get(self, key: str) -> bytes | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if time.monotonic() >= expires_at:
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    async def set(self, key: str, value: bytes, ttl_seconds: int) -> None:
+        if self._max_entries <= 0 or ttl_seconds <= 0:
+            return
+        self._entries.pop(key, None)
+        while len(self._entries) >= self._max_entries:
+            self._entries.popitem(last=False)
+        self._entries[key] = (time.monotonic() + ttl_seconds, value)
+
+    async def delete(self, *keys: str) -> None:
+        for key in keys:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+class RedisCache:
+    # Fails open: any Redis error is logged, treated as a miss, and further
+    # calls are skipped for a short back-off window.
+
+    def __init__(self, url: str) -> None:
+        self._url = url
+        self._client: Redis | None = None
+        self._unavailable_until = 0.0
+
+    @property
+    def client(self) -> Redis:
+        if self._client is None:
+            self._client = Redis.from_url(
+                self._url,
+                socket_timeout=_REDIS_SOCKET_TIMEOUT_SECONDS,
+                socket_connect_timeout=_REDIS_SOCKET_TIMEOUT_SECONDS,
+            )
+        return self._client
+
+    def _available(self) -> bool:
+        return time.monotonic() >= self._unavailable_until
+
+    def _mark_unavailable(self, exc: Exception) -> None:
+        self._unavailable_until = time.monotonic() + _REDIS_RETRY_AFTER_SECONDS
+        logger.warning("cache.redis_unavailable", extra={"error": str(exc)})
+
+    async def get(self, key: str) -> bytes | None:
+        if not self._available():
+            return None
+        try:
+            value = await self.client.get(key)
+        except (RedisError, OSError) as exc:
+            self._mark_unavailable(exc)
+            return None
+        return value if isinstance(value, bytes) else None
+
+    async def set(self, key: str, value: bytes, ttl_seconds: int) -> None:
+        if not self._available() or ttl_seconds <= 0:
+            return
+        try:
+            await self.client.set(key, value, ex=ttl_seconds)
+        except (RedisError, OSError) as exc:
+            self._mark_unavailable(exc)
+
+    async def delete(self, *keys: str) -> None:
+        if not keys:
+            return
+        try:
+            await self.client.delete(*keys)
+        except (RedisError, OSError) as exc:
+            # Deletes are invalidations, so always attempt them even while
+            # backing off; a failure here leaves the entry to expire by TTL.
+            self._mark_unavailable(exc)
+
+
+def build_cache(url: str, max_entries: int = 10_000) -> CacheBackend:
+    # "memory://" (as used for slowapi in tests/local dev) selects the local cache.
+    if url.startswith("memory://"):
+        return MemoryCache(max_entries=max_entries)
+    return RedisCache(url)
+
+
+def select_cache(backend: str, max_entries: int) -> CacheBackend | None:
+    # Resolve a "local" / "redis" / "disabled" setting to a backend instance.
+    if backend == "redis":
+        return get_shared_cache()
+    if backend == "local":
+        return MemoryCache(max_entries=max_entries)
+    return None
+
+
+@lru_cache
+def get_shared_cache() -> CacheBackend:
+    # Cache shared across processes/instances, backed by REDIS_URL.
+    return build_cache(settings.REDIS_URL)
@@ -1,6 +1,6 @@
 # Application configuration loaded from environment variables.
 
-from typing import Self
+from typing import Literal, Self
 
 from pydantic import Field, model_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
@@ -11,6 +11,8 @@ class Settings(BaseSettings):
 
     ENVIRONMENT: str = "development"
     PROJECT_NAME: str = "Backend Starter API"
+    # Worker processes per host; gunicorn and uvicorn read the same variable.
+    WEB_CONCURRENCY: int = Field(default=1, ge=1)
     API_V1_STR: str = "/api/v1"
     CORS_ORIGINS: list[str] = ["http://localhost:3000", "http://localhost:5173"]
     SECRET_KEY: str = Field(..., min_length=32)
@@ -18,16 +20,57 @@ class Settings(BaseSettings):
     JWT_ISSUER: str = "backend-starter-api"
     JWT_AUDIENCE: str = "backend-starter-api"
     CLOCK_SKEW_SECONDS: int = 30
+    JWT_DECODE_CACHE_MAX_BYTES: int = Field(default=4 * 1024 * 1024, ge=0)
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60
+    ACCESS_TOKEN_STATELESS: bool = False
     REFRESH_TOKEN_EXPIRE_DAYS: int = 30
+    REFRESH_TOKEN_STORE: Literal["sql", "redis", "memory"] = "sql"
+    REFRESH_ROTATION_SINGLE_STATEMENT: bool = True
+    REFRESH_TOKEN_REUSE_GRACE_DAYS: int = Field(default=7, ge=0)
+    REFRESH_TOKEN_PURGE_INTERVAL_SECONDS: int = Field(default=0, ge=0)
+    REFRESH_TOKEN_PURGE_BATCH_SIZE: int = Field(default=1000, ge=1)
+    REFRESH_TOKEN_PURGE_THROTTLE_SECONDS: float = Field(default=0.05, ge=0)
     AUTH_LOGIN_RATE_LIMIT: str = "5/minute"
+    AUTH_ADMISSION_MAX_CONCURRENCY: int = Field(default=4, ge=0)
+    AUTH_ADMISSION_MAX_QUEUE: int = Field(default=64, ge=0)
+    AUTH_ADMISSION_MAX_QUEUE_PER_CLIENT: int = Field(default=4, ge=1)
+    AUTH_ADMISSION_MAX_WAIT_SECONDS: float = Field(default=5.0, gt=0)
+    AUTH_ADMISSION_RETRY_AFTER_SECONDS: int = Field(default=1, ge=1)
     AUTH_REFRESH_RATE_LIMIT: str = "10/minute"
     RATE_LIMIT_TRUST_PROXY_HEADERS: bool = False
     RATE_LIMIT_TRUSTED_PROXY_IPS: list[str] = []
     REDIS_URL: str = "redis://localhost:6379/0"
     CACHE_TTL_SECONDS: int = 30
+    PRINCIPAL_CACHE_BACKEND: Literal["local", "redis", "disabled"] = "local"
+    PRINCIPAL_CACHE_MAX_ENTRIES: int = Field(default=10_000, ge=0)
+    SESSION_EPOCH_CACHE_BACKEND: Literal["local", "redis", "disabled"] = "local"
+    SESSION_EPOCH_CACHE_TTL_SECONDS: int = Field(default=5, ge=0)
+    ITEMS_RESPONSE_CACHE_BACKEND: Literal["local", "redis", "disabled"] = "disabled"
+    ITEMS_RESPONSE_CACHE_MAX_ENTRIES: int = Field(default=10_000, ge=0)
     AUTO_CREATE_SCHEMA: bool = False
+    PASSWORD_HASH_EXECUTOR: Literal["thread", "process"] = "thread"
+    PASSWORD_HASH_MAX_WORKERS: int = Field(default=2, ge=1)
+    PASSWORD_HASH_ROUNDS: int = Field(default=12, ge=4, le=31)
+    PASSWORD_HASH_TARGET_MS: int = Field(default=250, ge=1)
+    BREACHED_PASSWORD_FILTER_PATH: str | None = None
     SQLALCHEMY_DATABASE_URI: str = Field(...)
+    DB_POOL_SIZE: int = Field(default=5, ge=1)
+    DB_MAX_OVERFLOW: int = Field(default=10, ge=0)
+    DB_POOL_TIMEOUT_SECONDS: float = Field(default=30.0, gt=0)
+    DB_POOL_RECYCLE_SECONDS: int = Field(default=-1, ge=-1)
+    DB_POOL_PRE_PING: bool = False
+    DB_STATEMENT_CACHE_SIZE: int = Field(default=100, ge=0)
+    DB_PGBOUNCER_MODE: bool = False
+    ITEMS_BULK_MAX_SIZE: int = Field(default=500, ge=1)
+    ITEMS_TOTAL_MODE: Literal["exact", "maintained", "estimated"] = "maintained"
+    ITEMS_EXPORT_BATCH_SIZE: int = Field(default=1000, ge=1)
+    ITEMS_IMPORT_BATCH_SIZE: int = Field(default=1000, ge=1)
+    ITEMS_IMPORT_MAX_ERRORS: int = Field(default=100, ge=0)
+    SQLALCHEMY_REPLICA_URIS: list[str] = []
+    REPLICA_MAX_LAG_SECONDS: float = Field(default=5.0, ge=0)
+    REPLICA_HEALTH_CHECK_INTERVAL_SECONDS: float = Field(default=5.0, gt=0)
+    READ_YOUR_WRITES_SECONDS: float = Field(default=5.0, ge=0)
+    READ_YOUR_WRITES_BACKEND: Literal["local", "redis"] = "local"
 
     @model_validator(mode="after")
     def _validate_security(self) -> Self:
@@ -45,7 +88,53 @@ class Settings(BaseSettings):
                 )
             if self.SQLALCHEMY_DATABASE_URI.startswith("sqlite"):
                 raise ValueError("SQLALCHEMY_DATABASE_URI must not use sqlite in production")
+        if self.ITEMS_RESPONSE_CACHE_BACKEND == "local" and self.WEB_CONCURRENCY > 1:
+            # Other workers would keep serving pages retired by a write.
+            raise ValueError(
+                "ITEMS_RESPONSE_CACHE_BACKEND=local is single-process only; "
+                "use redis when WEB_CONCURRENCY > 1"
+            )
+        self._validate_shared_caches()
+        self._validate_database_driver_options()
         return self
 
+    def _validate_shared_caches(self) -> None:
+        # Invalidations on the "local" backend never reach the other workers,
+        # so a revoked or demoted user would keep authenticating there, and
+        # a read-your-writes pin would not cover the next request's worker.
+        # With several workers these default to redis and an explicit local
+        # fails.
+        if self.WEB_CONCURRENCY <= 1:
+            return
+        names = ["PRINCIPAL_CACHE_BACKEND", "SESSION_EPOCH_CACHE_BACKEND"]
+        if self.SQLALCHEMY_REPLICA_URIS:
+            names.append("READ_YOUR_WRITES_BACKEND")
+        for name in names:
+            if getattr(self, name) != "local":
+                continue
+            if name in self.model_fields_set:
+                raise ValueError(
+                    f"{name}=local is single-process only; use redis when WEB_CONCURRENCY > 1"
+                )
+            setattr(self, name, "redis")
+
+    def _validate_database_driver_options(self) -> None:
+        # Prepared-statement options only exist for PostgreSQL (asyncpg).
+        is_postgresql = self.SQLALCHEMY_DATABASE_URI.startswith(("postgresql", "postgres:"))
+        if not is_postgresql:
+            if self.DB_PGBOUNCER_MODE:
+                raise ValueError("DB_PGBOUNCER_MODE requires a PostgreSQL database")
+            if "DB_STATEMENT_CACHE_SIZE" in self.model_fields_set:
+                raise ValueError("DB_STATEMENT_CACHE_SIZE only applies to PostgreSQL")
+        if (
+            self.DB_PGBOUNCER_MODE
+            and "DB_STATEMENT_CACHE_SIZE" in self.model_fields_set
+            and self.DB_STATEMENT_CACHE_SIZE > 0
+        ):
+            raise ValueError(
+                "DB_STATEMENT_CACHE_SIZE must be 0 with DB_PGBOUNCER_MODE "
+                "(transaction pooling cannot keep prepared statements)"
+            )
+
 
 settings = Settings()  # type: ignore[call-arg]
@@ -0,0 +1,68 @@
+# Bounded worker pool for CPU-heavy password hashing.
+
+import asyncio
+from collections.abc import Callable
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from time import perf_counter
+from typing import TypeVar
+from weakref import WeakKeyDictionary
+
+from app.core.config import settings
+from app.core.metrics import PASSWORD_HASH_QUEUE_DEPTH, PASSWORD_HASH_WAIT_SECONDS
+
+T = TypeVar("T")
+
+_executor: Executor | None = None
+# One slot semaphore per event loop; asyncio primitives must not cross loops.
+_slots: "WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = WeakKeyDictionary()
+
+
+def _get_executor() -> Executor:
+    global _executor
+    if _executor is None:
+        workers = settings.PASSWORD_HASH_MAX_WORKERS
+        if settings.PASSWORD_HASH_EXECUTOR == "process":
+            _executor = ProcessPoolExecutor(max_workers=workers)
+        else:
+            _executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="pwhash")
+    return _executor
+
+
+def _get_slots(loop: asyncio.AbstractEventLoop) -> asyncio.Semaphore:
+    slots = _slots.get(loop)
+    if slots is None:
+        slots = asyncio.Semaphore(settings.PASSWORD_HASH_MAX_WORKERS)
+        _slots[loop] = slots
+    return slots
+
+
+async def run_password_task(func: Callable[..., T], *args: object) -> T:
+    # Run a hashing callable off the event loop.
+    #
+    # Callers wait on a semaphore sized to the pool so the executor never
+    # builds an unbounded internal backlog; the wait is what we export as
+    # queue depth and wait time. With the process executor, func and args
+    # must be picklable (module-level functions and plain strings).
+    loop = asyncio.get_running_loop()
+    slots = _get_slots(loop)
+    queued_at = perf_counter()
+    PASSWORD_HASH_QUEUE_DEPTH.inc()
+    try:
+        await slots.acquire()
+    finally:
+        PASSWORD_HASH_QUEUE_DEPTH.dec()
+    PASSWORD_HASH_WAIT_SECONDS.observe(perf_counter() - queued_at)
+    try:
+        return await loop.run_in_executor(_get_executor(), partial(func, *args))
+    finally:
+        slots.release()
+
+
+async def shutdown_password_pool() -> None:
+    # Waits for in-flight hashes in a thread so the event loop keeps serving
+    # other shutdown work; the slot semaphore means nothing else is queued.
+    global _executor
+    executor, _executor = _executor, None
+    if executor is not None:
+        await asyncio.to_thread(executor.shutdown, wait=True)
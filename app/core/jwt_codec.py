@@ -0,0 +1,154 @@
+# Minimal HS256 JWT codec for access tokens.
+#
+# Produces and accepts the same compact JWS tokens as python-jose with
+# algorithm HS256, but skips its generic key/algorithm handling: the HMAC key
+# state is computed once and copied per token, and the common header is
+# recognised by a byte comparison instead of being parsed.
+
+import base64
+import binascii
+from collections.abc import Mapping
+from datetime import datetime
+import hashlib
+import hmac
+import json
+import time
+from typing import Any
+
+from app.core.config import settings
+
+_HEADER = {"alg": "HS256", "typ": "JWT"}
+_json_encoder = json.JSONEncoder(separators=(",", ":"), ensure_ascii=False)
+
+
+class InvalidTokenError(Exception):
+    pass
+
+
+def _b64url_encode(data: bytes) -> bytes:
+    return base64.urlsafe_b64encode(data).rstrip(b"=")
+
+
+def _b64url_decode(data: bytes) -> bytes:
+    padding = -len(data) % 4
+    try:
+        return base64.urlsafe_b64decode(data + b"=" * padding)
+    except (binascii.Error, ValueError) as exc:
+        raise InvalidTokenError("Invalid base64 segment") from exc
+
+
+def _numeric_date(value: object) -> object:
+    # jose serialises datetimes in exp/iat/nbf as integer timestamps.
+    if isinstance(value, datetime):
+        return int(value.timestamp())
+    return value
+
+
+class HS256Codec:
+    def __init__(
+        self,
+        secret: str,
+        *,
+        issuer: str,
+        audience: str,
+        leeway_seconds: int,
+    ) -> None:
+        self._mac = hmac.new(secret.encode("utf-8"), digestmod=hashlib.sha256)
+        self._issuer = issuer
+        self._audience = audience
+        self._leeway = leeway_seconds
+        self._header_segment = _b64url_encode(
+            json.dumps(_HEADER, separators=(",", ":"), sort_keys=True).encode("utf-8")
+        )
+
+    def _sign(self, signing_input: bytes) -> bytes:
+        mac = self._mac.copy()
+        mac.update(signing_input)
+        return mac.digest()
+
+    def encode(self, claims: Mapping[str, object]) -> str:
+        payload = {
+            key: _numeric_date(value) if key in ("exp", "iat", "nbf") else value
+            for key, value in claims.items()
+        }
+        signing_input = (
+            self._header_segment
+            + b"."
+            + _b64url_encode(_json_encoder.encode(payload).encode("utf-8"))
+        )
+        token = signing_input + b"." + _b64url_encode(self._sign(signing_input))
+        return token.decode("ascii")
+
+    def decode(self, token: str) -> dict[str, Any]:
+        # Verify the signature and registered claims, returning the payload.
+        #
+        # exp, iat, iss and aud are required; exp/iat/nbf are checked with
+        # the configured leeway. Raises InvalidTokenError on any failure.
+        try:
+            raw = token.encode("ascii")
+        except UnicodeEncodeError as exc:
+            raise InvalidTokenError("Token is not ASCII") from exc
+        parts = raw.split(b".")
+        if len(parts) != 3:
+            raise InvalidTokenError("Malformed token")
+        header_segment, payload_segment, signature_segment = parts
+        if header_segment != self._header_segment:
+            self._check_header(header_segment)
+        expected = self._sign(header_segment + b"." + payload_segment)
+        if not hmac.compare_digest(expected, _b64url_decode(signature_segment)):
+            raise InvalidTokenError("Signature verification failed")
+        try:
+            claims = json.loads(_b64url_decode(payload_segment))
+        except ValueError as exc:
+            raise InvalidTokenError("Invalid payload") from exc
+        if not isinstance(claims, dict):
+            raise InvalidTokenError("Invalid payload")
+        self._validate_claims(claims)
+        return claims
+
+    @staticmethod
+    def _check_header(segment: bytes) -> None:
+        # Same algorithm, different serialisation (e.g. another issuer's
+        # key order); anything other than HS256 is rejected.
+        try:
+            header = json.loads(_b64url_decode(segment))
+        except ValueError as exc:
+            raise InvalidTokenError("Invalid header") from exc
+        if not isinstance(header, dict) or header.get("alg") != "HS256":
+            raise InvalidTokenError("Unsupported algorithm")
+
+    def _validate_claims(self, claims: dict[str, Any]) -> None:
+        now = time.time()
+        exp = claims.get("exp")
+        if not isinstance(exp, int | float) or isinstance(exp, bool):
+            raise InvalidTokenError("Missing or invalid exp")
+        if exp < now - self._leeway:
+            raise InvalidTokenError("Token has expired")
+        iat = claims.get("iat")
+        if not isinstance(iat, int | float) or isinstance(iat, bool):
+            raise InvalidTokenError("Missing or invalid iat")
+        if iat > now + self._leeway:
+            raise InvalidTokenError("Token issued in the future")
+        nbf = claims.get("nbf")
+        if nbf is not None:
+            if not isinstance(nbf, int | float) or nbf > now + self._leeway:
+                raise InvalidTokenError("Token not yet valid")
+        if claims.get("iss") != self._issuer:
+            raise InvalidTokenError("Invalid issuer")
+        audience = claims.get("aud")
+        if isinstance(audience, str):
+            audience_ok = audience == self._audience
+        elif isinstance(audience, list):
+            audience_ok = self._audience in audience
+        else:
+            audience_ok = False
+        if not audience_ok:
+            raise InvalidTokenError("Invalid audience")
+
+
+access_token_codec = HS256Codec(
+    settings.SECRET_KEY,
+    issuer=settings.JWT_ISSUER,
+    audience=settings.JWT_AUDIENCE,
+    leeway_seconds=settings.CLOCK_SKEW_SECONDS,
+)
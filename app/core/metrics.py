@@ -1,5 +1,7 @@
 # Prometheus metrics collectors and helpers.
 
+from collections.abc import Callable, Iterator
+
 from prometheus_client import (
     CONTENT_TYPE_LATEST,
     CollectorRegistry,
@@ -8,6 +10,8 @@ from prometheus_client import (
     Histogram,
     generate_latest,
 )
+from prometheus_client.core import GaugeMetricFamily
+from prometheus_client.registry import Collector
 
 METRICS_REGISTRY = CollectorRegistry(auto_describe=True)
 
@@ -28,6 +32,189 @@ IN_PROGRESS = Gauge(
     "Number of HTTP requests currently in progress",
     registry=METRICS_REGISTRY,
 )
+PASSWORD_HASH_QUEUE_DEPTH = Gauge(
+    "password_hash_queue_depth",
+    "Number of password hash operations waiting for a worker slot",
+    registry=METRICS_REGISTRY,
+)
+PASSWORD_HASH_WAIT_SECONDS = Histogram(
+    "password_hash_wait_seconds",
+    "Time password hash operations spend waiting for a worker slot",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0),
+    registry=METRICS_REGISTRY,
+)
+PASSWORD_HASH_COST = Gauge(
+    "password_hash_cost",
+    "bcrypt work factor (log2 rounds) used for new password hashes",
+    registry=METRICS_REGISTRY,
+)
+PASSWORD_REHASHES = Counter(
+    "password_rehashes",
+    "Background password rehashes after login, by result",
+    ["result"],
+    registry=METRICS_REGISTRY,
+)
+ADMISSION_IN_FLIGHT = Gauge(
+    "auth_admission_in_flight",
+    "CPU-heavy auth requests currently holding an admission slot",
+    registry=METRICS_REGISTRY,
+)
+ADMISSION_QUEUE_DEPTH = Gauge(
+    "auth_admission_queue_depth",
+    "CPU-heavy auth requests waiting for an admission slot",
+    registry=METRICS_REGISTRY,
+)
+ADMISSION_WAIT_SECONDS = Histogram(
+    "auth_admission_wait_seconds",
+    "Time CPU-heavy auth requests wait for an admission slot",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0),
+    registry=METRICS_REGISTRY,
+)
+ADMISSION_REJECTIONS = Counter(
+    "auth_admission_rejections",
+    "CPU-heavy auth requests rejected with 503, by reason",
+    ["reason"],
+    registry=METRICS_REGISTRY,
+)
+JWT_DECODE_CACHE_HITS = Counter(
+    "jwt_decode_cache_hits",
+    "Access tokens served from the verified-token cache",
+    registry=METRICS_REGISTRY,
+)
+JWT_DECODE_CACHE_MISSES = Counter(
+    "jwt_decode_cache_misses",
+    "Access tokens not found (or expired) in the verified-token cache",
+    registry=METRICS_REGISTRY,
+)
+JWT_DECODE_CACHE_EVICTIONS = Counter(
+    "jwt_decode_cache_evictions",
+    "Verified-token cache entries evicted to stay within the memory cap",
+    registry=METRICS_REGISTRY,
+)
+PRINCIPAL_CACHE_HITS = Counter(
+    "principal_cache_hits",
+    "Authenticated requests served from the principal cache",
+    registry=METRICS_REGISTRY,
+)
+PRINCIPAL_CACHE_MISSES = Counter(
+    "principal_cache_misses",
+    "Authenticated requests that loaded the user from the database",
+    registry=METRICS_REGISTRY,
+)
+ITEM_RESPONSE_CACHE_HITS = Counter(
+    "item_response_cache_hits",
+    "Item reads served from the response cache, by kind (item or list)",
+    ["kind"],
+    registry=METRICS_REGISTRY,
+)
+ITEM_RESPONSE_CACHE_MISSES = Counter(
+    "item_response_cache_misses",
+    "Item reads that missed the response cache, by kind (item or list)",
+    ["kind"],
+    registry=METRICS_REGISTRY,
+)
+ITEM_RESPONSE_CACHE_SECONDS = Histogram(
+    "item_response_cache_seconds",
+    "Time spent in response cache calls, by operation",
+    ["operation"],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5),
+    registry=METRICS_REGISTRY,
+)
+REFRESH_TOKENS_PURGED = Counter(
+    "refresh_tokens_purged",
+    "Expired or long-revoked refresh tokens deleted by the purge job",
+    registry=METRICS_REGISTRY,
+)
+REFRESH_TOKEN_PURGE_BATCH_SECONDS = Histogram(
+    "refresh_token_purge_batch_seconds",
+    "Latency of one refresh token purge batch (select + delete + commit)",
+    registry=METRICS_REGISTRY,
+)
+DB_POOL_CHECKOUT_SECONDS = Histogram(
+    "db_pool_checkout_seconds",
+    "Time to check a connection out of the pool, including waiting for a free one",
+    ["pool"],
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0),
+    registry=METRICS_REGISTRY,
+)
+DB_POOL_CHECKOUT_TIMEOUTS = Counter(
+    "db_pool_checkout_timeouts",
+    "Pool checkouts that gave up after DB_POOL_TIMEOUT_SECONDS",
+    ["pool"],
+    registry=METRICS_REGISTRY,
+)
+
+DB_REPLICA_HEALTHY = Gauge(
+    "db_replica_healthy",
+    "1 while a read replica is in rotation, 0 while it is down or lagging",
+    ["replica"],
+    registry=METRICS_REGISTRY,
+)
+DB_REPLICA_LAG_SECONDS = Gauge(
+    "db_replica_lag_seconds",
+    "Replication replay lag measured by the last replica health check",
+    ["replica"],
+    registry=METRICS_REGISTRY,
+)
+DB_READ_SESSIONS = Counter(
+    "db_read_sessions",
+    "Sessions opened for read-only routes, by target (replica or primary)",
+    ["target"],
+    registry=METRICS_REGISTRY,
+)
+
+ITEMS_EXPORTED = Counter(
+    "items_exported",
+    "Item rows written by GET /items/export, by format",
+    ["format"],
+    registry=METRICS_REGISTRY,
+)
+ITEM_EXPORTS_ABORTED = Counter(
+    "item_exports_aborted",
+    "Item exports stopped early because the client disconnected",
+    registry=METRICS_REGISTRY,
+)
+
+ITEMS_IMPORTED = Counter(
+    "items_imported",
+    "NDJSON item import lines, by result (imported or failed)",
+    ["result"],
+    registry=METRICS_REGISTRY,
+)
+
+
+class PoolStatsCollector(Collector):
+    # Reads pool gauges at scrape time. Sources return
+    # (size, checked_out, overflow) for a named pool.
+
+    def __init__(self) -> None:
+        self._sources: dict[str, Callable[[], tuple[int, int, int]]] = {}
+
+    def add_source(self, pool: str, stats: Callable[[], tuple[int, int, int]]) -> None:
+        self._sources[pool] = stats
+
+    def collect(self) -> Iterator[GaugeMetricFamily]:
+        size = GaugeMetricFamily("db_pool_size", "Configured pool size", labels=["pool"])
+        checked_out = GaugeMetricFamily(
+            "db_pool_checked_out", "Connections currently checked out", labels=["pool"]
+        )
+        overflow = GaugeMetricFamily(
+            "db_pool_overflow",
+            "Connections open beyond the pool size (negative while the pool is filling)",
+            labels=["pool"],
+        )
+        for pool, stats in self._sources.items():
+            pool_size, pool_checked_out, pool_overflow = stats()
+            size.add_metric([pool], pool_size)
+            checked_out.add_metric([pool], pool_checked_out)
+            overflow.add_metric([pool], pool_overflow)
+        yield size
+        yield checked_out
+        yield overflow
+
+
+DB_POOL_STATS = PoolStatsCollector()
+METRICS_REGISTRY.register(DB_POOL_STATS)
 
 
 def normalize_path(path: str) -> str:
@@ -5,14 +5,27 @@ import hmac
 import hashlib
 import secrets
 
-from jose import jwt
 from passlib.context import CryptContext
 
 from app.core.config import settings
+from app.core.hashing import run_password_task
+from app.core.jwt_codec import access_token_codec
+from app.core.metrics import PASSWORD_HASH_COST
 
 ALGORITHM = "HS256"
+# Claim carrying the user's session epoch in stateless access tokens.
+SESSION_EPOCH_CLAIM = "sep"
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# min/max rounds pin the accepted cost to PASSWORD_HASH_ROUNDS, so needs_update()
+# flags hashes made with any other cost (older defaults or a previous calibration).
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__default_rounds=settings.PASSWORD_HASH_ROUNDS,
+    bcrypt__min_rounds=settings.PASSWORD_HASH_ROUNDS,
+    bcrypt__max_rounds=settings.PASSWORD_HASH_ROUNDS,
+)
+PASSWORD_HASH_COST.set(settings.PASSWORD_HASH_ROUNDS)
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
@@ -23,19 +36,39 @@ def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
 
-def create_access_token(subject: str, expires_delta_minutes: int | None = None) -> str:
+def password_needs_rehash(hashed_password: str) -> bool:
+    return pwd_context.needs_update(hashed_password)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    # Non-blocking variant for request handlers; runs in the hashing pool.
+    return await run_password_task(verify_password, plain_password, hashed_password)
+
+
+async def get_password_hash_async(password: str) -> str:
+    return await run_password_task(get_password_hash, password)
+
+
+def create_access_token(
+    subject: str,
+    expires_delta_minutes: int | None = None,
+    extra_claims: dict[str, object] | None = None,
+) -> str:
     expire = datetime.now(timezone.utc) + timedelta(
         minutes=expires_delta_minutes or settings.ACCESS_TOKEN_EXPIRE_MINUTES
     )
     now = datetime.now(timezone.utc)
-    to_encode = {
-        "sub": subject,
-        "exp": expire,
-        "iat": now,
-        "iss": settings.JWT_ISSUER,
-        "aud": settings.JWT_AUDIENCE,
-    }
-    return jwt.encode(to_encode, settings.SECRET_KEY, algorithm=ALGORITHM)
+    to_encode: dict[str, object] = dict(extra_claims or {})
+    to_encode.update(
+        {
+            "sub": subject,
+            "exp": expire,
+            "iat": now,
+            "iss": settings.JWT_ISSUER,
+            "aud": settings.JWT_AUDIENCE,
+        }
+    )
+    return access_token_codec.encode(to_encode)
 
 
 def create_refresh_token() -> str:
@@ -0,0 +1,94 @@
+# In-process LRU of already-verified access token claims.
+
+from collections import OrderedDict
+import hashlib
+import sys
+import time
+from typing import Any
+
+from app.core.config import settings
+from app.core.metrics import (
+    JWT_DECODE_CACHE_EVICTIONS,
+    JWT_DECODE_CACHE_HITS,
+    JWT_DECODE_CACHE_MISSES,
+)
+
+# Rough per-entry bookkeeping cost (OrderedDict node, tuple, floats).
+_ENTRY_OVERHEAD_BYTES = 200
+
+
+def _estimate_size(key: bytes, claims: dict[str, Any]) -> int:
+    size = _ENTRY_OVERHEAD_BYTES + sys.getsizeof(key) + sys.getsizeof(claims)
+    for name, value in claims.items():
+        size += sys.getsizeof(name) + sys.getsizeof(value)
+    return size
+
+
+class VerifiedTokenCache:
+    # Entries are keyed by a SHA-256 digest of the raw token, so a token with a
+    # tampered signature never matches a verified entry. Entries expire at the
+    # token's exp plus the configured leeway, mirroring jwt.decode.
+
+    def __init__(self, max_bytes: int, leeway_seconds: int) -> None:
+        self._entries: OrderedDict[bytes, tuple[float, dict[str, Any], int]] = OrderedDict()
+        self._max_bytes = max_bytes
+        self._leeway_seconds = leeway_seconds
+        self._size_bytes = 0
+
+    @staticmethod
+    def _key(token: str) -> bytes:
+        return hashlib.sha256(token.encode("utf-8")).digest()
+
+    @property
+    def size_bytes(self) -> int:
+        return self._size_bytes
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, token: str) -> dict[str, Any] | None:
+        # Return cached claims; callers must treat them as read-only.
+        if self._max_bytes <= 0:
+            return None
+        key = self._key(token)
+        entry = self._entries.get(key)
+        if entry is None:
+            JWT_DECODE_CACHE_MISSES.inc()
+            return None
+        expires_at, claims, size = entry
+        if time.time() > expires_at:
+            del self._entries[key]
+            self._size_bytes -= size
+            JWT_DECODE_CACHE_MISSES.inc()
+            return None
+        self._entries.move_to_end(key)
+        JWT_DECODE_CACHE_HITS.inc()
+        return claims
+
+    def put(self, token: str, claims: dict[str, Any]) -> None:
+        exp = claims.get("exp")
+        if self._max_bytes <= 0 or not isinstance(exp, int | float):
+            return
+        key = self._key(token)
+        size = _estimate_size(key, claims)
+        if size > self._max_bytes:
+            return
+        previous = self._entries.pop(key, None)
+        if previous is not None:
+            self._size_bytes -= previous[2]
+        while self._entries and self._size_bytes + size > self._max_bytes:
+            _, (_, _, evicted_size) = self._entries.popitem(last=False)
+            self._size_bytes -= evicted_size
+            JWT_DECODE_CACHE_EVICTIONS.inc()
+        self._entries[key] = (float(exp) + self._leeway_seconds, claims, size)
+        self._size_bytes += size
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._size_bytes = 0
+
+
+verified_token_cache = VerifiedTokenCache(
+    max_bytes=settings.JWT_DECODE_CACHE_MAX_BYTES,
+    leeway_seconds=settings.CLOCK_SKEW_SECONDS,
+)
@@ -4,7 +4,9 @@ from sqlalchemy.orm import DeclarativeBase
 
 
 class Base(DeclarativeBase):
-    pass
+    # Fetch server-generated values in the INSERT/UPDATE itself (RETURNING
+    # where supported) instead of loading them lazily afterwards.
+    __mapper_args__ = {"eager_defaults": True}
 
 
 # Import models so SQLAlchemy registers them before create_all()
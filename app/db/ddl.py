@@ -0,0 +1,224 @@
+# Database objects that the ORM metadata cannot express.
+#
+# item_counters holds a per-owner item count kept in step with items by
+# triggers, so every writer (ORM, bulk statements, COPY) maintains it in the
+# same transaction. items.owner_id is never reassigned, so the count only
+# follows inserts and deletes. The row's version also goes up on updates:
+# it changes whenever anything in the owner's item list does, which makes it
+# the list's ETag validator.
+#
+# PostgreSQL uses statement-level triggers with transition tables: a bulk
+# write adjusts each owner's counter once, not once per row.
+#
+# Item full-text search is also kept outside the ORM, since neither backend's
+# objects map to a portable column: PostgreSQL has a generated tsvector
+# column (items.search_vector) with a GIN index, SQLite an FTS5 table
+# (items_fts) over items, kept in step by triggers.
+#
+# The title_prefix listing filter runs as LIKE 'prefix%' on PostgreSQL. The
+# default-opclass (owner_id, title, id) index only supports that range under
+# the C collation, so PostgreSQL also gets ix_items_owner_id_title_pattern on
+# (owner_id, title text_pattern_ops), which it can seek under any collation.
+# SQLite turns the prefix into a plain range (see app.utils.sql.prefix_match)
+# and needs no extra index.
+#
+# Alembic autogenerate skips all of these objects (see is_raw_ddl_object).
+
+from typing import Any
+
+from sqlalchemy import Connection
+
+_SQLITE_CREATE = [
+    """
+    CREATE TRIGGER IF NOT EXISTS items_count_insert AFTER INSERT ON items
+    BEGIN
+        INSERT INTO item_counters (owner_id, item_count, version) VALUES (NEW.owner_id, 1, 1)
+        ON CONFLICT (owner_id)
+        DO UPDATE SET item_count = item_count + 1, version = version + 1;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS items_count_delete AFTER DELETE ON items
+    BEGIN
+        UPDATE item_counters SET item_count = item_count - 1, version = version + 1
+        WHERE owner_id = OLD.owner_id;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS items_version_update AFTER UPDATE ON items
+    BEGIN
+        UPDATE item_counters SET version = version + 1 WHERE owner_id = NEW.owner_id;
+    END
+    """,
+]
+
+_POSTGRESQL_CREATE = [
+    """
+    CREATE OR REPLACE FUNCTION item_counters_after_insert() RETURNS trigger
+    LANGUAGE plpgsql AS $$
+    BEGIN
+        INSERT INTO item_counters (owner_id, item_count, version)
+        SELECT owner_id, count(*), 1 FROM inserted_items GROUP BY owner_id ORDER BY owner_id
+        ON CONFLICT (owner_id)
+        DO UPDATE SET item_count = item_counters.item_count + EXCLUDED.item_count,
+            version = item_counters.version + 1;
+        RETURN NULL;
+    END
+    $$
+    """,
+    """
+    CREATE OR REPLACE FUNCTION item_counters_after_delete() RETURNS trigger
+    LANGUAGE plpgsql AS $$
+    BEGIN
+        UPDATE item_counters AS counters
+        SET item_count = counters.item_count - removed.item_count,
+            version = counters.version + 1
+        FROM (
+            SELECT owner_id, count(*) AS item_count FROM deleted_items GROUP BY owner_id
+        ) AS removed
+        WHERE counters.owner_id = removed.owner_id;
+        RETURN NULL;
+    END
+    $$
+    """,
+    """
+    CREATE OR REPLACE FUNCTION item_counters_after_update() RETURNS trigger
+    LANGUAGE plpgsql AS $$
+    BEGIN
+        UPDATE item_counters AS counters
+        SET version = counters.version + 1
+        FROM (SELECT DISTINCT owner_id FROM updated_items ORDER BY owner_id) AS changed
+        WHERE counters.owner_id = changed.owner_id;
+        RETURN NULL;
+    END
+    $$
+    """,
+    "DROP TRIGGER IF EXISTS items_count_insert ON items",
+    """
+    CREATE TRIGGER items_count_insert AFTER INSERT ON items
+    REFERENCING NEW TABLE AS inserted_items
+    FOR EACH STATEMENT EXECUTE FUNCTION item_counters_after_insert()
+    """,
+    "DROP TRIGGER IF EXISTS items_count_delete ON items",
+    """
+    CREATE TRIGGER items_count_delete AFTER DELETE ON items
+    REFERENCING OLD TABLE AS deleted_items
+    FOR EACH STATEMENT EXECUTE FUNCTION item_counters_after_delete()
+    """,
+    "DROP TRIGGER IF EXISTS items_version_update ON items",
+    """
+    CREATE TRIGGER items_version_update AFTER UPDATE ON items
+    REFERENCING NEW TABLE AS updated_items
+    FOR EACH STATEMENT EXECUTE FUNCTION item_counters_after_update()
+    """,
+]
+
+ITEM_COUNTER_TRIGGERS: dict[str, list[str]] = {
+    "sqlite": _SQLITE_CREATE,
+    "postgresql": _POSTGRESQL_CREATE,
+}
+
+
+def install_item_counter_triggers(target: Any, connection: Connection, **kw: Any) -> None:
+    # metadata "after_create" hook, so create_all() matches the migrations.
+    for statement in ITEM_COUNTER_TRIGGERS.get(connection.dialect.name, []):
+        connection.exec_driver_sql(statement)
+
+
+# Title matches rank above description matches ('A' vs 'B' weight).
+_POSTGRESQL_SEARCH_CREATE = [
+    """
+    ALTER TABLE items ADD COLUMN IF NOT EXISTS search_vector tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', coalesce(title, '')), 'A')
+        || setweight(to_tsvector('english', coalesce(description, '')), 'B')
+    ) STORED
+    """,
+    "CREATE INDEX IF NOT EXISTS ix_items_search_vector ON items USING gin (search_vector)",
+]
+
+# External-content FTS5 table: it stores only the index and reads column
+# values from items by rowid. porter stems terms like the english config.
+_SQLITE_SEARCH_CREATE = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS items_fts USING fts5(
+        title, description, content='items', content_rowid='id',
+        tokenize='porter unicode61'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS items_fts_insert AFTER INSERT ON items
+    BEGIN
+        INSERT INTO items_fts (rowid, title, description)
+        VALUES (NEW.id, NEW.title, NEW.description);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS items_fts_delete AFTER DELETE ON items
+    BEGIN
+        INSERT INTO items_fts (items_fts, rowid, title, description)
+        VALUES ('delete', OLD.id, OLD.title, OLD.description);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS items_fts_update AFTER UPDATE OF title, description ON items
+    BEGIN
+        INSERT INTO items_fts (items_fts, rowid, title, description)
+        VALUES ('delete', OLD.id, OLD.title, OLD.description);
+        INSERT INTO items_fts (rowid, title, description)
+        VALUES (NEW.id, NEW.title, NEW.description);
+    END
+    """,
+]
+
+ITEM_SEARCH_DDL: dict[str, list[str]] = {
+    "sqlite": _SQLITE_SEARCH_CREATE,
+    "postgresql": _POSTGRESQL_SEARCH_CREATE,
+}
+
+
+def install_item_search(target: Any, connection: Connection, **kw: Any) -> None:
+    # metadata "after_create" hook, like install_item_counter_triggers.
+    for statement in ITEM_SEARCH_DDL.get(connection.dialect.name, []):
+        connection.exec_driver_sql(statement)
+
+
+def drop_item_search(target: Any, connection: Connection, **kw: Any) -> None:
+    # metadata "before_drop" hook: items_fts is not in the metadata, so
+    # drop_all() would otherwise leave it behind with stale rows. The
+    # PostgreSQL column and index go with the items table.
+    if connection.dialect.name == "sqlite":
+        connection.exec_driver_sql("DROP TABLE IF EXISTS items_fts")
+
+
+ITEM_TITLE_PATTERN_INDEX = "ix_items_owner_id_title_pattern"
+ITEM_TITLE_PATTERN_DDL: dict[str, str] = {
+    "postgresql": (
+        f"CREATE INDEX IF NOT EXISTS {ITEM_TITLE_PATTERN_INDEX} "
+        "ON items (owner_id, title text_pattern_ops)"
+    ),
+}
+
+
+def install_item_title_pattern_index(target: Any, connection: Connection, **kw: Any) -> None:
+    # metadata "after_create" hook; the index goes with the items table.
+    statement = ITEM_TITLE_PATTERN_DDL.get(connection.dialect.name)
+    if statement is not None:
+        connection.exec_driver_sql(statement)
+
+
+def is_search_object(name: str | None, type_: str) -> bool:
+    # Search objects created by raw DDL, as seen by Alembic reflection
+    # (FTS5 also creates items_fts_data, items_fts_idx, ... shadow tables).
+    if type_ == "table":
+        return name is not None and (name == "items_fts" or name.startswith("items_fts_"))
+    if type_ == "column":
+        return name == "search_vector"
+    if type_ == "index":
+        return name == "ix_items_search_vector"
+    return False
+
+
+def is_raw_ddl_object(name: str | None, type_: str) -> bool:
+    # Objects created by the raw DDL above, which have no metadata counterpart.
+    return is_search_object(name, type_) or (type_ == "index" and name == ITEM_TITLE_PATTERN_INDEX)
@@ -2,10 +2,26 @@
 
 from datetime import datetime
 
-from sqlalchemy import Boolean, DateTime, ForeignKey, String
+from sqlalchemy import (
+    BigInteger,
+    Boolean,
+    DateTime,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+    event,
+    func,
+)
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.db.base import Base
+from app.db.ddl import (
+    drop_item_search,
+    install_item_counter_triggers,
+    install_item_search,
+    install_item_title_pattern_index,
+)
 from app.utils.time import utcnow
 
 
@@ -28,8 +44,26 @@ class User(Base):
     refresh_tokens: Mapped[list["RefreshToken"]] = relationship(back_populates="user")
 
 
+# Case-insensitive email prefix search for the admin user listing. On
+# PostgreSQL, text_pattern_ops lets LIKE 'prefix%' use the index under any
+# collation.
+Index(
+    "ix_users_email_lower",
+    func.lower(User.email).label("email_lower"),
+    postgresql_ops={"email_lower": "text_pattern_ops"},
+)
+
+
 class Item(Base):
     __tablename__ = "items"
+    # Serve owner-scoped listings (offset and keyset pages) in each supported
+    # sort order, and the created/updated/title range filters.
+    __table_args__ = (
+        Index("ix_items_owner_id_id", "owner_id", "id"),
+        Index("ix_items_owner_id_created_at_id", "owner_id", "created_at", "id"),
+        Index("ix_items_owner_id_updated_at_id", "owner_id", "updated_at", "id"),
+        Index("ix_items_owner_id_title_id", "owner_id", "title", "id"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True, index=True)
     title: Mapped[str] = mapped_column(String(255))
@@ -45,6 +79,25 @@ class Item(Base):
     owner: Mapped["User"] = relationship(back_populates="items")
 
 
+class ItemCounter(Base):
+    # Per-owner item count maintained by database triggers (app/db/ddl.py);
+    # never written by application code.
+    __tablename__ = "item_counters"
+
+    owner_id: Mapped[int] = mapped_column(
+        ForeignKey("users.id", ondelete="CASCADE"), primary_key=True
+    )
+    item_count: Mapped[int] = mapped_column(Integer, default=0)
+    # Bumped by every insert, update and delete of the owner's items.
+    version: Mapped[int] = mapped_column(BigInteger, default=0, server_default="0")
+
+
+event.listen(Base.metadata, "after_create", install_item_counter_triggers)
+event.listen(Base.metadata, "after_create", install_item_search)
+event.listen(Base.metadata, "after_create", install_item_title_pattern_index)
+event.listen(Base.metadata, "before_drop", drop_item_search)
+
+
 class RefreshToken(Base):
     __tablename__ = "refresh_tokens"
 
@@ -61,3 +114,17 @@ class RefreshToken(Base):
     expires_at: Mapped[datetime] = mapped_column(DateTime(timezone=True))
 
     user: Mapped["User"] = relationship(back_populates="refresh_tokens")
+
+
+class SessionEpoch(Base):
+    # Per-user counter embedded in stateless access tokens; bumping it revokes
+    # every access token issued with an older value.
+    __tablename__ = "session_epochs"
+
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id"), primary_key=True)
+    epoch: Mapped[int] = mapped_column(Integer, default=0)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        default=utcnow,
+        onupdate=utcnow,
+    )
@@ -0,0 +1,242 @@
+# Read-replica routing for read-only routes.
+#
+# Replica engines are built from SQLALCHEMY_REPLICA_URIS and polled by a
+# background health check. A replica that cannot be reached, or whose replay
+# lag exceeds REPLICA_MAX_LAG_SECONDS, leaves the rotation until a later check
+# passes; with no healthy replica, reads go to the primary.
+#
+# Read-your-writes: when a primary session that wrote rows on behalf of an
+# authenticated user commits, that user is pinned to the primary for
+# READ_YOUR_WRITES_SECONDS so their next reads cannot hit a stale replica.
+# Pins are process-local, and also shared through Redis when
+# READ_YOUR_WRITES_BACKEND=redis so other workers honour them; the shared pin
+# is written before commit() returns to the endpoint.
+
+import asyncio
+from functools import partial
+import itertools
+import logging
+import math
+import time
+from typing import Any
+
+from sqlalchemy import event, text
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
+from sqlalchemy.orm import ORMExecuteState, Session
+
+from app.core.cache import CacheBackend, get_shared_cache
+from app.core.config import settings
+from app.core.metrics import DB_READ_SESSIONS, DB_REPLICA_HEALTHY, DB_REPLICA_LAG_SECONDS
+from app.db.session import AFTER_COMMIT_CALLBACKS_KEY, PrimarySession, SessionLocal, build_engine
+
+logger = logging.getLogger("app.db.replicas")
+
+# Session.info key naming the user a primary session acts for (set by
+# get_current_user); commits that wrote rows pin this user.
+PRINCIPAL_ID_KEY = "principal_id"
+_WROTE_KEY = "wrote_rows"
+_MAX_LOCAL_PINS = 100_000
+
+# Replay lag in seconds. A replica that has replayed everything it received
+# reports 0; otherwise an idle primary would look like a growing lag.
+_POSTGRESQL_LAG_QUERY = text(
+    "SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) END"
+)
+
+
+class Replica:
+    def __init__(self, name: str, engine: AsyncEngine) -> None:
+        self.name = name
+        self.engine = engine
+        self.sessionmaker = async_sessionmaker(
+            bind=engine,
+            class_=AsyncSession,
+            autocommit=False,
+            autoflush=False,
+            expire_on_commit=False,
+        )
+        # Optimistic until the first health check says otherwise.
+        self.status = "healthy"
+        self.lag_seconds: float | None = None
+        DB_REPLICA_HEALTHY.labels(replica=name).set(1)
+
+    @property
+    def healthy(self) -> bool:
+        return self.status == "healthy"
+
+    def set_status(self, status: str, lag_seconds: float | None = None) -> None:
+        if status != self.status:
+            logger.warning(
+                "replica.status_changed",
+                extra={"replica": self.name, "status": status, "lag_seconds": lag_seconds},
+            )
+        self.status = status
+        self.lag_seconds = lag_seconds
+        DB_REPLICA_HEALTHY.labels(replica=self.name).set(1 if status == "healthy" else 0)
+        if lag_seconds is not None:
+            DB_REPLICA_LAG_SECONDS.labels(replica=self.name).set(lag_seconds)
+
+    async def measure_lag(self) -> float:
+        async with self.engine.connect() as conn:
+            if self.engine.dialect.name == "postgresql":
+                return float((await conn.execute(_POSTGRESQL_LAG_QUERY)).scalar_one())
+            # No replication on other backends; only check connectivity.
+            await conn.execute(text("SELECT 1"))
+            return 0.0
+
+
+class ReplicaRouter:
+    def __init__(
+        self,
+        replicas: list[Replica],
+        *,
+        max_lag_seconds: float,
+        pin_seconds: float,
+        pin_backend: CacheBackend | None = None,
+    ) -> None:
+        self.replicas = replicas
+        self._max_lag_seconds = max_lag_seconds
+        self._pin_seconds = pin_seconds
+        self._pin_backend = pin_backend
+        self._pins: dict[int, float] = {}
+        self._next = itertools.count()
+
+    @staticmethod
+    def _pin_key(user_id: int) -> str:
+        return f"replica_pin:{user_id}"
+
+    def choose(self) -> Replica | None:
+        # Round-robin over the replicas currently in rotation.
+        healthy = [replica for replica in self.replicas if replica.healthy]
+        if not healthy:
+            return None
+        return healthy[next(self._next) % len(healthy)]
+
+    def pin(self, user_id: int) -> None:
+        # Process-local pin; see share_pin for the shared one.
+        if not self.replicas or self._pin_seconds <= 0:
+            return
+        now = time.monotonic()
+        if len(self._pins) >= _MAX_LOCAL_PINS:
+            self._pins = {key: until for key, until in self._pins.items() if until > now}
+        self._pins[user_id] = now + self._pin_seconds
+
+    @property
+    def shares_pins(self) -> bool:
+        return self._pin_backend is not None and bool(self.replicas) and self._pin_seconds > 0
+
+    async def share_pin(self, user_id: int) -> None:
+        # Pin the user for other workers too (READ_YOUR_WRITES_BACKEND=redis).
+        if self._pin_backend is None or not self.shares_pins:
+            return
+        await self._pin_backend.set(
+            self._pin_key(user_id), b"1", max(1, math.ceil(self._pin_seconds))
+        )
+
+    async def is_pinned(self, user_id: int) -> bool:
+        until = self._pins.get(user_id)
+        if until is not None:
+            if time.monotonic() < until:
+                return True
+            self._pins.pop(user_id, None)
+        if self._pin_backend is None:
+            return False
+        return await self._pin_backend.get(self._pin_key(user_id)) is not None
+
+    async def read_session(self, user_id: int) -> AsyncSession:
+        # A session on a healthy replica, or on the primary when the user is
+        # pinned or no replica can be reached.
+        if self.replicas and not await self.is_pinned(user_id):
+            while (replica := self.choose()) is not None:
+                db = replica.sessionmaker()
+                try:
+                    # Connect now so an unreachable replica falls back here
+                    # instead of failing the request.
+                    await db.connection()
+                except (SQLAlchemyError, OSError):
+                    await db.close()
+                    replica.set_status("down")
+                    continue
+                DB_READ_SESSIONS.labels(target="replica").inc()
+                return db
+        DB_READ_SESSIONS.labels(target="primary").inc()
+        return SessionLocal()
+
+    async def check(self, replica: Replica, timeout_seconds: float) -> None:
+        try:
+            lag_seconds = await asyncio.wait_for(replica.measure_lag(), timeout_seconds)
+        except (SQLAlchemyError, OSError, asyncio.TimeoutError):
+            replica.set_status("down")
+            return
+        status = "healthy" if lag_seconds <= self._max_lag_seconds else "lagging"
+        replica.set_status(status, lag_seconds)
+
+    async def check_all(self, timeout_seconds: float) -> None:
+        await asyncio.gather(*(self.check(replica, timeout_seconds) for replica in self.replicas))
+
+    def statuses(self) -> dict[str, str]:
+        return {replica.name: replica.status for replica in self.replicas}
+
+    async def dispose(self) -> None:
+        for replica in self.replicas:
+            await replica.engine.dispose()
+
+
+async def run_replica_health_check_loop(router: ReplicaRouter, interval_seconds: float) -> None:
+    # Periodic replica checks for the app lifespan; each check bounds itself
+    # to one interval so a hung replica cannot stall the loop.
+    while True:
+        try:
+            await router.check_all(interval_seconds)
+        except Exception:
+            logger.exception("replica.health_check_failed")
+        await asyncio.sleep(interval_seconds)
+
+
+def build_replica_router() -> ReplicaRouter:
+    replicas = [
+        Replica(f"replica{index}", build_engine(uri, f"replica{index}"))
+        for index, uri in enumerate(settings.SQLALCHEMY_REPLICA_URIS)
+    ]
+    return ReplicaRouter(
+        replicas,
+        max_lag_seconds=settings.REPLICA_MAX_LAG_SECONDS,
+        pin_seconds=settings.READ_YOUR_WRITES_SECONDS,
+        pin_backend=get_shared_cache() if settings.READ_YOUR_WRITES_BACKEND == "redis" else None,
+    )
+
+
+replica_router = build_replica_router()
+
+
+@event.listens_for(PrimarySession, "do_orm_execute")
+def _track_statement_writes(state: ORMExecuteState) -> None:
+    if state.is_insert or state.is_update or state.is_delete:
+        state.session.info[_WROTE_KEY] = True
+
+
+@event.listens_for(PrimarySession, "after_flush")
+def _track_flush_writes(session: Session, flush_context: Any) -> None:
+    session.info[_WROTE_KEY] = True
+
+
+@event.listens_for(PrimarySession, "after_commit")
+def _pin_writer(session: Session) -> None:
+    if not session.info.pop(_WROTE_KEY, False):
+        return
+    user_id = session.info.get(PRINCIPAL_ID_KEY)
+    if isinstance(user_id, int):
+        replica_router.pin(user_id)
+        if replica_router.shares_pins:
+            # The hook is synchronous; PrimaryAsyncSession.commit awaits the
+            # shared write before returning, so the pin exists before the
+            # response goes out.
+            callbacks = session.info.setdefault(AFTER_COMMIT_CALLBACKS_KEY, [])
+            callbacks.append(partial(replica_router.share_pin, user_id))
+
+
+@event.listens_for(PrimarySession, "after_rollback")
+def _forget_writes(session: Session) -> None:
+    session.info.pop(_WROTE_KEY, None)
@@ -1,8 +1,21 @@
 # Database engine and session factory configuration.
 
-from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from time import perf_counter
+from typing import Any
+from uuid import uuid4
+
+from sqlalchemy import exc as sa_exc
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import AsyncAdaptedQueuePool, PoolProxiedConnection, QueuePool
 
 from app.core.config import settings
+from app.core.metrics import DB_POOL_CHECKOUT_SECONDS, DB_POOL_CHECKOUT_TIMEOUTS, DB_POOL_STATS
 
 
 def to_async_database_uri(uri: str) -> str:
@@ -20,11 +33,111 @@ def to_async_database_uri(uri: str) -> str:
     return uri
 
 
-engine = create_async_engine(to_async_database_uri(settings.SQLALCHEMY_DATABASE_URI))
+class TimedAsyncQueuePool(AsyncAdaptedQueuePool):
+    # Queue pool that records checkout latency per pool (the engine's
+    # pool_logging_name), including time spent waiting for a free connection.
+
+    def connect(self) -> PoolProxiedConnection:
+        pool = self.logging_name or "default"
+        started = perf_counter()
+        try:
+            return super().connect()
+        except sa_exc.TimeoutError:
+            DB_POOL_CHECKOUT_TIMEOUTS.labels(pool=pool).inc()
+            raise
+        finally:
+            DB_POOL_CHECKOUT_SECONDS.labels(pool=pool).observe(perf_counter() - started)
+
+
+def _pgbouncer_statement_name() -> str:
+    # PgBouncer transaction pooling may hand each transaction a different
+    # server connection, so statement names must never collide.
+    return f"__asyncpg_{uuid4()}__"
+
+
+def engine_options(uri: str) -> dict[str, Any]:
+    # create_async_engine keyword arguments for the configured pool/driver.
+    async_uri = to_async_database_uri(uri)
+    options: dict[str, Any] = {
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+        "pool_recycle": settings.DB_POOL_RECYCLE_SECONDS,
+    }
+    if async_uri.startswith("sqlite") and (
+        ":memory:" in async_uri or async_uri.rstrip("/").endswith("sqlite+aiosqlite:")
+    ):
+        # In-memory SQLite uses a single shared connection (StaticPool).
+        return options
+    options.update(
+        poolclass=TimedAsyncQueuePool,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT_SECONDS,
+    )
+    if async_uri.startswith("postgresql+asyncpg://"):
+        cache_size = 0 if settings.DB_PGBOUNCER_MODE else settings.DB_STATEMENT_CACHE_SIZE
+        connect_args: dict[str, Any] = {
+            # asyncpg's own cache and SQLAlchemy's adapter-level cache.
+            "statement_cache_size": cache_size,
+            "prepared_statement_cache_size": cache_size,
+        }
+        if settings.DB_PGBOUNCER_MODE:
+            connect_args["prepared_statement_name_func"] = _pgbouncer_statement_name
+        options["connect_args"] = connect_args
+    return options
+
+
+def register_pool_metrics(engine: AsyncEngine, pool_name: str) -> None:
+    def _stats() -> tuple[int, int, int]:
+        # Read engine.pool at scrape time; dispose() swaps in a new pool.
+        pool = engine.sync_engine.pool
+        if not isinstance(pool, QueuePool):
+            return 0, 0, 0
+        return pool.size(), pool.checkedout(), pool.overflow()
+
+    DB_POOL_STATS.add_source(pool_name, _stats)
+
+
+def build_engine(uri: str, pool_name: str) -> AsyncEngine:
+    built = create_async_engine(
+        to_async_database_uri(uri),
+        pool_logging_name=pool_name,
+        **engine_options(uri),
+    )
+    register_pool_metrics(built, pool_name)
+    return built
+
+
+# Session.info key holding async callbacks queued by sync after_commit hooks;
+# PrimaryAsyncSession.commit awaits them before returning.
+AFTER_COMMIT_CALLBACKS_KEY = "after_commit_callbacks"
+
+
+class PrimarySession(Session):
+    # Sync session class behind SessionLocal, so app.db.replicas can hook
+    # commits on the primary without affecting replica sessions.
+    pass
+
+
+class PrimaryAsyncSession(AsyncSession):
+    # Commit hooks run synchronously; I/O they need (such as the shared
+    # read-your-writes pin) is queued and finished here, so it is done before
+    # the endpoint continues or the response goes out.
+    async def commit(self) -> None:
+        await super().commit()
+        callbacks = self.info.pop(AFTER_COMMIT_CALLBACKS_KEY, None) or []
+        for callback in callbacks:
+            await callback()
+
+
+engine = build_engine(settings.SQLALCHEMY_DATABASE_URI, "primary")
 
 SessionLocal = async_sessionmaker(
     bind=engine,
-    class_=AsyncSession,
+    class_=PrimaryAsyncSession,
+    sync_session_class=PrimarySession,
     autocommit=False,
     autoflush=False,
+    # Objects stay usable after commit without a reload; services that need
+    # database-side changes re-select explicitly.
+    expire_on_commit=False,
 )
@@ -1,10 +1,11 @@
 # FastAPI application setup, middleware, and global error handling.
 
+import asyncio
 from collections.abc import Sequence
 from collections.abc import AsyncIterator
 from collections.abc import Awaitable
 from collections.abc import Callable
-from contextlib import asynccontextmanager
+from contextlib import asynccontextmanager, suppress
 import logging
 from time import perf_counter
 from uuid import uuid4
@@ -21,12 +22,17 @@ from sqlalchemy import text
 from sqlalchemy.exc import IntegrityError, SQLAlchemyError
 
 from app.api.v1.api import api_router
+from app.core.breached_passwords import get_breached_password_filter
 from app.core.config import settings
+from app.core.hashing import shutdown_password_pool
 from app.core.logging import configure_logging, reset_request_id, set_request_id
 from app.core.metrics import IN_PROGRESS, metrics_payload, record_request
 from app.core.rate_limit import limiter
 from app.db.base import Base
+from app.db.replicas import replica_router, run_replica_health_check_loop
 from app.db.session import engine
+from app.services.password_rehash import drain_password_rehashes
+from app.services.refresh_token_purge import run_refresh_token_purge_loop
 
 configure_logging()
 logger = logging.getLogger("app.request")
@@ -38,7 +44,27 @@ async def lifespan(app: FastAPI) -> AsyncIterator[None]:
     if settings.AUTO_CREATE_SCHEMA:
         async with engine.begin() as conn:
             await conn.run_sync(Base.metadata.create_all)
+    # Open the breached password filter now so a bad path fails at startup.
+    get_breached_password_filter()
+    purge_task: asyncio.Task[None] | None = None
+    if settings.REFRESH_TOKEN_STORE == "sql" and settings.REFRESH_TOKEN_PURGE_INTERVAL_SECONDS > 0:
+        purge_task = asyncio.create_task(
+            run_refresh_token_purge_loop(settings.REFRESH_TOKEN_PURGE_INTERVAL_SECONDS)
+        )
+    replica_task: asyncio.Task[None] | None = None
+    if replica_router.replicas:
+        interval = settings.REPLICA_HEALTH_CHECK_INTERVAL_SECONDS
+        await replica_router.check_all(interval)
+        replica_task = asyncio.create_task(run_replica_health_check_loop(replica_router, interval))
     yield
+    for task in (purge_task, replica_task):
+        if task is not None:
+            task.cancel()
+            with suppress(asyncio.CancelledError):
+                await task
+    await drain_password_rehashes()
+    await shutdown_password_pool()
+    await replica_router.dispose()
     await engine.dispose()
 
 
@@ -54,6 +80,8 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # Let browser clients read the user listing's next-page cursor.
+    expose_headers=["X-Next-Cursor"],
 )
 
 
@@ -147,6 +175,7 @@ async def http_exception_handler(request: Request, exc: HTTPException) -> JSONRe
     return JSONResponse(
         status_code=exc.status_code,
         content=error_payload(detail=str(exc.detail), code=code),
+        headers=exc.headers,
     )
 
 
@@ -194,10 +223,13 @@ async def health_live() -> dict[str, str]:
 @app.get("/health/ready")
 async def health_ready() -> Response:
     database_ok = await _database_connected()
-    payload = {
+    payload: dict[str, object] = {
         "status": "ok" if database_ok else "degraded",
         "database": "connected" if database_ok else "disconnected",
     }
+    if replica_router.replicas:
+        # Informational only: reads fall back to the primary without replicas.
+        payload["replicas"] = replica_router.statuses()
     status_code = 200 if database_ok else 503
     return JSONResponse(status_code=status_code, content=payload)
 
@@ -1,6 +1,6 @@
 # Pydantic schemas for authentication flows.
 
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 
 
 class Token(BaseModel):
@@ -13,6 +13,17 @@ class TokenPayload(BaseModel):
     sub: str
 
 
+class Principal(BaseModel):
+    # Lightweight snapshot of the authenticated user.
+
+    id: int
+    email: str
+    is_active: bool
+    is_admin: bool
+
+    model_config = ConfigDict(from_attributes=True, frozen=True)
+
+
 class LoginRequest(BaseModel):
     email: str
     password: str
@@ -1,6 +1,10 @@
 # Pydantic schemas for item data exchange.
 
-from pydantic import BaseModel, ConfigDict
+from typing import Any, Literal, Self
+
+from pydantic import BaseModel, ConfigDict, Field, field_validator, model_validator
+
+from app.core.config import settings
 
 
 class ItemBase(BaseModel):
@@ -25,9 +29,105 @@ class ItemOut(ItemBase):
 
 
 class ItemListResponse(BaseModel):
-    # Paginated response for list of items.
+    # Paginated response for list of items. total is null unless requested
+    # (the default for skip pages); total_kind says how it was computed:
+    # exact (COUNT), maintained (trigger-kept counter) or estimated (planner).
+
+    items: list[ItemOut]
+    total: int | None
+    total_kind: Literal["exact", "maintained", "estimated"] | None = None
+    skip: int
+    limit: int
+    next_cursor: str | None = None
+    prev_cursor: str | None = None
+
+
+class ItemSearchResponse(BaseModel):
+    # One page of search hits, best match first.
 
     items: list[ItemOut]
-    total: int
     skip: int
     limit: int
+    has_more: bool
+
+
+def _validate_batch(values: list[Any]) -> list[Any]:
+    if len(values) > settings.ITEMS_BULK_MAX_SIZE:
+        raise ValueError(f"At most {settings.ITEMS_BULK_MAX_SIZE} entries per request")
+    return values
+
+
+def _reject_duplicate_ids(ids: list[int]) -> None:
+    if len(set(ids)) != len(ids):
+        raise ValueError("Item ids must be unique within a request")
+
+
+class ItemBulkCreate(BaseModel):
+    items: list[ItemCreate] = Field(min_length=1)
+
+    @field_validator("items")
+    @classmethod
+    def validate_items(cls, value: list[ItemCreate]) -> list[ItemCreate]:
+        return _validate_batch(value)
+
+
+class ItemBulkUpdateEntry(ItemUpdate):
+    # Omitted fields keep their value; an explicit null clears description.
+    id: int
+
+    @model_validator(mode="after")
+    def validate_title(self) -> Self:
+        if "title" in self.model_fields_set and self.title is None:
+            raise ValueError("title cannot be null")
+        return self
+
+
+class ItemBulkUpdate(BaseModel):
+    items: list[ItemBulkUpdateEntry] = Field(min_length=1)
+
+    @field_validator("items")
+    @classmethod
+    def validate_items(cls, value: list[ItemBulkUpdateEntry]) -> list[ItemBulkUpdateEntry]:
+        _reject_duplicate_ids([entry.id for entry in value])
+        return _validate_batch(value)
+
+
+class ItemBulkDelete(BaseModel):
+    ids: list[int] = Field(min_length=1)
+
+    @field_validator("ids")
+    @classmethod
+    def validate_ids(cls, value: list[int]) -> list[int]:
+        _reject_duplicate_ids(value)
+        return _validate_batch(value)
+
+
+class ItemBulkResult(BaseModel):
+    # Outcome for the entry at `index` in the request, with an HTTP-style
+    # status: 201 created, 200 updated, 204 deleted, 404 not found.
+
+    index: int
+    id: int
+    status: int
+    item: ItemOut | None = None
+
+
+class ItemBulkResponse(BaseModel):
+    results: list[ItemBulkResult]
+
+
+class ItemImportError(BaseModel):
+    # A rejected NDJSON line (1-based) and why.
+
+    line: int
+    detail: str
+
+
+class ItemImportResponse(BaseModel):
+    # Import summary. Only the first ITEMS_IMPORT_MAX_ERRORS errors are
+    # listed; failed counts all of them.
+
+    imported: int
+    failed: int
+    errors: list[ItemImportError]
+    errors_truncated: bool = False
@@ -2,6 +2,8 @@
 
 from pydantic import BaseModel, ConfigDict, EmailStr, field_validator
 
+from app.core.breached_passwords import is_breached_password
+
 
 def validate_password_policy(value: str) -> str:
     if len(value) < 12:
@@ -16,6 +18,8 @@ def validate_password_policy(value: str) -> str:
         raise ValueError("Password must include at least one special character")
     if any(char.isspace() for char in value):
         raise ValueError("Password must not contain spaces")
+    if is_breached_password(value):
+        raise ValueError("Password has appeared in a data breach; choose a different one")
     return value
 
 
@@ -42,6 +46,13 @@ class UserPasswordChange(BaseModel):
         return validate_password_policy(value)
 
 
+class UserAdminUpdate(BaseModel):
+    # Admin-only account flags; omitted fields are left unchanged.
+
+    is_active: bool | None = None
+    is_admin: bool | None = None
+
+
 class UserOut(UserBase):
     id: int
     is_active: bool
@@ -1,20 +1,29 @@
 # Authentication service functions for login and token lifecycle.
 
-from datetime import timedelta
+from datetime import datetime, timedelta
 
-from sqlalchemy import select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.config import settings
 from app.core.security import (
+    SESSION_EPOCH_CLAIM,
     create_access_token,
     create_refresh_token,
     hash_refresh_token,
-    verify_password,
+    password_needs_rehash,
+    verify_password_async,
 )
-from app.db.models import RefreshToken, User
-from app.schemas.auth import Token
-from app.services.user_service import get_user_by_email
+from app.db.models import User
+from app.schemas.auth import Principal, Token
+from app.services.password_rehash import schedule_password_rehash
+from app.services.principal_cache import principal_cache
+from app.services.refresh_token_store import get_refresh_token_store
+from app.services.session_epoch_service import (
+    bump_session_epoch,
+    ensure_session_epoch,
+    invalidate_session_epoch,
+)
+from app.services.user_service import get_user_by_email, get_user_by_id
 from app.utils.time import utcnow
 
 
@@ -22,93 +31,95 @@ async def authenticate_user(db: AsyncSession, email: str, password: str) -> User
     user = await get_user_by_email(db, email)
     if not user:
         return None
-    if not verify_password(password, user.hashed_password):
+    if not await verify_password_async(password, user.hashed_password):
+        return None
+    # Checked after the hash so inactive accounts time like wrong passwords.
+    if not user.is_active:
         return None
+    if password_needs_rehash(user.hashed_password):
+        schedule_password_rehash(user.id, user.hashed_password, password)
     return user
 
 
+async def issue_access_token(db: AsyncSession, user: User | Principal) -> str:
+    if not settings.ACCESS_TOKEN_STATELESS:
+        return create_access_token(subject=str(user.id))
+    # Stateless mode: embed what get_current_user needs to authorize without
+    # loading the user, plus the epoch used for revocation.
+    epoch = await ensure_session_epoch(db, user.id)
+    return create_access_token(
+        subject=str(user.id),
+        extra_claims={
+            "email": user.email,
+            "is_active": user.is_active,
+            "is_admin": user.is_admin,
+            SESSION_EPOCH_CLAIM: epoch,
+        },
+    )
+
+
 async def create_user_token(db: AsyncSession, user: User) -> Token:
-    access_token = create_access_token(subject=str(user.id))
+    access_token = await issue_access_token(db, user)
     refresh_token = create_refresh_token()
     await store_refresh_token(db, user.id, refresh_token)
     return Token(access_token=access_token, refresh_token=refresh_token)
 
 
+def _refresh_token_expiry() -> datetime:
+    return utcnow() + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
+
+
 async def store_refresh_token(
     db: AsyncSession,
     user_id: int,
     raw_token: str,
     *,
     commit: bool = True,
-) -> RefreshToken:
-    expires_at = utcnow() + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
-    token_hash = hash_refresh_token(raw_token)
-    record = RefreshToken(
-        user_id=user_id,
-        token_hash=token_hash,
-        expires_at=expires_at,
+) -> None:
+    # `commit` only applies to the SQL store; other stores write immediately.
+    await get_refresh_token_store().store(
+        db,
+        user_id,
+        hash_refresh_token(raw_token),
+        _refresh_token_expiry(),
+        commit=commit,
     )
-    db.add(record)
-    if commit:
-        await db.commit()
-        await db.refresh(record)
-    else:
-        await db.flush()
-    return record
 
 
-async def rotate_refresh_token(db: AsyncSession, raw_token: str) -> Token | None:
-    token_hash = hash_refresh_token(raw_token)
-    async with db.begin():
-        claim_result = await db.execute(
-            update(RefreshToken)
-            .where(
-                RefreshToken.token_hash == token_hash,
-                RefreshToken.revoked.is_(False),
-                RefreshToken.expires_at > utcnow(),
-            )
-            .values(revoked=True)
-            .returning(RefreshToken.user_id)
-        )
-        user_id = claim_result.scalar_one_or_none()
-        if user_id is not None:
-            access_token = create_access_token(subject=str(user_id))
-            new_refresh = create_refresh_token()
-            await store_refresh_token(db, user_id, new_refresh, commit=False)
-            return Token(access_token=access_token, refresh_token=new_refresh)
-
-        record_result = await db.execute(
-            select(RefreshToken).where(RefreshToken.token_hash == token_hash)
-        )
-        record: RefreshToken | None = record_result.scalars().first()
-        if not record:
-            return None
-
-        if record.revoked:
-            # Defensive: a reused refresh token invalidates all sessions for the user.
-            await db.execute(
-                update(RefreshToken)
-                .where(RefreshToken.user_id == record.user_id)
-                .values(revoked=True)
-            )
-            return None
+async def _access_token_for_rotation(db: AsyncSession, user_id: int) -> str | None:
+    if not settings.ACCESS_TOKEN_STATELESS:
+        return create_access_token(subject=str(user_id))
+    user: User | Principal | None = await principal_cache.get(user_id)
+    if user is None:
+        user = await get_user_by_id(db, user_id)
+    if user is None:
+        return None
+    return await issue_access_token(db, user)
+
 
+async def rotate_refresh_token(db: AsyncSession, raw_token: str) -> Token | None:
+    store = get_refresh_token_store()
+    new_refresh = create_refresh_token()
+    new_hash = hash_refresh_token(new_refresh)
+    user_id = await store.rotate(
+        db, hash_refresh_token(raw_token), new_hash, _refresh_token_expiry()
+    )
+    if user_id is None:
         return None
+    access_token = await _access_token_for_rotation(db, user_id)
+    if access_token is None:
+        # The user no longer exists; don't leave the replacement usable.
+        await store.revoke(db, new_hash)
+        return None
+    return Token(access_token=access_token, refresh_token=new_refresh)
 
 
 async def revoke_refresh_token(db: AsyncSession, raw_token: str) -> bool:
-    token_hash = hash_refresh_token(raw_token)
-    result = await db.execute(select(RefreshToken).where(RefreshToken.token_hash == token_hash))
-    record = result.scalars().first()
-    if not record or record.revoked:
-        return False
-    record.revoked = True
-    await db.commit()
-    return True
+    return await get_refresh_token_store().revoke(db, hash_refresh_token(raw_token))
 
 
 async def revoke_all_refresh_tokens(db: AsyncSession, user_id: int) -> None:
-    await db.execute(
-        update(RefreshToken).where(RefreshToken.user_id == user_id).values(revoked=True)
-    )
+    await get_refresh_token_store().revoke_all(db, user_id)
+    await bump_session_epoch(db, user_id)
     await db.commit()
+    await invalidate_session_epoch(user_id)
@@ -0,0 +1,125 @@
+# Read-through cache of serialized item responses (GET /items, GET /items/{id}).
+#
+# Entries are stored under owner-scoped, generation-versioned keys:
+#
+#   items:<owner_id>:generation                   -> random token
+#   items:<owner_id>:<generation>:<kind>:<digest> -> "<etag>\n<json body>"
+#
+# A write for the owner deletes the generation key after committing, so the
+# next read starts a new generation and every older entry becomes
+# unreachable (it then expires by TTL). A read takes the generation before
+# querying the database, so a page read before a concurrent commit is stored
+# under the generation that commit retires and can never be served.
+#
+# Backends fail open (see app.core.cache): with Redis unavailable every read
+# is a miss and goes to the database.
+#
+# Generations must be shared by every worker, so the "local" backend is for
+# single-process deployments only; Settings rejects it with WEB_CONCURRENCY > 1.
+
+import hashlib
+import secrets
+import time
+from typing import NamedTuple
+
+from app.core.cache import CacheBackend, MemoryCache, select_cache
+from app.core.config import settings
+from app.core.metrics import (
+    ITEM_RESPONSE_CACHE_HITS,
+    ITEM_RESPONSE_CACHE_MISSES,
+    ITEM_RESPONSE_CACHE_SECONDS,
+)
+
+# Losing a generation only costs misses, so it can outlive entries by far.
+_GENERATION_TTL_SECONDS = 24 * 60 * 60
+
+
+class CachedResponse(NamedTuple):
+    etag: str | None
+    body: bytes
+
+
+class ItemResponseCache:
+    def __init__(self, backend: CacheBackend | None, ttl_seconds: int) -> None:
+        self._backend = backend
+        self._ttl_seconds = ttl_seconds
+
+    @property
+    def enabled(self) -> bool:
+        return self._backend is not None and self._ttl_seconds > 0
+
+    @staticmethod
+    def _generation_key(owner_id: int) -> str:
+        return f"items:{owner_id}:generation"
+
+    @staticmethod
+    def _entry_key(owner_id: int, generation: str, kind: str, key: str) -> str:
+        digest = hashlib.blake2b(key.encode("utf-8"), digest_size=16).hexdigest()
+        return f"items:{owner_id}:{generation}:{kind}:{digest}"
+
+    async def generation(self, owner_id: int) -> str | None:
+        # The owner's current generation, started on first use; None when
+        # the cache is disabled.
+        if self._backend is None or not self.enabled:
+            return None
+        start = time.perf_counter()
+        key = self._generation_key(owner_id)
+        raw = await self._backend.get(key)
+        if raw is None:
+            # Two readers may race to start a generation; the loser's entries
+            # are simply never read.
+            generation = secrets.token_hex(8)
+            await self._backend.set(key, generation.encode("ascii"), _GENERATION_TTL_SECONDS)
+        else:
+            generation = raw.decode("ascii", errors="replace")
+        ITEM_RESPONSE_CACHE_SECONDS.labels(operation="generation").observe(
+            time.perf_counter() - start
+        )
+        return generation
+
+    async def get(
+        self, owner_id: int, generation: str, kind: str, key: str
+    ) -> CachedResponse | None:
+        if self._backend is None:
+            return None
+        start = time.perf_counter()
+        raw = await self._backend.get(self._entry_key(owner_id, generation, kind, key))
+        ITEM_RESPONSE_CACHE_SECONDS.labels(operation="get").observe(time.perf_counter() - start)
+        if raw is None:
+            ITEM_RESPONSE_CACHE_MISSES.labels(kind=kind).inc()
+            return None
+        ITEM_RESPONSE_CACHE_HITS.labels(kind=kind).inc()
+        etag, _, body = raw.partition(b"\n")
+        return CachedResponse(etag.decode("utf-8") or None, body)
+
+    async def set(
+        self, owner_id: int, generation: str, kind: str, key: str, response: CachedResponse
+    ) -> None:
+        if self._backend is None:
+            return
+        start = time.perf_counter()
+        raw = (response.etag or "").encode("utf-8") + b"\n" + response.body
+        await self._backend.set(
+            self._entry_key(owner_id, generation, kind, key), raw, self._ttl_seconds
+        )
+        ITEM_RESPONSE_CACHE_SECONDS.labels(operation="set").observe(time.perf_counter() - start)
+
+    async def invalidate(self, owner_id: int) -> None:
+        # Call after committing any write to the owner's items.
+        if self._backend is None:
+            return
+        start = time.perf_counter()
+        await self._backend.delete(self._generation_key(owner_id))
+        ITEM_RESPONSE_CACHE_SECONDS.labels(operation="invalidate").observe(
+            time.perf_counter() - start
+        )
+
+    def clear(self) -> None:
+        if isinstance(self._backend, MemoryCache):
+            self._backend.clear()
+
+
+item_cache = ItemResponseCache(
+    select_cache(settings.ITEMS_RESPONSE_CACHE_BACKEND, settings.ITEMS_RESPONSE_CACHE_MAX_ENTRIES),
+    ttl_seconds=settings.CACHE_TTL_SECONDS,
+)
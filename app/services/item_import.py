@@ -0,0 +1,164 @@
+# Bulk NDJSON item import (POST /items/import and app.commands.import_items).
+#
+# The upload is read as a stream of byte chunks and split into lines, so at
+# most one line and one batch are held in memory whatever the file size.
+# Each line is validated against ItemCreate (extra keys such as the id and
+# owner_id of an export are ignored). Valid rows are written and committed
+# ITEMS_IMPORT_BATCH_SIZE at a time: an import that fails part-way keeps the
+# batches already written, and the counts say how far it got.
+#
+# PostgreSQL batches use COPY through asyncpg (copy_records_to_table); other
+# databases take one multi-row INSERT per batch. Both fire the item counter
+# triggers, and each committed batch retires the owner's cached item responses.
+
+from collections.abc import AsyncIterable, AsyncIterator, Callable
+import logging
+
+from pydantic import ValidationError
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.metrics import ITEMS_IMPORTED
+from app.db.models import Item
+from app.schemas.item import ItemCreate, ItemImportError, ItemImportResponse
+from app.services.item_cache import item_cache
+from app.utils.time import utcnow
+
+logger = logging.getLogger("app.item_import")
+
+MAX_LINE_BYTES = 64 * 1024
+# items.title and items.description are String(255).
+_MAX_TEXT_LENGTH = 255
+_COPY_COLUMNS = ["title", "description", "owner_id", "created_at", "updated_at"]
+
+ProgressCallback = Callable[[ItemImportResponse], None]
+
+
+async def iter_lines(
+    chunks: AsyncIterable[bytes], max_line_bytes: int = MAX_LINE_BYTES
+) -> AsyncIterator[bytes | None]:
+    # Yield each line without its newline. A line longer than max_line_bytes
+    # is dropped as it arrives and yielded as None, so it is never buffered.
+    buffer = bytearray()
+    too_long = False
+    async for chunk in chunks:
+        start = 0
+        while (end := chunk.find(b"\n", start)) != -1:
+            if not too_long:
+                buffer += chunk[start:end]
+            yield None if too_long or len(buffer) > max_line_bytes else bytes(buffer)
+            buffer.clear()
+            too_long = False
+            start = end + 1
+        if not too_long:
+            buffer += chunk[start:]
+            if len(buffer) > max_line_bytes:
+                buffer.clear()
+                too_long = True
+    if too_long:
+        yield None
+    elif buffer:
+        yield bytes(buffer)
+
+
+def _describe(exc: ValidationError) -> str:
+    messages = []
+    for error in exc.errors(include_url=False):
+        location = ".".join(str(part) for part in error["loc"])
+        messages.append(f"{location}: {error['msg']}" if location else error["msg"])
+    return "; ".join(messages)
+
+
+def parse_line(line: bytes | None) -> ItemCreate:
+    # Validate one NDJSON line; ValueError carries the message to report.
+    if line is None:
+        raise ValueError(f"Line is longer than {MAX_LINE_BYTES} bytes")
+    try:
+        item = ItemCreate.model_validate_json(line)
+    except ValidationError as exc:
+        raise ValueError(_describe(exc)) from None
+    for field in ("title", "description"):
+        value = getattr(item, field)
+        if value is not None and len(value) > _MAX_TEXT_LENGTH:
+            raise ValueError(f"{field}: String should have at most {_MAX_TEXT_LENGTH} characters")
+    return item
+
+
+async def _write_batch(db: AsyncSession, owner_id: int, batch: list[ItemCreate]) -> None:
+    now = utcnow()
+    if db.get_bind().dialect.name == "postgresql":
+        connection = await db.connection()
+        raw = await connection.get_raw_connection()
+        if raw.driver_connection is None:
+            raise RuntimeError("No driver connection for COPY")
+        await raw.driver_connection.copy_records_to_table(
+            Item.__tablename__,
+            records=[(item.title, item.description, owner_id, now, now) for item in batch],
+            columns=_COPY_COLUMNS,
+        )
+    else:
+        rows = [
+            {
+                "title": item.title,
+                "description": item.description,
+                "owner_id": owner_id,
+                "created_at": now,
+                "updated_at": now,
+            }
+            for item in batch
+        ]
+        await db.execute(insert(Item), rows)
+    await db.commit()
+    await item_cache.invalidate(owner_id)
+
+
+async def import_items(
+    db: AsyncSession,
+    owner_id: int,
+    chunks: AsyncIterable[bytes],
+    *,
+    batch_size: int | None = None,
+    max_errors: int | None = None,
+    on_progress: ProgressCallback | None = None,
+) -> ItemImportResponse:
+    # Import NDJSON items for owner_id; on_progress sees the running report
+    # after every committed batch.
+    batch_size = batch_size or settings.ITEMS_IMPORT_BATCH_SIZE
+    if max_errors is None:
+        max_errors = settings.ITEMS_IMPORT_MAX_ERRORS
+    report = ItemImportResponse(imported=0, failed=0, errors=[])
+    batch: list[ItemCreate] = []
+
+    async def _flush() -> None:
+        await _write_batch(db, owner_id, batch)
+        report.imported += len(batch)
+        ITEMS_IMPORTED.labels(result="imported").inc(len(batch))
+        batch.clear()
+        logger.info(
+            "items.import_batch",
+            extra={"owner_id": owner_id, "imported": report.imported, "failed": report.failed},
+        )
+        if on_progress is not None:
+            on_progress(report)
+
+    line_number = 0
+    async for line in iter_lines(chunks):
+        line_number += 1
+        if line is not None and not line.strip():
+            continue
+        try:
+            batch.append(parse_line(line))
+        except ValueError as exc:
+            report.failed += 1
+            ITEMS_IMPORTED.labels(result="failed").inc()
+            if len(report.errors) < max_errors:
+                report.errors.append(ItemImportError(line=line_number, detail=str(exc)))
+            else:
+                report.errors_truncated = True
+            continue
+        if len(batch) >= batch_size:
+            await _flush()
+    if batch:
+        await _flush()
+    return report
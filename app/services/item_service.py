@@ -0,0 +1,386 @@
+# Item queries shared by the item endpoints.
+
+from collections.abc import Sequence
+from datetime import datetime, timezone
+import json
+import re
+from typing import Any, Literal
+
+from sqlalchemy import (
+    ColumnElement,
+    Select,
+    case,
+    column,
+    delete,
+    func,
+    insert,
+    literal_column,
+    select,
+    table,
+    text,
+    tuple_,
+    update,
+)
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.models import Item, ItemCounter
+from app.schemas.item import ItemBulkUpdateEntry, ItemCreate, ItemUpdate
+from app.utils.pagination import (
+    InvalidCursorError,
+    decode_cursor,
+    decode_keyset_cursor,
+    encode_cursor,
+    encode_keyset_cursor,
+)
+from app.utils.sql import prefix_match
+from app.utils.time import utcnow
+
+TotalKind = Literal["exact", "maintained", "estimated"]
+# Listing orders; a leading "-" sorts descending. Each one is served by an
+# (owner_id, <column>, id) index, id last as the tie-breaker.
+ItemSort = Literal[
+    "id", "-id", "created_at", "-created_at", "updated_at", "-updated_at", "title", "-title"
+]
+# A keyset position: the sort column's value and the row id.
+ItemPosition = tuple[Any, int]
+
+_SORT_COLUMNS: dict[str, Any] = {
+    "id": Item.id,
+    "created_at": Item.created_at,
+    "updated_at": Item.updated_at,
+    "title": Item.title,
+}
+
+
+def _total_expression(
+    owner_id: int, kind: TotalKind, filters: Sequence[ColumnElement[bool]] = ()
+) -> ColumnElement[int]:
+    if kind == "exact":
+        return (
+            select(func.count())
+            .select_from(Item)
+            .where(Item.owner_id == owner_id, *filters)
+            .scalar_subquery()
+        )
+    # Maintained counter; owners without a counter row have no items.
+    return func.coalesce(
+        select(ItemCounter.item_count).where(ItemCounter.owner_id == owner_id).scalar_subquery(),
+        0,
+    )
+
+
+async def estimate_item_count(db: AsyncSession, owner_id: int) -> int:
+    # Planner row estimate for the owner's items (PostgreSQL only). owner_id
+    # is an int, so inlining it is safe; EXPLAIN does not take parameters.
+    result = await db.execute(
+        text(f"EXPLAIN (FORMAT JSON) SELECT 1 FROM items WHERE owner_id = {int(owner_id)}")
+    )
+    plan = result.scalar_one()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+async def fetch_item_page(
+    db: AsyncSession,
+    statement: Select[Item],
+    owner_id: int,
+    total_kind: TotalKind | None,
+    filters: Sequence[ColumnElement[bool]] = (),
+) -> tuple[list[Item], int | None, TotalKind | None]:
+    # Run a page query, optionally with the owner's total.
+    #
+    # exact and maintained totals ride along as an uncorrelated scalar
+    # subquery, so a page and its total cost one round trip; a second query
+    # is only needed when the page is empty. estimated falls back to the
+    # maintained counter on databases without a usable planner estimate.
+    # Filtered listings can only be counted exactly.
+    if total_kind is not None and filters:
+        total_kind = "exact"
+    if total_kind is None:
+        result = await db.execute(statement)
+        return list(result.scalars().all()), None, None
+    if total_kind == "estimated":
+        if db.get_bind().dialect.name == "postgresql":
+            result = await db.execute(statement)
+            return (
+                list(result.scalars().all()),
+                await estimate_item_count(db, owner_id),
+                "estimated",
+            )
+        total_kind = "maintained"
+    total = _total_expression(owner_id, total_kind, filters)
+    rows = (await db.execute(statement.add_columns(total))).all()
+    if rows:
+        return [row[0] for row in rows], int(rows[0][1]), total_kind
+    count = await db.execute(select(total))
+    return [], int(count.scalar_one()), total_kind
+
+
+def _as_utc(value: datetime) -> datetime:
+    # Timestamps are stored in UTC; naive input is taken to be UTC.
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def item_filters(
+    dialect_name: str,
+    *,
+    created_after: datetime | None = None,
+    updated_after: datetime | None = None,
+    title_prefix: str | None = None,
+) -> list[ColumnElement[bool]]:
+    # Listing filters, each a range on an indexed column.
+    filters: list[ColumnElement[bool]] = []
+    if created_after is not None:
+        filters.append(Item.created_at > _as_utc(created_after))
+    if updated_after is not None:
+        filters.append(Item.updated_at > _as_utc(updated_after))
+    if title_prefix:
+        filters += prefix_match(Item.title, title_prefix, dialect_name)
+    return filters
+
+
+def encode_item_cursor(item: Item, sort: ItemSort) -> str:
+    # id-ordered pages keep the plain id cursors handed out before sorting.
+    field = sort.lstrip("-")
+    if field == "id":
+        return encode_cursor(item.id)
+    value = getattr(item, field)
+    return encode_keyset_cursor(
+        field, value.isoformat() if isinstance(value, datetime) else value, item.id
+    )
+
+
+def decode_item_cursor(cursor: str, sort: ItemSort) -> ItemPosition:
+    # Raises InvalidCursorError, also for a cursor issued under another sort.
+    field = sort.lstrip("-")
+    if field == "id":
+        row_id = decode_cursor(cursor)
+        return row_id, row_id
+    value, row_id = decode_keyset_cursor(cursor, field)
+    if field == "title":
+        return value, row_id
+    try:
+        return datetime.fromisoformat(value), row_id
+    except ValueError:
+        raise InvalidCursorError("Invalid cursor")
+
+
+def item_page_statement(
+    owner_id: int,
+    sort: ItemSort,
+    filters: Sequence[ColumnElement[bool]] = (),
+    *,
+    after: ItemPosition | None = None,
+    before: ItemPosition | None = None,
+) -> Select[Item]:
+    # Owner-scoped listing in the requested order, optionally resuming after
+    # (or, walking backwards, before) a keyset position. Pages fetched with
+    # before come back in reverse order; the caller flips them.
+    field = sort.lstrip("-")
+    descending = sort.startswith("-")
+    backwards = before is not None
+    key = [_SORT_COLUMNS[field]] if field == "id" else [_SORT_COLUMNS[field], Item.id]
+    statement = select(Item).where(Item.owner_id == owner_id, *filters)
+    position = before if backwards else after
+    if position is not None:
+        value, row_id = position
+        bound = [value] if field == "id" else [value, row_id]
+        left, right = (key[0], bound[0]) if field == "id" else (tuple_(*key), tuple_(*bound))
+        # Row-value comparison, so the index range starts right at the cursor.
+        statement = statement.where(left > right if descending == backwards else left < right)
+    if descending != backwards:
+        return statement.order_by(*(part.desc() for part in key))
+    return statement.order_by(*key)
+
+
+# Full-text search over the objects in app/db/ddl.py. Both backends rank
+# title matches above description matches and break ties by newest id.
+_SEARCH_CONFIG: ColumnElement[Any] = literal_column("'english'")
+_SEARCH_VECTOR = literal_column("items.search_vector", TSVECTOR)
+_FTS_TABLE = table("items_fts", column("rowid"))
+# FTS5 takes the table name itself as the MATCH and bm25() operand.
+_FTS_OPERAND: ColumnElement[Any] = literal_column("items_fts")
+_SEARCH_TERM = re.compile(r"\w+")
+
+
+def _fts5_query(query: str) -> str | None:
+    # Quote every word so user input is never parsed as FTS5 syntax; the
+    # terms are ANDed, like plain words in websearch_to_tsquery.
+    terms = _SEARCH_TERM.findall(query)
+    return " ".join(f'"{term}"' for term in terms) or None
+
+
+async def search_items(
+    db: AsyncSession, owner_id: int, query: str, *, skip: int, limit: int
+) -> list[Item]:
+    # Ranked, owner-scoped matches; fetches limit + 1 rows so the caller can
+    # tell whether another page follows.
+    statement = select(Item).where(Item.owner_id == owner_id)
+    if db.get_bind().dialect.name == "postgresql":
+        tsquery = func.websearch_to_tsquery(_SEARCH_CONFIG, query)
+        statement = statement.where(_SEARCH_VECTOR.op("@@")(tsquery)).order_by(
+            func.ts_rank_cd(_SEARCH_VECTOR, tsquery).desc(), Item.id.desc()
+        )
+    else:
+        # SQLite FTS5.
+        match = _fts5_query(query)
+        if match is None:
+            return []
+        statement = (
+            statement.join(_FTS_TABLE, _FTS_TABLE.c.rowid == Item.id)
+            .where(_FTS_OPERAND.op("MATCH")(match))
+            .order_by(func.bm25(_FTS_OPERAND, 10.0, 1.0), Item.id.desc())
+        )
+    result = await db.scalars(statement.offset(skip).limit(limit + 1))
+    return list(result.all())
+
+
+async def item_list_version(db: AsyncSession, owner_id: int) -> int:
+    # Trigger-maintained; changes with every write to the owner's items.
+    version = await db.scalar(select(ItemCounter.version).where(ItemCounter.owner_id == owner_id))
+    return version or 0
+
+
+async def item_updated_at(db: AsyncSession, owner_id: int, item_id: int) -> datetime | None:
+    # The item's version without loading the row; None when it is missing
+    # or not the owner's.
+    return await db.scalar(
+        select(Item.updated_at).where(Item.id == item_id, Item.owner_id == owner_id)
+    )
+
+
+# Writes below take one statement each: the owner filter lives in the WHERE
+# clause, so "missing" and "not yours" are both a miss (404 for the caller).
+# Callers commit.
+
+
+async def create_item(db: AsyncSession, owner_id: int, data: ItemCreate) -> Item:
+    values = {"title": data.title, "description": data.description, "owner_id": owner_id}
+    if db.get_bind().dialect.insert_returning:
+        result = await db.execute(insert(Item).values(**values).returning(Item))
+        return result.scalar_one()
+    item = Item(**values)
+    db.add(item)
+    await db.flush()
+    return item
+
+
+def _owned(
+    owner_id: int, item_id: int, versions: Sequence[datetime] | None
+) -> tuple[ColumnElement[bool], ...]:
+    # versions (from If-Match) makes the write conditional on updated_at.
+    owned = (Item.id == item_id, Item.owner_id == owner_id)
+    if versions is None:
+        return owned
+    return (*owned, Item.updated_at.in_(versions))
+
+
+async def update_item(
+    db: AsyncSession,
+    owner_id: int,
+    item_id: int,
+    data: ItemUpdate,
+    versions: Sequence[datetime] | None = None,
+) -> Item | None:
+    owned = _owned(owner_id, item_id, versions)
+    changes = data.model_dump(exclude_none=True)
+    if not changes:
+        return await db.scalar(select(Item).where(*owned))
+    if db.get_bind().dialect.update_returning:
+        statement = update(Item).where(*owned).values(**changes).returning(Item)
+        return await db.scalar(statement, execution_options={"populate_existing": True})
+    # No RETURNING: update, then read the row back (two statements).
+    result = await db.execute(update(Item).where(*owned).values(**changes))
+    if result.rowcount == 0:  # type: ignore[attr-defined]
+        return None
+    return await db.scalar(
+        select(Item).where(*owned), execution_options={"populate_existing": True}
+    )
+
+
+async def delete_item(
+    db: AsyncSession,
+    owner_id: int,
+    item_id: int,
+    versions: Sequence[datetime] | None = None,
+) -> bool:
+    # rowcount is reliable for DELETE everywhere, so RETURNING is not needed.
+    result = await db.execute(delete(Item).where(*_owned(owner_id, item_id, versions)))
+    return bool(result.rowcount)  # type: ignore[attr-defined]
+
+
+# Bulk variants: one statement per batch whatever its size. Callers run them
+# in a single transaction and report per-entry results.
+
+
+async def create_items(db: AsyncSession, owner_id: int, entries: list[ItemCreate]) -> list[Item]:
+    rows = [
+        {"title": entry.title, "description": entry.description, "owner_id": owner_id}
+        for entry in entries
+    ]
+    dialect = db.get_bind().dialect
+    if dialect.name == "postgresql":
+        # Multi-row INSERT ... RETURNING; SQLAlchemy orders the returned rows
+        # to match the parameters without splitting the statement.
+        result = await db.scalars(insert(Item).returning(Item, sort_by_parameter_order=True), rows)
+        return list(result.all())
+    if dialect.insert_returning:
+        # SQLite would fall back to one INSERT per row to guarantee order.
+        # One multi-row INSERT assigns ascending rowids in VALUES order, but
+        # that is not documented, so check the match before relying on it.
+        result = await db.scalars(insert(Item).returning(Item), rows)
+        items = sorted(result.all(), key=lambda item: item.id)
+        for item, row in zip(items, rows, strict=True):
+            if (item.title, item.description) != (row["title"], row["description"]):
+                raise RuntimeError("INSERT ... RETURNING ids do not follow VALUES order")
+        return items
+    items = [Item(**row) for row in rows]
+    db.add_all(items)
+    await db.flush()
+    return items
+
+
+async def update_items(
+    db: AsyncSession, owner_id: int, entries: list[ItemBulkUpdateEntry]
+) -> dict[int, Item]:
+    # One set-based UPDATE; CASE picks each row's new value and keeps the
+    # current one for fields an entry leaves out. An explicit null is a change
+    # (clears description). Returns updated rows by id.
+    ids = [entry.id for entry in entries]
+    values: dict[str, Any] = {"updated_at": utcnow()}
+    for field in ("title", "description"):
+        changes = {
+            entry.id: getattr(entry, field) for entry in entries if field in entry.model_fields_set
+        }
+        if changes:
+            column = getattr(Item, field)
+            values[field] = case(changes, value=Item.id, else_=column)
+    owned = (Item.owner_id == owner_id, Item.id.in_(ids))
+    statement = update(Item).where(*owned).values(**values)
+    options = {"synchronize_session": False, "populate_existing": True}
+    if db.get_bind().dialect.update_returning:
+        result = await db.scalars(statement.returning(Item), execution_options=options)
+        return {item.id: item for item in result.all()}
+    await db.execute(statement, execution_options={"synchronize_session": False})
+    result = await db.scalars(
+        select(Item).where(*owned), execution_options={"populate_existing": True}
+    )
+    return {item.id: item for item in result.all()}
+
+
+async def delete_items(db: AsyncSession, owner_id: int, ids: list[int]) -> set[int]:
+    # Returns the ids that existed and belonged to the owner.
+    owned = (Item.owner_id == owner_id, Item.id.in_(ids))
+    options = {"synchronize_session": False}
+    if db.get_bind().dialect.delete_returning:
+        result = await db.scalars(
+            delete(Item).where(*owned).returning(Item.id), execution_options=options
+        )
+        return set(result.all())
+    found = set((await db.scalars(select(Item.id).where(*owned))).all())
+    await db.execute(delete(Item).where(*owned), execution_options=options)
+    return found
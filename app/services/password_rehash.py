@@ -0,0 +1,58 @@
+# Transparent upgrade of password hashes to the configured bcrypt cost.
+
+import asyncio
+import logging
+
+from sqlalchemy import update
+
+from app.core.metrics import PASSWORD_REHASHES
+from app.core.security import get_password_hash_async
+from app.db.models import User
+from app.db.session import SessionLocal
+
+logger = logging.getLogger("app.password_rehash")
+
+# Strong references keep fire-and-forget tasks alive until they finish.
+_tasks: set[asyncio.Task[None]] = set()
+_pending_user_ids: set[int] = set()
+
+
+async def _rehash(user_id: int, old_hash: str, password: str) -> None:
+    try:
+        new_hash = await get_password_hash_async(password)
+        async with SessionLocal() as db:
+            # Compare-and-set: skip if the password changed in the meantime.
+            result = await db.execute(
+                update(User)
+                .where(User.id == user_id, User.hashed_password == old_hash)
+                .values(hashed_password=new_hash)
+                .returning(User.id)
+            )
+            updated = result.scalar_one_or_none() is not None
+            await db.commit()
+    except Exception:
+        PASSWORD_REHASHES.labels(result="failed").inc()
+        logger.exception("password.rehash_failed", extra={"user_id": user_id})
+        return
+    PASSWORD_REHASHES.labels(result="upgraded" if updated else "skipped").inc()
+
+
+def schedule_password_rehash(user_id: int, old_hash: str, password: str) -> None:
+    # Rehash after the login response; one in-flight rehash per user.
+    if user_id in _pending_user_ids:
+        return
+    _pending_user_ids.add(user_id)
+    task = asyncio.create_task(_rehash(user_id, old_hash, password))
+    _tasks.add(task)
+
+    def _done(finished: asyncio.Task[None]) -> None:
+        _tasks.discard(finished)
+        _pending_user_ids.discard(user_id)
+
+    task.add_done_callback(_done)
+
+
+async def drain_password_rehashes() -> None:
+    # Wait for scheduled rehashes (app shutdown and tests).
+    if _tasks:
+        await asyncio.gather(*_tasks, return_exceptions=True)
@@ -0,0 +1,65 @@
+# Short-lived cache of authenticated user snapshots.
+
+from pydantic import ValidationError
+
+from app.core.cache import CacheBackend, MemoryCache, select_cache
+from app.core.config import settings
+from app.core.metrics import PRINCIPAL_CACHE_HITS, PRINCIPAL_CACHE_MISSES
+from app.schemas.auth import Principal
+
+
+class PrincipalCache:
+    # Entries are served for up to ttl_seconds without checking the users
+    # table, so writers must call invalidate() after committing a change to
+    # cached fields (email, is_active, is_admin), a password change or a
+    # delete (user_service does). Without that, a deleted or deactivated user
+    # keeps authenticating until the entry expires. With the "local" backend
+    # invalidate() only reaches the current process; run with "redis" when
+    # there is more than one worker.
+
+    def __init__(self, backend: CacheBackend | None, ttl_seconds: int) -> None:
+        self._backend = backend
+        self._ttl_seconds = ttl_seconds
+
+    @staticmethod
+    def _key(user_id: int) -> str:
+        return f"principal:{user_id}"
+
+    async def get(self, user_id: int) -> Principal | None:
+        if self._backend is None:
+            return None
+        raw = await self._backend.get(self._key(user_id))
+        if raw is not None:
+            try:
+                principal = Principal.model_validate_json(raw)
+            except ValidationError:
+                principal = None
+            if principal is not None:
+                PRINCIPAL_CACHE_HITS.inc()
+                return principal
+        PRINCIPAL_CACHE_MISSES.inc()
+        return None
+
+    async def set(self, principal: Principal) -> None:
+        if self._backend is None:
+            return
+        await self._backend.set(
+            self._key(principal.id),
+            principal.model_dump_json().encode("utf-8"),
+            self._ttl_seconds,
+        )
+
+    async def invalidate(self, user_id: int) -> None:
+        if self._backend is None:
+            return
+        await self._backend.delete(self._key(user_id))
+
+    def clear(self) -> None:
+        if isinstance(self._backend, MemoryCache):
+            self._backend.clear()
+
+
+principal_cache = PrincipalCache(
+    select_cache(settings.PRINCIPAL_CACHE_BACKEND, settings.PRINCIPAL_CACHE_MAX_ENTRIES),
+    ttl_seconds=settings.CACHE_TTL_SECONDS,
+)
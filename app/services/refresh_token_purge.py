@@ -0,0 +1,81 @@
+# Background compaction of expired and long-revoked refresh tokens.
+
+import asyncio
+from collections.abc import Callable
+from datetime import datetime, timedelta
+import logging
+from time import perf_counter
+
+from sqlalchemy import and_, delete, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.metrics import REFRESH_TOKEN_PURGE_BATCH_SECONDS, REFRESH_TOKENS_PURGED
+from app.db.models import RefreshToken
+from app.db.session import SessionLocal
+from app.utils.time import utcnow
+
+logger = logging.getLogger("app.refresh_token_purge")
+
+
+async def purge_refresh_tokens(
+    session_factory: Callable[[], AsyncSession] = SessionLocal,
+    *,
+    batch_size: int | None = None,
+    throttle_seconds: float | None = None,
+    grace: timedelta | None = None,
+    now: datetime | None = None,
+) -> int:
+    # Delete tokens that expired, or were revoked, more than `grace` ago.
+    #
+    # Revoked tokens are kept for the grace window so replaying one still
+    # triggers reuse detection in rotate_refresh_token. Rows are walked in
+    # primary-key order and deleted in short transactions, one batch at a
+    # time, sleeping between batches to limit lock and I/O pressure.
+    batch_size = batch_size or settings.REFRESH_TOKEN_PURGE_BATCH_SIZE
+    if throttle_seconds is None:
+        throttle_seconds = settings.REFRESH_TOKEN_PURGE_THROTTLE_SECONDS
+    if grace is None:
+        grace = timedelta(days=settings.REFRESH_TOKEN_REUSE_GRACE_DAYS)
+    cutoff = (now or utcnow()) - grace
+    purgeable = or_(
+        RefreshToken.expires_at < cutoff,
+        and_(RefreshToken.revoked.is_(True), RefreshToken.updated_at < cutoff),
+    )
+
+    last_id = 0
+    purged = 0
+    while True:
+        started = perf_counter()
+        async with session_factory() as db:
+            result = await db.execute(
+                select(RefreshToken.id)
+                .where(RefreshToken.id > last_id, purgeable)
+                .order_by(RefreshToken.id)
+                .limit(batch_size)
+            )
+            ids = list(result.scalars().all())
+            if ids:
+                await db.execute(delete(RefreshToken).where(RefreshToken.id.in_(ids)))
+                await db.commit()
+        REFRESH_TOKEN_PURGE_BATCH_SECONDS.observe(perf_counter() - started)
+        if not ids:
+            break
+        REFRESH_TOKENS_PURGED.inc(len(ids))
+        purged += len(ids)
+        last_id = ids[-1]
+        if len(ids) < batch_size:
+            break
+        await asyncio.sleep(throttle_seconds)
+    return purged
+
+
+async def run_refresh_token_purge_loop(interval_seconds: float) -> None:
+    # Periodic purge for the app lifespan; errors are logged, never raised.
+    while True:
+        try:
+            purged = await purge_refresh_tokens()
+            logger.info("refresh_tokens.purged", extra={"purged": purged})
+        except Exception:
+            logger.exception("refresh_tokens.purge_failed")
+        await asyncio.sleep(interval_seconds)
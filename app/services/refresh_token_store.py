@@ -0,0 +1,392 @@
+# Refresh token storage backends (SQL, Redis, in-memory).
+#
+# Stores only ever see token hashes. rotate() is the critical operation: it
+# must atomically claim an active token and store its replacement, and treat
+# a replayed (already revoked) token as reuse by revoking all of the user's
+# tokens.
+
+from datetime import datetime, timedelta
+from functools import lru_cache
+from typing import Protocol
+
+from redis.asyncio import Redis
+from sqlalchemy import DateTime, Insert, String, false, insert, literal, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.db.models import RefreshToken
+from app.utils.time import utcnow
+
+
+class RefreshTokenStore(Protocol):
+    async def store(
+        self,
+        db: AsyncSession,
+        user_id: int,
+        token_hash: str,
+        expires_at: datetime,
+        *,
+        commit: bool = True,
+    ) -> None: ...
+
+    async def rotate(
+        self,
+        db: AsyncSession,
+        old_hash: str,
+        new_hash: str,
+        expires_at: datetime,
+    ) -> int | None: ...
+
+    async def revoke(self, db: AsyncSession, token_hash: str) -> bool: ...
+
+    async def revoke_all(self, db: AsyncSession, user_id: int) -> None: ...
+
+
+def build_single_statement_rotation(old_hash: str, new_hash: str, expires_at: datetime) -> Insert:
+    # WITH claimed AS (UPDATE ... RETURNING user_id) INSERT ... SELECT FROM claimed
+    #
+    # Claims the old token and inserts its replacement in one round trip. The
+    # INSERT only produces a row when the claim succeeded.
+    now = utcnow()
+    claimed = (
+        update(RefreshToken)
+        .where(
+            RefreshToken.token_hash == old_hash,
+            RefreshToken.revoked.is_(False),
+            RefreshToken.expires_at > now,
+        )
+        .values(revoked=True, updated_at=now)
+        .returning(RefreshToken.user_id)
+        .cte("claimed")
+    )
+    replacement = select(
+        claimed.c.user_id,
+        literal(new_hash, String()),
+        false(),
+        literal(now, DateTime(timezone=True)),
+        literal(now, DateTime(timezone=True)),
+        literal(expires_at, DateTime(timezone=True)),
+    )
+    return (
+        insert(RefreshToken)
+        .from_select(
+            ["user_id", "token_hash", "revoked", "created_at", "updated_at", "expires_at"],
+            replacement,
+        )
+        .returning(RefreshToken.user_id)
+        .add_cte(claimed)
+    )
+
+
+class SqlRefreshTokenStore:
+    # Tokens live in the refresh_tokens table; revoked rows are kept for reuse
+    # detection until purged (see app.services.refresh_token_purge).
+
+    @staticmethod
+    def _supports_single_statement_rotation(db: AsyncSession) -> bool:
+        # PostgreSQL allows data-modifying CTEs; SQLite does not.
+        return (
+            settings.REFRESH_ROTATION_SINGLE_STATEMENT
+            and db.get_bind().dialect.name == "postgresql"
+        )
+
+    async def store(
+        self,
+        db: AsyncSession,
+        user_id: int,
+        token_hash: str,
+        expires_at: datetime,
+        *,
+        commit: bool = True,
+    ) -> None:
+        db.add(RefreshToken(user_id=user_id, token_hash=token_hash, expires_at=expires_at))
+        if commit:
+            await db.commit()
+        else:
+            await db.flush()
+
+    async def rotate(
+        self,
+        db: AsyncSession,
+        old_hash: str,
+        new_hash: str,
+        expires_at: datetime,
+    ) -> int | None:
+        async with db.begin():
+            if self._supports_single_statement_rotation(db):
+                result = await db.execute(
+                    build_single_statement_rotation(old_hash, new_hash, expires_at)
+                )
+                user_id = result.scalar_one_or_none()
+                if user_id is not None:
+                    return int(user_id)
+            else:
+                claim_result = await db.execute(
+                    update(RefreshToken)
+                    .where(
+                        RefreshToken.token_hash == old_hash,
+                        RefreshToken.revoked.is_(False),
+                        RefreshToken.expires_at > utcnow(),
+                    )
+                    .values(revoked=True)
+                    .returning(RefreshToken.user_id)
+                )
+                user_id = claim_result.scalar_one_or_none()
+                if user_id is not None:
+                    await self.store(db, user_id, new_hash, expires_at, commit=False)
+                    return int(user_id)
+
+            # Slow path: the token is unknown, expired, or already used.
+            record_result = await db.execute(
+                select(RefreshToken).where(RefreshToken.token_hash == old_hash)
+            )
+            record: RefreshToken | None = record_result.scalars().first()
+            if record and record.revoked:
+                # Defensive: a reused refresh token invalidates all sessions for the user.
+                await db.execute(
+                    update(RefreshToken)
+                    .where(RefreshToken.user_id == record.user_id)
+                    .values(revoked=True)
+                )
+            return None
+
+    async def revoke(self, db: AsyncSession, token_hash: str) -> bool:
+        result = await db.execute(select(RefreshToken).where(RefreshToken.token_hash == token_hash))
+        record = result.scalars().first()
+        if not record or record.revoked:
+            return False
+        record.revoked = True
+        await db.commit()
+        return True
+
+    async def revoke_all(self, db: AsyncSession, user_id: int) -> None:
+        # Runs in the caller's transaction; the caller commits.
+        await db.execute(
+            update(RefreshToken).where(RefreshToken.user_id == user_id).values(revoked=True)
+        )
+
+
+class MemoryRefreshTokenStore:
+    # Process-local store for tests and benchmarks. Same semantics as the SQL
+    # store; operations are atomic because they never await.
+
+    def __init__(self) -> None:
+        # token_hash -> (user_id, revoked, expires_at)
+        self._tokens: dict[str, tuple[int, bool, datetime]] = {}
+
+    async def store(
+        self,
+        db: AsyncSession,
+        user_id: int,
+        token_hash: str,
+        expires_at: datetime,
+        *,
+        commit: bool = True,
+    ) -> None:
+        self._tokens[token_hash] = (user_id, False, expires_at)
+
+    async def rotate(
+        self,
+        db: AsyncSession,
+        old_hash: str,
+        new_hash: str,
+        expires_at: datetime,
+    ) -> int | None:
+        entry = self._tokens.get(old_hash)
+        if entry is None:
+            return None
+        user_id, revoked, old_expires_at = entry
+        if revoked:
+            self._revoke_user(user_id)
+            return None
+        if old_expires_at <= utcnow():
+            return None
+        self._tokens[old_hash] = (user_id, True, old_expires_at)
+        self._tokens[new_hash] = (user_id, False, expires_at)
+        return user_id
+
+    async def revoke(self, db: AsyncSession, token_hash: str) -> bool:
+        entry = self._tokens.get(token_hash)
+        if entry is None or entry[1]:
+            return False
+        self._tokens[token_hash] = (entry[0], True, entry[2])
+        return True
+
+    async def revoke_all(self, db: AsyncSession, user_id: int) -> None:
+        self._revoke_user(user_id)
+
+    def _revoke_user(self, user_id: int) -> None:
+        for token_hash, (owner_id, _, expires_at) in list(self._tokens.items()):
+            if owner_id == user_id:
+                self._tokens[token_hash] = (owner_id, True, expires_at)
+
+    def is_revoked(self, token_hash: str) -> bool | None:
+        entry = self._tokens.get(token_hash)
+        return None if entry is None else entry[1]
+
+    def clear(self) -> None:
+        self._tokens.clear()
+
+
+# Redis layout (prefix "refresh_token:"):
+#   <prefix><hash>          HASH user_id, revoked ("0"/"1"), expires_at (unix seconds);
+#                           the key TTL is the token expiry plus the reuse grace window.
+#   <prefix>user:<user_id>  ZSET of the user's unrevoked token hashes scored by expiry,
+#                           used by revoke-all. Expired members are trimmed on write.
+#
+# Scripts compute the per-user key from the token record, so they need a
+# single Redis primary (not Redis Cluster).
+
+_REVOKE_USER_LUA = """
+local function revoke_user(prefix, user_id)
+  local user_key = prefix .. 'user:' .. user_id
+  for _, member in ipairs(redis.call('ZRANGE', user_key, 0, -1)) do
+    local token_key = prefix .. member
+    if redis.call('EXISTS', token_key) == 1 then
+      redis.call('HSET', token_key, 'revoked', '1')
+    end
+  end
+  redis.call('DEL', user_key)
+end
+"""
+
+# KEYS: token key, user key. ARGV: user_id, expires_at, ttl_ms, now, token_hash.
+_STORE_LUA = """
+redis.call('HSET', KEYS[1], 'user_id', ARGV[1], 'revoked', '0', 'expires_at', ARGV[2])
+redis.call('PEXPIRE', KEYS[1], ARGV[3])
+redis.call('ZREMRANGEBYSCORE', KEYS[2], '-inf', ARGV[4])
+redis.call('ZADD', KEYS[2], ARGV[2], ARGV[5])
+redis.call('PEXPIRE', KEYS[2], ARGV[3])
+return 1
+"""
+
+# KEYS: old token key, new token key.
+# ARGV: prefix, old_hash, new_hash, now, expires_at, ttl_ms.
+# Returns the user id on success, 0 for unknown/expired/reused tokens.
+_ROTATE_LUA = (
+    _REVOKE_USER_LUA
+    + """
+local user_id = redis.call('HGET', KEYS[1], 'user_id')
+if not user_id then
+  return 0
+end
+if redis.call('HGET', KEYS[1], 'revoked') == '1' then
+  revoke_user(ARGV[1], user_id)
+  return 0
+end
+if tonumber(redis.call('HGET', KEYS[1], 'expires_at')) <= tonumber(ARGV[4]) then
+  return 0
+end
+local user_key = ARGV[1] .. 'user:' .. user_id
+redis.call('HSET', KEYS[1], 'revoked', '1')
+redis.call('ZREM', user_key, ARGV[2])
+redis.call('HSET', KEYS[2], 'user_id', user_id, 'revoked', '0', 'expires_at', ARGV[5])
+redis.call('PEXPIRE', KEYS[2], ARGV[6])
+redis.call('ZREMRANGEBYSCORE', user_key, '-inf', ARGV[4])
+redis.call('ZADD', user_key, ARGV[5], ARGV[3])
+redis.call('PEXPIRE', user_key, ARGV[6])
+return tonumber(user_id)
+"""
+)
+
+# KEYS: token key. ARGV: prefix, token_hash. Returns 1 if the token was revoked.
+_REVOKE_LUA = """
+local user_id = redis.call('HGET', KEYS[1], 'user_id')
+if not user_id or redis.call('HGET', KEYS[1], 'revoked') == '1' then
+  return 0
+end
+redis.call('HSET', KEYS[1], 'revoked', '1')
+redis.call('ZREM', ARGV[1] .. 'user:' .. user_id, ARGV[2])
+return 1
+"""
+
+# ARGV: prefix, user_id.
+_REVOKE_ALL_LUA = (
+    _REVOKE_USER_LUA
+    + """
+revoke_user(ARGV[1], ARGV[2])
+return 1
+"""
+)
+
+
+class RedisRefreshTokenStore:
+    # Every operation is a single Lua script, so rotation and reuse detection
+    # are atomic without locks, and Redis expires records on its own. Unlike
+    # the read caches this store is authoritative: Redis errors propagate.
+
+    def __init__(self, url: str, prefix: str = "refresh_token:") -> None:
+        self._client = Redis.from_url(url)
+        self._prefix = prefix
+        self._store_script = self._client.register_script(_STORE_LUA)
+        self._rotate_script = self._client.register_script(_ROTATE_LUA)
+        self._revoke_script = self._client.register_script(_REVOKE_LUA)
+        self._revoke_all_script = self._client.register_script(_REVOKE_ALL_LUA)
+
+    def _ttl_ms(self, expires_at: datetime) -> int:
+        # Keep revoked/expired records for the grace window so replays are
+        # still recognised as reuse.
+        retain_until = expires_at + timedelta(days=settings.REFRESH_TOKEN_REUSE_GRACE_DAYS)
+        return max(int((retain_until - utcnow()).total_seconds() * 1000), 1)
+
+    async def store(
+        self,
+        db: AsyncSession,
+        user_id: int,
+        token_hash: str,
+        expires_at: datetime,
+        *,
+        commit: bool = True,
+    ) -> None:
+        await self._store_script(
+            keys=[self._prefix + token_hash, f"{self._prefix}user:{user_id}"],
+            args=[
+                user_id,
+                int(expires_at.timestamp()),
+                self._ttl_ms(expires_at),
+                int(utcnow().timestamp()),
+                token_hash,
+            ],
+        )
+
+    async def rotate(
+        self,
+        db: AsyncSession,
+        old_hash: str,
+        new_hash: str,
+        expires_at: datetime,
+    ) -> int | None:
+        user_id = await self._rotate_script(
+            keys=[self._prefix + old_hash, self._prefix + new_hash],
+            args=[
+                self._prefix,
+                old_hash,
+                new_hash,
+                int(utcnow().timestamp()),
+                int(expires_at.timestamp()),
+                self._ttl_ms(expires_at),
+            ],
+        )
+        return int(user_id) or None
+
+    async def revoke(self, db: AsyncSession, token_hash: str) -> bool:
+        revoked = await self._revoke_script(
+            keys=[self._prefix + token_hash], args=[self._prefix, token_hash]
+        )
+        return bool(revoked)
+
+    async def revoke_all(self, db: AsyncSession, user_id: int) -> None:
+        await self._revoke_all_script(keys=[], args=[self._prefix, user_id])
+
+
+def build_refresh_token_store(backend: str) -> RefreshTokenStore:
+    if backend == "redis":
+        return RedisRefreshTokenStore(settings.REDIS_URL)
+    if backend == "memory":
+        return MemoryRefreshTokenStore()
+    return SqlRefreshTokenStore()
+
+
+@lru_cache
+def get_refresh_token_store() -> RefreshTokenStore:
+    return build_refresh_token_store(settings.REFRESH_TOKEN_STORE)
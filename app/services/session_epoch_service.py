@@ -0,0 +1,73 @@
+# Per-user session epochs used to revoke stateless access tokens.
+
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.cache import select_cache
+from app.core.config import settings
+from app.db.models import SessionEpoch
+from app.utils.time import utcnow
+
+_epoch_cache = select_cache(settings.SESSION_EPOCH_CACHE_BACKEND, max_entries=100_000)
+
+
+def _cache_key(user_id: int) -> str:
+    return f"session_epoch:{user_id}"
+
+
+# Cached in place of an epoch for users that have no row.
+_MISSING = b"-"
+
+
+async def get_session_epoch(db: AsyncSession, user_id: int) -> int | None:
+    # None when the user has no row: a stateless token is only issued after
+    # ensure_session_epoch, and delete_user removes the row, so a missing row
+    # means the token's user is gone.
+    if _epoch_cache is not None:
+        cached = await _epoch_cache.get(_cache_key(user_id))
+        if cached is not None:
+            return None if cached == _MISSING else int(cached)
+    result = await db.execute(select(SessionEpoch.epoch).where(SessionEpoch.user_id == user_id))
+    epoch = result.scalar_one_or_none()
+    if _epoch_cache is not None:
+        await _epoch_cache.set(
+            _cache_key(user_id),
+            _MISSING if epoch is None else str(epoch).encode("utf-8"),
+            settings.SESSION_EPOCH_CACHE_TTL_SECONDS,
+        )
+    return epoch
+
+
+async def ensure_session_epoch(db: AsyncSession, user_id: int) -> int:
+    # The user's epoch, creating the row at 0 (and committing) on first use.
+    epoch = await get_session_epoch(db, user_id)
+    if epoch is not None:
+        return epoch
+    dialect = db.get_bind().dialect.name
+    insert = postgresql_insert if dialect == "postgresql" else sqlite_insert
+    statement = insert(SessionEpoch).values(user_id=user_id, epoch=0, updated_at=utcnow())
+    await db.execute(statement.on_conflict_do_nothing(index_elements=[SessionEpoch.user_id]))
+    await db.commit()
+    await invalidate_session_epoch(user_id)
+    return await get_session_epoch(db, user_id) or 0
+
+
+async def bump_session_epoch(db: AsyncSession, user_id: int) -> None:
+    # Increment within the caller's transaction; call invalidate_session_epoch
+    # once it has committed.
+    dialect = db.get_bind().dialect.name
+    insert = postgresql_insert if dialect == "postgresql" else sqlite_insert
+    now = utcnow()
+    statement = insert(SessionEpoch).values(user_id=user_id, epoch=1, updated_at=now)
+    statement = statement.on_conflict_do_update(
+        index_elements=[SessionEpoch.user_id],
+        set_={"epoch": SessionEpoch.epoch + 1, "updated_at": now},
+    )
+    await db.execute(statement)
+
+
+async def invalidate_session_epoch(user_id: int) -> None:
+    if _epoch_cache is not None:
+        await _epoch_cache.delete(_cache_key(user_id))
@@ -1,11 +1,16 @@
 # User service functions for basic user operations.
 
-from sqlalchemy import select
+from sqlalchemy import ColumnElement, delete, func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.security import get_password_hash, verify_password
-from app.db.models import User
+from app.core.security import get_password_hash_async, verify_password_async
+from app.db.models import Item, ItemCounter, RefreshToken, SessionEpoch, User
 from app.schemas.user import UserCreate
+from app.services.item_cache import item_cache
+from app.services.principal_cache import principal_cache
+from app.services.refresh_token_store import get_refresh_token_store
+from app.services.session_epoch_service import bump_session_epoch, invalidate_session_epoch
+from app.utils.sql import prefix_match
 
 
 async def get_user_by_email(db: AsyncSession, email: str) -> User | None:
@@ -19,24 +24,86 @@ async def get_user_by_id(db: AsyncSession, user_id: int) -> User | None:
 
 
 async def create_user(db: AsyncSession, data: UserCreate) -> User:
-    user = User(email=data.email, hashed_password=get_password_hash(data.password))
+    hashed_password = await get_password_hash_async(data.password)
+    user = User(email=data.email, hashed_password=hashed_password)
     db.add(user)
     await db.commit()
-    await db.refresh(user)
     return user
 
 
-async def list_users(db: AsyncSession) -> list[User]:
-    result = await db.execute(select(User))
-    return list(result.scalars().all())
+def email_prefix_filter(prefix: str, dialect_name: str) -> list[ColumnElement[bool]]:
+    # Case-insensitive "email starts with" that can use ix_users_email_lower.
+    return prefix_match(func.lower(User.email), prefix.lower(), dialect_name)
+
+
+async def list_users(
+    db: AsyncSession,
+    *,
+    limit: int,
+    before_id: int | None = None,
+    is_active: bool | None = None,
+    is_admin: bool | None = None,
+    email_prefix: str | None = None,
+) -> tuple[list[User], bool]:
+    # Newest first, one keyset page at a time; returns the page and whether
+    # more rows follow. Memory is bounded by limit, not table size.
+    statement = select(User).order_by(User.id.desc()).limit(limit + 1)
+    if before_id is not None:
+        statement = statement.where(User.id < before_id)
+    if is_active is not None:
+        statement = statement.where(User.is_active == is_active)
+    if is_admin is not None:
+        statement = statement.where(User.is_admin == is_admin)
+    if email_prefix:
+        statement = statement.where(*email_prefix_filter(email_prefix, db.get_bind().dialect.name))
+    users = list((await db.scalars(statement)).all())
+    return users[:limit], len(users) > limit
 
 
 async def change_user_password(
     db: AsyncSession, user: User, current_password: str, new_password: str
 ) -> bool:
-    if not verify_password(current_password, user.hashed_password):
+    if not await verify_password_async(current_password, user.hashed_password):
         return False
-    user.hashed_password = get_password_hash(new_password)
+    user.hashed_password = await get_password_hash_async(new_password)
+    await bump_session_epoch(db, user.id)
     await db.commit()
-    await db.refresh(user)
+    await principal_cache.invalidate(user.id)
+    await invalidate_session_epoch(user.id)
     return True
+
+
+async def set_user_active(db: AsyncSession, user: User, is_active: bool) -> User:
+    user.is_active = is_active
+    await bump_session_epoch(db, user.id)
+    await db.commit()
+    await principal_cache.invalidate(user.id)
+    await invalidate_session_epoch(user.id)
+    return user
+
+
+async def set_user_admin(db: AsyncSession, user: User, is_admin: bool) -> User:
+    user.is_admin = is_admin
+    await bump_session_epoch(db, user.id)
+    await db.commit()
+    await principal_cache.invalidate(user.id)
+    await invalidate_session_epoch(user.id)
+    return user
+
+
+async def delete_user(db: AsyncSession, user: User) -> None:
+    # Delete the user with everything that references them, then drop every
+    # cached copy so their access tokens fail on the next request (only the
+    # cache stood between a deleted user and 401). Stateless tokens fail on
+    # the missing session epoch row.
+    user_id = user.id
+    await get_refresh_token_store().revoke_all(db, user_id)
+    await db.execute(delete(RefreshToken).where(RefreshToken.user_id == user_id))
+    await db.execute(delete(Item).where(Item.owner_id == user_id))
+    await db.execute(delete(ItemCounter).where(ItemCounter.owner_id == user_id))
+    await db.execute(delete(SessionEpoch).where(SessionEpoch.user_id == user_id))
+    await db.execute(delete(User).where(User.id == user_id))
+    await db.commit()
+    await principal_cache.invalidate(user_id)
+    await invalidate_session_epoch(user_id)
+    await item_cache.invalidate(user_id)
@@ -0,0 +1,54 @@
+# Opaque keyset pagination cursors.
+#
+# A cursor wraps the id of the row a page starts or ends at (v1), or, for
+# listings sorted on another column, the sort key, that column's value and
+# the id (v2). Clients must treat it as an opaque string; the version prefix
+# lets the encoding change without breaking cursors already handed out.
+
+import base64
+import binascii
+
+_CURSOR_VERSION = "v1"
+_KEYSET_CURSOR_VERSION = "v2"
+
+
+class InvalidCursorError(ValueError):
+    pass
+
+
+def encode_cursor(row_id: int) -> str:
+    raw = f"{_CURSOR_VERSION}:{row_id}".encode("ascii")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def _decode(cursor: str) -> str:
+    try:
+        return base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode("utf-8")
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise InvalidCursorError("Invalid cursor")
+
+
+def decode_cursor(cursor: str) -> int:
+    version, _, value = _decode(cursor).partition(":")
+    if version != _CURSOR_VERSION or not value.isascii() or not value.isdigit():
+        raise InvalidCursorError("Invalid cursor")
+    return int(value)
+
+
+def encode_keyset_cursor(sort: str, value: str, row_id: int) -> str:
+    # The value goes last so it may contain any character, ":" included.
+    raw = f"{_KEYSET_CURSOR_VERSION}:{sort}:{row_id}:{value}".encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_keyset_cursor(cursor: str, sort: str) -> tuple[str, int]:
+    # Returns (value, id); a cursor issued for another sort is invalid.
+    parts = _decode(cursor).split(":", 3)
+    if len(parts) != 4:
+        raise InvalidCursorError("Invalid cursor")
+    version, cursor_sort, row_id, value = parts
+    if version != _KEYSET_CURSOR_VERSION or cursor_sort != sort:
+        raise InvalidCursorError("Invalid cursor")
+    if not row_id.isascii() or not row_id.isdigit():
+        raise InvalidCursorError("Invalid cursor")
+    return value, int(row_id)
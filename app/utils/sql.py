@@ -0,0 +1,25 @@
+# SQL expression helpers shared by the services.
+
+from typing import Any
+
+from sqlalchemy import ColumnElement
+from sqlalchemy.orm import QueryableAttribute
+
+
+def escape_like(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def prefix_match(
+    expression: ColumnElement[Any] | QueryableAttribute[Any], prefix: str, dialect_name: str
+) -> list[ColumnElement[bool]]:
+    # "expression starts with prefix", case-sensitive, wildcards matched
+    # literally. SQLite only uses an index for comparisons, not LIKE (which
+    # is also case-insensitive there), so it gets the equivalent byte-order
+    # range as well; the range is exact under its default BINARY collation.
+    conditions: list[ColumnElement[bool]] = [
+        expression.like(escape_like(prefix) + "%", escape="\\")
+    ]
+    if dialect_name == "sqlite":
+        conditions += [expression >= prefix, expression < prefix + "\U0010ffff"]
+    return conditions
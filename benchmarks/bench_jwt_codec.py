@@ -0,0 +1,82 @@
+# Benchmark access token encode/decode: HS256 codec vs python-jose.
+#
+# Usage:
+#   python benchmarks/bench_jwt_codec.py --iterations 20000
+
+import argparse
+from collections.abc import Callable
+import os
+import time
+from time import perf_counter
+from typing import Any
+
+os.environ.setdefault("SECRET_KEY", "bench-secret-key-32-chars-min-000000")
+os.environ.setdefault("REFRESH_TOKEN_SECRET", "bench-refresh-secret-32-chars-0000")
+os.environ.setdefault("SQLALCHEMY_DATABASE_URI", "sqlite:///./bench.db")
+
+from jose import jwt  # noqa: E402
+
+from app.core.config import settings  # noqa: E402
+from app.core.jwt_codec import access_token_codec  # noqa: E402
+from app.core.security import ALGORITHM  # noqa: E402
+
+
+def _claims() -> dict[str, object]:
+    now = int(time.time())
+    return {
+        "sub": "12345",
+        "email": "bench@example.com",
+        "is_active": True,
+        "is_admin": False,
+        "sep": 0,
+        "exp": now + 3600,
+        "iat": now,
+        "iss": settings.JWT_ISSUER,
+        "aud": settings.JWT_AUDIENCE,
+    }
+
+
+def _jose_encode(claims: dict[str, object]) -> str:
+    return jwt.encode(claims, settings.SECRET_KEY, algorithm=ALGORITHM)
+
+
+def _jose_decode(token: str) -> dict[str, object]:
+    return jwt.decode(
+        token,
+        settings.SECRET_KEY,
+        algorithms=[ALGORITHM],
+        audience=settings.JWT_AUDIENCE,
+        issuer=settings.JWT_ISSUER,
+        options={"leeway": settings.CLOCK_SKEW_SECONDS},
+    )
+
+
+def _time(label: str, iterations: int, func: Callable[[Any], object], arg: Any) -> float:
+    start = perf_counter()
+    for _ in range(iterations):
+        func(arg)
+    per_call = (perf_counter() - start) / iterations * 1_000_000
+    print(f"{label:<14} {per_call:8.2f}us/op")
+    return per_call
+
+
+def main(iterations: int) -> None:
+    claims = _claims()
+    token = access_token_codec.encode(claims)
+    assert _jose_decode(token) == access_token_codec.decode(_jose_encode(claims)) == claims
+
+    print(f"iterations={iterations}")
+    jose_encode = _time("jose encode", iterations, _jose_encode, claims)
+    codec_encode = _time("codec encode", iterations, access_token_codec.encode, claims)
+    jose_decode = _time("jose decode", iterations, _jose_decode, token)
+    codec_decode = _time("codec decode", iterations, access_token_codec.decode, token)
+    print(
+        f"speedup encode={jose_encode / codec_encode:.1f}x decode={jose_decode / codec_decode:.1f}x"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--iterations", type=int, default=20_000)
+    args = parser.parse_args()
+    main(args.iterations)
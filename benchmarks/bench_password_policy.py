@@ -0,0 +1,93 @@
+# Benchmark password policy validation with and without the breached-password filter.
+#
+# Usage:
+#   python benchmarks/bench_password_policy.py --items 1000000 --iterations 20000
+#
+# Builds a throwaway filter from random SHA-1 digests, then times raw filter
+# lookups and UserCreate / UserPasswordChange validation.
+
+import argparse
+from collections.abc import Callable
+import itertools
+import os
+import tempfile
+from time import perf_counter
+
+os.environ.setdefault("SECRET_KEY", "bench-secret-key-32-chars-min-000000")
+os.environ.setdefault("REFRESH_TOKEN_SECRET", "bench-refresh-secret-32-chars-0000")
+os.environ.setdefault("SQLALCHEMY_DATABASE_URI", "sqlite:///./bench.db")
+
+import app.core.breached_passwords as breached_module  # noqa: E402
+from app.core.breached_passwords import (  # noqa: E402
+    BreachedPasswordFilter,
+    build_filter_file,
+    password_digest,
+)
+from app.schemas.user import UserCreate, UserPasswordChange  # noqa: E402
+
+PASSWORD = "Bench-Passw0rd-123!"
+MEMBER_PASSWORD = "Breached-Passw0rd-123!"
+
+
+def _per_call_us(iterations: int, func: Callable[[], object]) -> float:
+    start = perf_counter()
+    for _ in range(iterations):
+        func()
+    return (perf_counter() - start) / iterations * 1_000_000
+
+
+def _validate_models(iterations: int) -> tuple[float, float]:
+    create = _per_call_us(
+        iterations, lambda: UserCreate(email="bench@example.com", password=PASSWORD)
+    )
+    change = _per_call_us(
+        iterations,
+        lambda: UserPasswordChange(current_password="old", new_password=PASSWORD),
+    )
+    return create, change
+
+
+def main(items: int, iterations: int, false_positive_rate: float) -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "bench.bloom")
+        member = password_digest(MEMBER_PASSWORD)
+        start = perf_counter()
+        build_filter_file(
+            itertools.chain([member], (os.urandom(20) for _ in range(items - 1))),
+            path,
+            expected_items=items,
+            false_positive_rate=false_positive_rate,
+        )
+        build_seconds = perf_counter() - start
+        breached = BreachedPasswordFilter(path)
+        size_mb = os.path.getsize(path) / 1024 / 1024
+        print(
+            f"items={items} fp_rate={false_positive_rate} hashes={breached.num_hashes} "
+            f"size={size_mb:.1f}MiB build={build_seconds:.1f}s"
+        )
+
+        # A miss usually stops after a probe or two; a hit tests all num_hashes bits.
+        digest = password_digest(PASSWORD)
+        miss = _per_call_us(iterations, lambda: breached.contains_digest(digest))
+        hit = _per_call_us(iterations, lambda: breached.contains_digest(member))
+        full_miss = _per_call_us(iterations, lambda: PASSWORD in breached)
+        full_hit = _per_call_us(iterations, lambda: MEMBER_PASSWORD in breached)
+        print(f"filter lookup (digest)      miss={miss:8.3f}us hit={hit:8.3f}us")
+        print(f"filter lookup (sha1+lookup) miss={full_miss:8.3f}us hit={full_hit:8.3f}us")
+
+        breached_module.get_breached_password_filter = lambda: None  # type: ignore[assignment]
+        create_without, change_without = _validate_models(iterations)
+        breached_module.get_breached_password_filter = lambda: breached  # type: ignore[assignment]
+        create_with, change_with = _validate_models(iterations)
+        print(f"UserCreate          without={create_without:8.3f}us with={create_with:8.3f}us")
+        print(f"UserPasswordChange  without={change_without:8.3f}us with={change_with:8.3f}us")
+        breached.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--items", type=int, default=1_000_000)
+    parser.add_argument("--iterations", type=int, default=20_000)
+    parser.add_argument("--false-positive-rate", type=float, default=0.001)
+    args = parser.parse_args()
+    main(args.items, args.iterations, args.false_positive_rate)
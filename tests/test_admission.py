@@ -0,0 +1,146 @@
+# Tests for admission control on CPU-heavy auth endpoints.
+
+import asyncio
+
+from fastapi.testclient import TestClient
+import pytest
+
+from app.api import deps
+from app.core.admission import AdmissionController, AdmissionRejected
+from app.core.metrics import ADMISSION_REJECTIONS
+from app.main import app
+
+client = TestClient(app)
+
+
+def _run(coro):
+    return asyncio.run(coro)
+
+
+def _controller(
+    max_concurrent: int = 1,
+    *,
+    max_queue: int = 8,
+    max_queue_per_client: int = 8,
+    max_wait_seconds: float = 5.0,
+) -> AdmissionController:
+    return AdmissionController(
+        max_concurrent,
+        max_queue=max_queue,
+        max_queue_per_client=max_queue_per_client,
+        max_wait_seconds=max_wait_seconds,
+    )
+
+
+async def _settle() -> None:
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+def test_waiters_are_served_round_robin_across_clients():
+    controller = _controller()
+    order: list[str] = []
+
+    async def _request(label: str, client_key: str) -> None:
+        await controller.acquire(client_key)
+        order.append(label)
+        await asyncio.sleep(0)
+        controller.release()
+
+    async def _scenario() -> None:
+        await controller.acquire("holder")
+        tasks = [
+            asyncio.create_task(_request("a1", "a")),
+            asyncio.create_task(_request("a2", "a")),
+            asyncio.create_task(_request("a3", "a")),
+        ]
+        await _settle()
+        tasks.append(asyncio.create_task(_request("b1", "b")))
+        await _settle()
+        assert controller.queued == 4
+        controller.release()
+        await asyncio.gather(*tasks)
+
+    _run(_scenario())
+    assert order == ["a1", "b1", "a2", "a3"]
+    assert controller.active == 0
+    assert controller.queued == 0
+
+
+def test_full_queues_reject_immediately():
+    controller = _controller(max_queue=2, max_queue_per_client=1)
+    queue_full_before = ADMISSION_REJECTIONS.labels(reason="queue_full")._value.get()
+
+    async def _scenario() -> None:
+        await controller.acquire("holder")
+        first = asyncio.create_task(controller.acquire("a"))
+        await _settle()
+        with pytest.raises(AdmissionRejected) as per_client:
+            await controller.acquire("a")
+        assert per_client.value.reason == "client_queue_full"
+        second = asyncio.create_task(controller.acquire("b"))
+        await _settle()
+        with pytest.raises(AdmissionRejected) as global_queue:
+            await controller.acquire("c")
+        assert global_queue.value.reason == "queue_full"
+        for _ in range(3):
+            controller.release()
+        await asyncio.gather(first, second)
+
+    _run(_scenario())
+    assert ADMISSION_REJECTIONS.labels(reason="queue_full")._value.get() - queue_full_before == 1
+
+
+def test_waiters_time_out_and_cancelled_waiters_leave_the_queue():
+    controller = _controller(max_wait_seconds=0.05)
+
+    async def _scenario() -> None:
+        await controller.acquire("holder")
+        with pytest.raises(AdmissionRejected) as exc:
+            await controller.acquire("slow")
+        assert exc.value.reason == "timeout"
+
+        cancelled = asyncio.create_task(controller.acquire("gone"))
+        await _settle()
+        cancelled.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await cancelled
+        assert controller.queued == 0
+        controller.release()
+
+    _run(_scenario())
+    assert controller.active == 0
+
+
+def test_disabled_controller_admits_everything():
+    controller = _controller(max_concurrent=0)
+
+    async def _scenario() -> None:
+        for _ in range(10):
+            await controller.acquire("a")
+        controller.release()
+
+    _run(_scenario())
+    assert controller.active == 0
+
+
+def test_overloaded_login_returns_503_with_retry_after(monkeypatch):
+    controller = _controller(max_queue=0)
+    monkeypatch.setattr(deps, "auth_admission", controller)
+    _run(controller.acquire("holder"))
+
+    response = client.post(
+        "/api/v1/auth/login",
+        json={"email": "busy@example.com", "password": "StrongPass123!"},
+    )
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
+    assert response.json()["code"] == "http_error"
+
+    controller.release()
+    response = client.post(
+        "/api/v1/auth/login",
+        json={"email": "busy@example.com", "password": "StrongPass123!"},
+    )
+    assert response.status_code == 401
+    assert controller.active == 0
@@ -158,6 +158,75 @@ def test_users_list_with_admin_auth():
     assert any(user["email"] == email for user in users_response.json())
 
 
+def test_users_list_pages_with_cursor_header():
+    email = f"admin-page-{uuid.uuid4().hex}@example.com"
+    register_user(email)
+    register_user(f"admin-page-other-{uuid.uuid4().hex}@example.com")
+    _run(_set_user_admin(email, True))
+    headers = {"Authorization": f"Bearer {login_user(email)['access_token']}"}
+
+    first = client.get("/api/v1/users/", params={"limit": 1}, headers=headers)
+    assert first.status_code == 200
+    assert len(first.json()) == 1
+    cursor = first.headers["X-Next-Cursor"]
+    second = client.get("/api/v1/users/", params={"limit": 1, "after": cursor}, headers=headers)
+    assert second.json()[0]["id"] < first.json()[0]["id"]
+
+
+def test_admin_updates_and_deletes_users():
+    admin_email = f"admin-manage-{uuid.uuid4().hex}@example.com"
+    user_email = f"managed-{uuid.uuid4().hex}@example.com"
+    register_user(admin_email)
+    register_user(user_email)
+    _run(_set_user_admin(admin_email, True))
+    admin_headers = {"Authorization": f"Bearer {login_user(admin_email)['access_token']}"}
+    user_headers = {"Authorization": f"Bearer {login_user(user_email)['access_token']}"}
+    user_id = client.get("/api/v1/users/me", headers=user_headers).json()["id"]
+
+    forbidden = client.delete(f"/api/v1/users/{user_id}", headers=user_headers)
+    assert forbidden.status_code == 403
+
+    updated = client.patch(
+        f"/api/v1/users/{user_id}", json={"is_admin": True}, headers=admin_headers
+    )
+    assert updated.status_code == 200
+    assert updated.json()["is_admin"] is True
+    # The cached principal was dropped, so the next request sees the new role.
+    assert client.get("/api/v1/users/me", headers=user_headers).json()["is_admin"] is True
+
+    assert client.delete(f"/api/v1/users/{user_id}", headers=admin_headers).status_code == 204
+    assert client.get("/api/v1/users/me", headers=user_headers).status_code == 401
+    assert client.delete(f"/api/v1/users/{user_id}", headers=admin_headers).status_code == 404
+    missing = client.patch("/api/v1/users/999999999", json={}, headers=admin_headers)
+    assert missing.status_code == 404
+
+
+def test_deactivated_user_cannot_log_in_or_use_tokens():
+    admin_email = f"admin-deactivate-{uuid.uuid4().hex}@example.com"
+    user_email = f"deactivated-{uuid.uuid4().hex}@example.com"
+    register_user(admin_email)
+    register_user(user_email)
+    _run(_set_user_admin(admin_email, True))
+    admin_headers = {"Authorization": f"Bearer {login_user(admin_email)['access_token']}"}
+    user_headers = {"Authorization": f"Bearer {login_user(user_email)['access_token']}"}
+    user_id = client.get("/api/v1/users/me", headers=user_headers).json()["id"]
+
+    updated = client.patch(
+        f"/api/v1/users/{user_id}", json={"is_active": False}, headers=admin_headers
+    )
+    assert updated.status_code == 200
+    assert updated.json()["is_active"] is False
+    assert client.get("/api/v1/users/me", headers=user_headers).status_code == 401
+    login = client.post(
+        "/api/v1/auth/login", json={"email": user_email, "password": "StrongPass123!"}
+    )
+    assert login.status_code == 401
+
+    client.patch(f"/api/v1/users/{user_id}", json={"is_active": True}, headers=admin_headers)
+    user_headers = {"Authorization": f"Bearer {login_user(user_email)['access_token']}"}
+    assert client.get("/api/v1/users/me", headers=user_headers).status_code == 200
+
+
 def test_refresh_flow_and_logout_revokes():
     email = f"user-{uuid.uuid4().hex}@example.com"
     register_user(email)
@@ -237,3 +237,45 @@ def test_rotate_refresh_token_is_atomic_under_concurrent_requests():
         assert all(record.revoked for record in records)
 
     _run(_scenario())
+
+
+def test_single_statement_rotation_compiles_to_one_cte_on_postgresql():
+    from sqlalchemy.dialects.postgresql import asyncpg
+
+    from app.services.refresh_token_store import build_single_statement_rotation
+
+    statement = build_single_statement_rotation("old", "new", utcnow() + timedelta(days=1))
+    sql = str(statement.compile(dialect=asyncpg.dialect()))
+    assert sql.startswith("WITH claimed AS")
+    assert "UPDATE refresh_tokens" in sql
+    assert "INSERT INTO refresh_tokens" in sql
+    assert sql.rstrip().endswith("RETURNING refresh_tokens.user_id")
+
+
+def test_rotate_refresh_token_uses_two_statements_on_sqlite():
+    from sqlalchemy import event
+
+    from app.db.session import engine
+
+    email = f"rotate-count-{uuid.uuid4().hex}@example.com"
+    created = _run(_create_user(email, "StrongPass123!"))
+    old_token = f"count-{uuid.uuid4().hex}"
+    _run(_insert_refresh_token(created.id, old_token))
+
+    statements: list[str] = []
+
+    def _record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    async def _scenario():
+        async with SessionLocal() as db:
+            return await _auth_service_module().rotate_refresh_token(db, old_token)
+
+    event.listen(engine.sync_engine, "before_cursor_execute", _record)
+    try:
+        rotated = _run(_scenario())
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", _record)
+
+    assert rotated is not None
+    assert [statement.split()[0] for statement in statements] == ["UPDATE", "INSERT"]
@@ -0,0 +1,117 @@
+# Tests for the breached-password Bloom filter and its use in the password policy.
+
+import hashlib
+import uuid
+
+from pydantic import ValidationError
+import pytest
+
+from app.commands import build_breached_password_filter as builder
+import app.core.breached_passwords as breached_module
+from app.core.breached_passwords import (
+    BloomFilterError,
+    BreachedPasswordFilter,
+    build_filter_file,
+    filter_parameters,
+    password_digest,
+)
+from app.schemas.user import UserCreate, UserPasswordChange
+
+BREACHED = ["Password123!!", "Summer2024!!x", "Qwerty123456!"]
+
+
+@pytest.fixture
+def filter_path(tmp_path):
+    path = tmp_path / "breached.bloom"
+    build_filter_file(
+        (password_digest(password) for password in BREACHED),
+        str(path),
+        expected_items=len(BREACHED),
+        false_positive_rate=0.001,
+    )
+    return path
+
+
+def test_filter_parameters_follow_target_rate():
+    num_bits, num_hashes = filter_parameters(1_000_000, 0.001)
+    assert 14_000_000 < num_bits < 14_500_000
+    assert num_bits % 8 == 0
+    assert num_hashes == 10
+
+
+def test_filter_contains_every_inserted_password(filter_path):
+    breached = BreachedPasswordFilter(str(filter_path))
+    try:
+        assert breached.items == len(BREACHED)
+        assert all(password in breached for password in BREACHED)
+        assert "Unrelated-Passw0rd!" not in breached
+    finally:
+        breached.close()
+
+
+def test_false_positive_rate_is_close_to_target(tmp_path):
+    path = tmp_path / "large.bloom"
+    inserted = [f"inserted-{i}" for i in range(5_000)]
+    build_filter_file(
+        (password_digest(password) for password in inserted),
+        str(path),
+        expected_items=len(inserted),
+        false_positive_rate=0.01,
+    )
+    breached = BreachedPasswordFilter(str(path))
+    try:
+        probes = 20_000
+        false_positives = sum(f"absent-{i}" in breached for i in range(probes))
+    finally:
+        breached.close()
+    assert false_positives / probes < 0.02
+
+
+def test_invalid_filter_files_are_rejected(tmp_path, filter_path):
+    empty = tmp_path / "empty.bloom"
+    empty.write_bytes(b"")
+    garbage = tmp_path / "garbage.bloom"
+    garbage.write_bytes(b"not a bloom filter at all, just text")
+    truncated = tmp_path / "truncated.bloom"
+    truncated.write_bytes(filter_path.read_bytes()[:-1])
+    for path in (empty, garbage, truncated):
+        with pytest.raises(BloomFilterError):
+            BreachedPasswordFilter(str(path))
+
+
+def test_password_policy_rejects_breached_passwords(monkeypatch, filter_path):
+    breached = BreachedPasswordFilter(str(filter_path))
+    monkeypatch.setattr(breached_module, "get_breached_password_filter", lambda: breached)
+    email = f"breached-{uuid.uuid4().hex}@example.com"
+
+    with pytest.raises(ValidationError, match="data breach"):
+        UserCreate(email=email, password=BREACHED[0])
+    with pytest.raises(ValidationError, match="data breach"):
+        UserPasswordChange(current_password="anything", new_password=BREACHED[1])
+    assert UserCreate(email=email, password="Unrelated-Passw0rd!").password
+
+
+def test_builder_cli_accepts_hibp_format(tmp_path, capsys):
+    source = tmp_path / "hashes.txt"
+    lines = [
+        f"{hashlib.sha1(password.encode()).hexdigest().upper()}:{count}"
+        for count, password in enumerate(BREACHED, start=1)
+    ]
+    source.write_text("\n".join(lines) + "\n")
+    output = tmp_path / "cli.bloom"
+
+    assert builder.main([str(source), str(output), "--false-positive-rate", "0.01"]) == 0
+    assert f"Wrote {len(BREACHED)} entries" in capsys.readouterr().out
+
+    breached = BreachedPasswordFilter(str(output))
+    try:
+        assert all(password in breached for password in BREACHED)
+    finally:
+        breached.close()
+
+
+def test_builder_cli_rejects_malformed_hashes(tmp_path):
+    source = tmp_path / "bad.txt"
+    source.write_text("not-a-hash:3\n")
+    with pytest.raises(SystemExit):
+        builder.main([str(source), str(tmp_path / "bad.bloom")])
@@ -10,6 +10,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from app.api import deps
 from app.core.security import get_password_hash
 from app.db.models import User
+from app.services.principal_cache import principal_cache
 
 
 def _run(coro):
@@ -24,8 +25,16 @@ def _fake_db() -> AsyncSession:
     return AsyncSession()
 
 
+@pytest.fixture(autouse=True)
+def _clear_principal_cache():
+    # Stub users must not leak into other tests through the principal cache.
+    principal_cache.clear()
+    yield
+    principal_cache.clear()
+
+
 def test_get_current_user_raises_for_non_string_subject(monkeypatch):
-    monkeypatch.setattr(deps.jwt, "decode", lambda *args, **kwargs: {"sub": 123})
+    monkeypatch.setattr(deps.access_token_codec, "decode", lambda *args, **kwargs: {"sub": 123})
 
     async def _scenario() -> None:
         with pytest.raises(HTTPException) as exc:
@@ -36,7 +45,7 @@ def test_get_current_user_raises_for_non_string_subject(monkeypatch):
 
 
 def test_get_current_user_raises_for_non_numeric_subject_string(monkeypatch):
-    monkeypatch.setattr(deps.jwt, "decode", lambda *args, **kwargs: {"sub": "abc"})
+    monkeypatch.setattr(deps.access_token_codec, "decode", lambda *args, **kwargs: {"sub": "abc"})
 
     async def _fake_get_user_by_id(db, user_id):
         raise AssertionError("get_user_by_id should not be called for invalid subject")
@@ -52,7 +61,7 @@ def test_get_current_user_raises_for_non_numeric_subject_string(monkeypatch):
 
 
 def test_get_current_user_raises_when_user_missing(monkeypatch):
-    monkeypatch.setattr(deps.jwt, "decode", lambda *args, **kwargs: {"sub": "123"})
+    monkeypatch.setattr(deps.access_token_codec, "decode", lambda *args, **kwargs: {"sub": "123"})
 
     async def _fake_get_user_by_id(db, user_id):
         return None
@@ -69,9 +78,13 @@ def test_get_current_user_raises_when_user_missing(monkeypatch):
 
 def test_get_current_user_returns_user(monkeypatch):
     user = User(
-        id=321, email=_email("deps-user"), hashed_password=get_password_hash("StrongPass123!")
+        id=321,
+        email=_email("deps-user"),
+        hashed_password=get_password_hash("StrongPass123!"),
+        is_active=True,
+        is_admin=False,
     )
-    monkeypatch.setattr(deps.jwt, "decode", lambda *args, **kwargs: {"sub": "321"})
+    monkeypatch.setattr(deps.access_token_codec, "decode", lambda *args, **kwargs: {"sub": "321"})
 
     async def _fake_get_user_by_id(db, user_id):
         assert user_id == 321
@@ -0,0 +1,97 @@
+# Tests for the password hashing worker pool.
+
+import asyncio
+import time
+
+import app.core.hashing as hashing_module
+from app.core.metrics import PASSWORD_HASH_QUEUE_DEPTH, PASSWORD_HASH_WAIT_SECONDS
+from app.core.security import (
+    get_password_hash,
+    get_password_hash_async,
+    verify_password,
+    verify_password_async,
+)
+
+
+def _run(coro):
+    return asyncio.run(coro)
+
+
+def _histogram_count(histogram) -> float:
+    for metric in histogram.collect():
+        for sample in metric.samples:
+            if sample.name.endswith("_count"):
+                return sample.value
+    return 0.0
+
+
+def test_async_hash_round_trips_with_sync_verify():
+    hashed = _run(get_password_hash_async("StrongPass123!"))
+    assert verify_password("StrongPass123!", hashed)
+    assert _run(verify_password_async("StrongPass123!", hashed)) is True
+    assert _run(verify_password_async("WrongPass123!", hashed)) is False
+
+
+def test_hashing_does_not_block_event_loop():
+    hashed = get_password_hash("StrongPass123!")
+
+    async def _scenario() -> int:
+        ticks = 0
+
+        async def _ticker() -> None:
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0.001)
+
+        ticker = asyncio.create_task(_ticker())
+        await asyncio.gather(*(verify_password_async("StrongPass123!", hashed) for _ in range(4)))
+        ticker.cancel()
+        return ticks
+
+    assert _run(_scenario()) > 1
+
+
+def test_queue_depth_and_wait_time_are_recorded():
+    hashed = get_password_hash("StrongPass123!")
+    before = _histogram_count(PASSWORD_HASH_WAIT_SECONDS)
+
+    async def _scenario() -> None:
+        await asyncio.gather(*(verify_password_async("StrongPass123!", hashed) for _ in range(5)))
+
+    _run(_scenario())
+    assert _histogram_count(PASSWORD_HASH_WAIT_SECONDS) - before == 5
+    assert PASSWORD_HASH_QUEUE_DEPTH._value.get() == 0
+
+
+def test_process_executor_runs_hashing(monkeypatch):
+    _run(hashing_module.shutdown_password_pool())
+    monkeypatch.setattr(hashing_module.settings, "PASSWORD_HASH_EXECUTOR", "process")
+    try:
+        hashed = _run(get_password_hash_async("StrongPass123!"))
+        assert verify_password("StrongPass123!", hashed)
+    finally:
+        _run(hashing_module.shutdown_password_pool())
+
+
+def test_shutdown_waits_for_in_flight_hashes_without_blocking_the_loop():
+    _run(hashing_module.shutdown_password_pool())
+
+    async def _scenario() -> int:
+        job = asyncio.create_task(hashing_module.run_password_task(time.sleep, 0.3))
+        await asyncio.sleep(0.05)
+        ticks = 0
+
+        async def _tick() -> None:
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0.01)
+
+        ticker = asyncio.create_task(_tick())
+        await hashing_module.shutdown_password_pool()
+        ticker.cancel()
+        await job
+        return ticks
+
+    assert _run(_scenario()) > 5
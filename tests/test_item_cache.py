@@ -0,0 +1,159 @@
+# Tests for the read-through item response cache.
+
+import asyncio
+import uuid
+
+from fastapi.testclient import TestClient
+import pytest
+
+from app.core.cache import MemoryCache, RedisCache
+from app.core.metrics import ITEM_RESPONSE_CACHE_HITS, ITEM_RESPONSE_CACHE_MISSES
+from app.db.base import Base
+from app.db.replicas import Replica, replica_router
+from app.db.session import build_engine
+from app.main import app
+from app.services import item_service
+from app.services.item_cache import CachedResponse, ItemResponseCache, item_cache
+
+client = TestClient(app)
+
+
+def _run(coro):
+    return asyncio.run(coro)
+
+
+def _auth_headers() -> dict[str, str]:
+    email = f"item-cache-{uuid.uuid4().hex}@example.com"
+    password = "StrongPass123!"
+    client.post("/api/v1/users/", json={"email": email, "password": password})
+    tokens = client.post("/api/v1/auth/login", json={"email": email, "password": password}).json()
+    return {"Authorization": f"Bearer {tokens['access_token']}"}
+
+
+@pytest.fixture
+def local_item_cache(monkeypatch):
+    monkeypatch.setattr(item_cache, "_backend", MemoryCache(max_entries=1000))
+    yield item_cache
+    item_cache.clear()
+
+
+def test_generation_bump_hides_older_entries():
+    cache = ItemResponseCache(MemoryCache(max_entries=10), ttl_seconds=30)
+
+    async def _scenario() -> None:
+        generation = await cache.generation(7)
+        assert generation is not None
+        assert await cache.generation(7) == generation
+        await cache.set(7, generation, "item", "1", CachedResponse('"1-0"', b"{}"))
+        assert await cache.get(7, generation, "item", "1") == CachedResponse('"1-0"', b"{}")
+        await cache.set(7, generation, "list", "page", CachedResponse(None, b"[]"))
+        assert await cache.get(7, generation, "list", "page") == CachedResponse(None, b"[]")
+
+        await cache.invalidate(7)
+        fresh = await cache.generation(7)
+        assert fresh is not None and fresh != generation
+        assert await cache.get(7, fresh, "item", "1") is None
+
+    _run(_scenario())
+
+
+def test_disabled_or_unreachable_cache_fails_open():
+    disabled = ItemResponseCache(None, ttl_seconds=30)
+    unreachable = ItemResponseCache(RedisCache("redis://127.0.0.1:1/0"), ttl_seconds=30)
+
+    async def _scenario() -> None:
+        assert not disabled.enabled
+        assert await disabled.generation(1) is None
+        generation = await unreachable.generation(1)
+        assert generation is not None
+        await unreachable.set(1, generation, "item", "1", CachedResponse(None, b"{}"))
+        assert await unreachable.get(1, generation, "item", "1") is None
+        await unreachable.invalidate(1)
+
+    _run(_scenario())
+
+
+def test_item_reads_are_served_from_cache_until_a_write(local_item_cache, monkeypatch):
+    headers = _auth_headers()
+    created = client.post("/api/v1/items/", json={"title": "Cached"}, headers=headers).json()
+    url = f"/api/v1/items/{created['id']}"
+
+    first_item = client.get(url, headers=headers)
+    first_list = client.get("/api/v1/items/", headers=headers)
+    assert first_item.status_code == 200 and first_list.status_code == 200
+
+    async def _no_database(*args, **kwargs):
+        raise AssertionError("cache hit should not query the database")
+
+    hits = ITEM_RESPONSE_CACHE_HITS.labels(kind="item")._value.get()
+    with monkeypatch.context() as patched:
+        patched.setattr(item_service, "item_list_version", _no_database)
+        patched.setattr(item_service, "item_updated_at", _no_database)
+        patched.setattr("app.api.v1.endpoints.items.fetch_item_page", _no_database)
+        cached_item = client.get(url, headers=headers)
+        cached_list = client.get("/api/v1/items/", headers=headers)
+        revalidated = client.get(
+            url, headers={**headers, "If-None-Match": first_item.headers["ETag"]}
+        )
+    assert ITEM_RESPONSE_CACHE_HITS.labels(kind="item")._value.get() == hits + 2
+    assert cached_item.content == first_item.content
+    assert cached_item.headers["ETag"] == first_item.headers["ETag"]
+    assert cached_list.json() == first_list.json()
+    assert revalidated.status_code == 304
+
+    # Every write retires the owner's cached pages.
+    misses = ITEM_RESPONSE_CACHE_MISSES.labels(kind="list")._value.get()
+    client.put(url, json={"title": "Changed"}, headers=headers)
+    assert client.get(url, headers=headers).json()["title"] == "Changed"
+    assert client.get("/api/v1/items/", headers=headers).json()["items"][0]["title"] == "Changed"
+    assert ITEM_RESPONSE_CACHE_MISSES.labels(kind="list")._value.get() == misses + 1
+
+    client.post("/api/v1/items/bulk", json={"items": [{"title": "Second"}]}, headers=headers)
+    assert len(client.get("/api/v1/items/", headers=headers).json()["items"]) == 2
+    client.post(
+        "/api/v1/items/import",
+        content=b'{"title": "Third"}\n',
+        headers={**headers, "Content-Type": "application/x-ndjson"},
+    )
+    assert len(client.get("/api/v1/items/", headers=headers).json()["items"]) == 3
+    client.delete(url, headers=headers)
+    assert client.get(url, headers=headers).status_code == 404
+    assert len(client.get("/api/v1/items/", headers=headers).json()["items"]) == 2
+
+
+def test_cached_pages_are_private_to_their_owner(local_item_cache):
+    owner, stranger = _auth_headers(), _auth_headers()
+    created = client.post("/api/v1/items/", json={"title": "Mine"}, headers=owner).json()
+    url = f"/api/v1/items/{created['id']}"
+
+    assert client.get(url, headers=owner).status_code == 200
+    assert client.get(url, headers=stranger).status_code == 404
+    assert client.get("/api/v1/items/", headers=stranger).json()["items"] == []
+
+
+def test_cached_pages_are_never_read_from_a_lagging_replica(
+    local_item_cache, monkeypatch, tmp_path
+):
+    # A replica that never replays anything, and no read-your-writes pin
+    # (another worker's pin, or a shared pin still being written).
+    replica = Replica("test-replica-stale", build_engine(f"sqlite:///{tmp_path}/stale.db", "stale"))
+
+    async def _create_schema() -> None:
+        async with replica.engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+
+    _run(_create_schema())
+    monkeypatch.setattr(replica_router, "replicas", [replica])
+    headers = _auth_headers()
+    try:
+        created = client.post("/api/v1/items/", json={"title": "Fresh"}, headers=headers).json()
+        monkeypatch.setattr(replica_router, "_pins", {})
+
+        listed = client.get("/api/v1/items/", headers=headers)
+        item = client.get(f"/api/v1/items/{created['id']}", headers=headers)
+        assert [entry["id"] for entry in listed.json()["items"]] == [created["id"]]
+        assert item.status_code == 200
+        # Served again from the cache, still the primary's page.
+        assert client.get("/api/v1/items/", headers=headers).json() == listed.json()
+    finally:
+        _run(replica.engine.dispose())
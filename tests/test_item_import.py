@@ -0,0 +1,153 @@
+# Tests for NDJSON item import: line splitting, validation, batching, API and CLI.
+
+import asyncio
+from collections.abc import AsyncIterator
+import json
+import uuid
+
+from fastapi.testclient import TestClient
+from sqlalchemy import func, select
+
+from app.commands import import_items as import_command
+from app.core.security import get_password_hash
+from app.db.models import Item, ItemCounter, User
+from app.db.session import SessionLocal
+from app.main import app
+from app.schemas.item import ItemImportResponse
+from app.services.item_import import MAX_LINE_BYTES, import_items, iter_lines
+
+client = TestClient(app)
+
+
+def _run(coro):
+    return asyncio.run(coro)
+
+
+async def _chunks(*parts: bytes) -> AsyncIterator[bytes]:
+    for part in parts:
+        yield part
+
+
+async def _collect(chunks: AsyncIterator[bytes]) -> list[bytes | None]:
+    return [line async for line in iter_lines(chunks)]
+
+
+async def _create_user() -> User:
+    async with SessionLocal() as db:
+        user = User(
+            email=f"import-{uuid.uuid4().hex}@example.com",
+            hashed_password=get_password_hash("StrongPass123!"),
+        )
+        db.add(user)
+        await db.commit()
+        return user
+
+
+async def _titles_and_count(owner_id: int) -> tuple[list[str], int | None]:
+    async with SessionLocal() as db:
+        titles = await db.scalars(
+            select(Item.title).where(Item.owner_id == owner_id).order_by(Item.id)
+        )
+        counter = await db.scalar(
+            select(ItemCounter.item_count).where(ItemCounter.owner_id == owner_id)
+        )
+        return list(titles.all()), counter
+
+
+def test_iter_lines_splits_across_chunks_and_drops_long_lines():
+    long_line = b"x" * (MAX_LINE_BYTES + 1)
+    lines = _run(
+        _collect(
+            _chunks(b'{"a"', b":1}\n\n{", b'"b":2}\n', long_line[:10], long_line[10:], b"\nend")
+        )
+    )
+    assert lines == [b'{"a":1}', b"", b'{"b":2}', None, b"end"]
+    assert _run(_collect(_chunks(long_line))) == [None]
+
+
+def test_import_items_batches_valid_rows_and_reports_errors():
+    user = _run(_create_user())
+    lines = [
+        json.dumps({"title": "One"}),
+        "not json",
+        json.dumps({"title": "Two", "description": "d", "id": 999, "owner_id": 1}),
+        "",
+        json.dumps({"description": "no title"}),
+        json.dumps({"title": "x" * 256}),
+        json.dumps({"title": "Three"}),
+    ]
+    progress: list[tuple[int, int]] = []
+
+    def _on_progress(report: ItemImportResponse) -> None:
+        progress.append((report.imported, report.failed))
+
+    async def _scenario() -> ItemImportResponse:
+        async with SessionLocal() as db:
+            return await import_items(
+                db,
+                user.id,
+                _chunks("\n".join(lines).encode()),
+                batch_size=2,
+                max_errors=2,
+                on_progress=_on_progress,
+            )
+
+    report = _run(_scenario())
+    assert (report.imported, report.failed) == (3, 3)
+    assert [error.line for error in report.errors] == [2, 5]
+    assert report.errors[1].detail == "title: Field required"
+    assert report.errors_truncated
+    assert progress == [(2, 1), (3, 3)]
+    assert _run(_titles_and_count(user.id)) == (["One", "Two", "Three"], 3)
+
+
+def test_import_endpoint_streams_request_body():
+    email = f"import-api-{uuid.uuid4().hex}@example.com"
+    password = "StrongPass123!"
+    client.post("/api/v1/users/", json={"email": email, "password": password})
+    tokens = client.post("/api/v1/auth/login", json={"email": email, "password": password}).json()
+    headers = {
+        "Authorization": f"Bearer {tokens['access_token']}",
+        "Content-Type": "application/x-ndjson",
+    }
+    body = "".join(json.dumps({"title": f"Imported {n}"}) + "\n" for n in range(5)) + "[]\n"
+
+    response = client.post("/api/v1/items/import", content=body.encode(), headers=headers)
+    assert response.status_code == 200
+    data = response.json()
+    assert (data["imported"], data["failed"]) == (5, 1)
+    assert data["errors"][0]["line"] == 6
+
+    listed = client.get("/api/v1/items/", params={"include_total": True}, headers=headers)
+    assert listed.json()["total"] == 5
+
+
+def test_import_command_reads_file(tmp_path, capsys):
+    user = _run(_create_user())
+    path = tmp_path / "items.ndjson"
+    path.write_text('{"title": "From file"}\n{"title": ""}\n{"title": 5}\n')
+
+    assert import_command.main([user.email, str(path), "--batch-size", "1"]) == 1
+    captured = capsys.readouterr()
+    assert "Imported 2 items, 1 lines rejected" in captured.out
+    assert "line 3: title: Input should be a valid string" in captured.err
+    assert _run(_titles_and_count(user.id)) == (["From file", ""], 2)
+
+    assert import_command.main(["missing@example.com", str(path)]) == 2
+
+
+def test_import_items_counts_match_rows():
+    user = _run(_create_user())
+    body = b"".join(b'{"title": "Bulk %d"}\n' % n for n in range(25))
+
+    async def _scenario() -> int:
+        async with SessionLocal() as db:
+            await import_items(db, user.id, _chunks(body[:7], body[7:]), batch_size=10)
+            return int(
+                await db.scalar(
+                    select(func.count()).select_from(Item).where(Item.owner_id == user.id)
+                )
+                or 0
+            )
+
+    assert _run(_scenario()) == 25
@@ -0,0 +1,225 @@
+# Tests for item totals (trigger-maintained counter, total modes) and search.
+
+import asyncio
+from datetime import datetime, timezone
+import itertools
+from typing import Any, get_args
+import uuid
+
+import pytest
+from sqlalchemy import delete, insert, select, update
+
+from app.core.security import get_password_hash
+from app.db.models import Item, ItemCounter, User
+from app.db.session import SessionLocal
+from app.services.item_service import (
+    ItemSort,
+    fetch_item_page,
+    item_filters,
+    item_list_version,
+    item_page_statement,
+    search_items,
+)
+
+
+def _run(coro):
+    return asyncio.run(coro)
+
+
+async def _create_owner() -> int:
+    async with SessionLocal() as db:
+        user = User(
+            email=f"counter-{uuid.uuid4().hex}@example.com",
+            hashed_password=get_password_hash("StrongPass123!"),
+        )
+        db.add(user)
+        await db.commit()
+        await db.refresh(user)
+        return user.id
+
+
+async def _counter(owner_id: int) -> int | None:
+    async with SessionLocal() as db:
+        return await db.scalar(
+            select(ItemCounter.item_count).where(ItemCounter.owner_id == owner_id)
+        )
+
+
+def test_counter_follows_orm_and_bulk_writes():
+    async def _scenario() -> None:
+        owner_id, other_id = await _create_owner(), await _create_owner()
+        assert await _counter(owner_id) is None
+
+        async with SessionLocal() as db:
+            db.add_all([Item(title="a", owner_id=owner_id), Item(title="b", owner_id=owner_id)])
+            db.add(Item(title="c", owner_id=other_id))
+            await db.commit()
+        assert await _counter(owner_id) == 2
+        assert await _counter(other_id) == 1
+
+        async with SessionLocal() as db:
+            await db.execute(
+                insert(Item), [{"title": f"bulk {n}", "owner_id": owner_id} for n in range(5)]
+            )
+            await db.commit()
+        assert await _counter(owner_id) == 7
+
+        async with SessionLocal() as db:
+            item = (await db.execute(select(Item).where(Item.owner_id == owner_id))).scalars()
+            await db.delete(item.first())
+            await db.commit()
+        assert await _counter(owner_id) == 6
+
+        async with SessionLocal() as db:
+            await db.execute(delete(Item).where(Item.owner_id == owner_id))
+            await db.commit()
+        assert await _counter(owner_id) == 0
+        assert await _counter(other_id) == 1
+
+    _run(_scenario())
+
+
+def test_list_version_bumps_on_every_write():
+    async def _version(owner_id: int) -> int:
+        async with SessionLocal() as db:
+            return await item_list_version(db, owner_id)
+
+    async def _scenario() -> None:
+        owner_id, other_id = await _create_owner(), await _create_owner()
+        assert await _version(owner_id) == 0
+
+        async with SessionLocal() as db:
+            await db.execute(
+                insert(Item), [{"title": f"v {n}", "owner_id": owner_id} for n in range(3)]
+            )
+            db.add(Item(title="other", owner_id=other_id))
+            await db.commit()
+        inserted = await _version(owner_id)
+        assert inserted > 0
+
+        async with SessionLocal() as db:
+            await db.execute(update(Item).where(Item.owner_id == owner_id).values(title="renamed"))
+            await db.commit()
+        updated = await _version(owner_id)
+        assert updated > inserted
+
+        other_before = await _version(other_id)
+        async with SessionLocal() as db:
+            await db.execute(delete(Item).where(Item.owner_id == owner_id))
+            await db.commit()
+        assert await _version(owner_id) > updated
+        assert await _version(other_id) == other_before
+
+    _run(_scenario())
+
+
+@pytest.mark.parametrize("total_kind", ["exact", "maintained", "estimated"])
+def test_fetch_item_page_totals(total_kind):
+    async def _scenario() -> None:
+        owner_id = await _create_owner()
+        async with SessionLocal() as db:
+            db.add_all([Item(title=f"item {n}", owner_id=owner_id) for n in range(3)])
+            await db.commit()
+            owned = select(Item).where(Item.owner_id == owner_id).order_by(Item.id)
+
+            items, total, kind = await fetch_item_page(db, owned.limit(2), owner_id, total_kind)
+            assert len(items) == 2
+            assert total == 3
+            # SQLite has no planner estimate; the maintained counter stands in.
+            assert kind == ("maintained" if total_kind == "estimated" else total_kind)
+
+            empty, total, _ = await fetch_item_page(db, owned.offset(10), owner_id, total_kind)
+            assert empty == []
+            assert total == 3
+
+            items, total, kind = await fetch_item_page(db, owned, owner_id, None)
+            assert len(items) == 3
+            assert total is None and kind is None
+
+    _run(_scenario())
+
+
+def test_search_ranks_owner_matches_and_follows_writes():
+    async def _scenario() -> None:
+        owner_id, other_id = await _create_owner(), await _create_owner()
+        async with SessionLocal() as db:
+            await db.execute(
+                insert(Item),
+                [
+                    {"title": "Garden hose", "description": None, "owner_id": owner_id},
+                    {"title": "Toolbox", "description": "for the garden", "owner_id": owner_id},
+                    {"title": "Kettle", "description": "kitchen", "owner_id": owner_id},
+                    {"title": "Garden rake", "description": None, "owner_id": other_id},
+                ],
+            )
+            await db.commit()
+
+            hits = await search_items(db, owner_id, "GARDEN", skip=0, limit=10)
+            # Title matches outrank description matches; other owners never match.
+            assert [item.title for item in hits] == ["Garden hose", "Toolbox"]
+            # Words are ANDed and stemmed; FTS5 syntax in the query is inert.
+            hits = await search_items(db, owner_id, 'gardens "hose*', skip=0, limit=10)
+            assert [item.title for item in hits] == ["Garden hose"]
+            assert await search_items(db, owner_id, '"" -', skip=0, limit=10) == []
+            paged = await search_items(db, owner_id, "garden", skip=1, limit=1)
+            assert [item.title for item in paged] == ["Toolbox"]
+
+            kettle = await search_items(db, owner_id, "kettle", skip=0, limit=10)
+            await db.execute(update(Item).where(Item.id == kettle[0].id).values(title="Teapot"))
+            await db.execute(delete(Item).where(Item.owner_id == owner_id, Item.title == "Toolbox"))
+            await db.commit()
+            assert await search_items(db, owner_id, "kettle", skip=0, limit=10) == []
+            hits = await search_items(db, owner_id, "teapot kitchen", skip=0, limit=10)
+            assert [item.title for item in hits] == ["Teapot"]
+            hits = await search_items(db, owner_id, "garden", skip=0, limit=10)
+            assert [item.title for item in hits] == ["Garden hose"]
+
+    _run(_scenario())
+
+
+async def _query_plan(db, statement) -> list[str]:
+    # EXPLAIN QUERY PLAN details; the plan does not depend on the bound values.
+    connection = await db.connection()
+    compiled = statement.compile(dialect=connection.dialect)
+    params = tuple(
+        str(value) if isinstance(value, datetime) else value
+        for value in (compiled.params[name] for name in compiled.positiontup or [])
+    )
+    result = await connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {compiled}", params)
+    return [row[-1] for row in result]
+
+
+def test_every_listing_combination_uses_an_index():
+    sorts = get_args(ItemSort)
+    filter_options: dict[str, Any] = {
+        "created_after": datetime(2020, 1, 1, tzinfo=timezone.utc),
+        "updated_after": datetime(2020, 1, 1, tzinfo=timezone.utc),
+        "title_prefix": "abc",
+    }
+    filter_sets: list[dict[str, Any]] = [
+        dict(combo)
+        for size in range(len(filter_options) + 1)
+        for combo in itertools.combinations(filter_options.items(), size)
+    ]
+
+    async def _scenario() -> None:
+        async with SessionLocal() as db:
+            for sort in sorts:
+                for filter_set in filter_sets:
+                    filters = item_filters("sqlite", **filter_set)
+                    position = (filter_options.get(sort.lstrip("-"), "abc"), 1)
+                    for keyset in ({}, {"after": position}, {"before": position}):
+                        statement = item_page_statement(1, sort, filters, **keyset).limit(51)
+                        plan = await _query_plan(db, statement)
+                        scans = [step for step in plan if "items" in step]
+                        assert scans and all("USING" in step for step in scans), (
+                            sort,
+                            filter_set,
+                            keyset,
+                            plan,
+                        )
+                        if not filter_set or set(filter_set) == {sort.lstrip("-")}:
+                            # The index also delivers the order: no sort step.
+                            assert not any("TEMP B-TREE" in step for step in plan), (sort, plan)
+
+    _run(_scenario())
@@ -1,10 +1,16 @@
 # Tests for item endpoints and access control.
 
+import csv
+from datetime import datetime, timedelta, timezone
+import io
+import json
 import uuid
 
 from fastapi.testclient import TestClient
 
+from app.api.v1.endpoints import items as items_endpoint
 from app.main import app
+from app.schemas import item as item_schemas
 
 client = TestClient(app)
 
@@ -124,3 +130,418 @@ def test_items_require_auth():
     invalid_headers = {"Authorization": "Bearer invalid"}
     list_invalid = client.get("/api/v1/items/", headers=invalid_headers)
     assert list_invalid.status_code == 401
+
+
+def test_item_listing_pages_by_cursor():
+    email = f"user-{uuid.uuid4().hex}@example.com"
+    register_user(email)
+    headers = {"Authorization": f"Bearer {login_user(email)['access_token']}"}
+    ids = [
+        client.post("/api/v1/items/", json={"title": f"Item {i}"}, headers=headers).json()["id"]
+        for i in range(5)
+    ]
+
+    first = client.get("/api/v1/items/", params={"limit": 2}, headers=headers).json()
+    assert [item["id"] for item in first["items"]] == ids[:2]
+    assert first["total"] == 5
+    assert first["prev_cursor"] is None
+
+    second = client.get(
+        "/api/v1/items/", params={"limit": 2, "after": first["next_cursor"]}, headers=headers
+    ).json()
+    assert [item["id"] for item in second["items"]] == ids[2:4]
+    assert second["total"] is None
+
+    last = client.get(
+        "/api/v1/items/", params={"limit": 2, "after": second["next_cursor"]}, headers=headers
+    ).json()
+    assert [item["id"] for item in last["items"]] == ids[4:]
+    assert last["next_cursor"] is None
+
+    back = client.get(
+        "/api/v1/items/", params={"limit": 2, "before": last["prev_cursor"]}, headers=headers
+    ).json()
+    assert [item["id"] for item in back["items"]] == ids[2:4]
+    assert back["next_cursor"] == second["next_cursor"]
+
+    start = client.get(
+        "/api/v1/items/", params={"limit": 2, "before": back["prev_cursor"]}, headers=headers
+    ).json()
+    assert [item["id"] for item in start["items"]] == ids[:2]
+    assert start["prev_cursor"] is None
+
+    offset = client.get("/api/v1/items/", params={"skip": 3, "limit": 1}, headers=headers).json()
+    assert [item["id"] for item in offset["items"]] == [ids[3]]
+    assert offset["next_cursor"] and offset["prev_cursor"]
+
+
+def test_item_listing_rejects_bad_cursors():
+    email = f"user-{uuid.uuid4().hex}@example.com"
+    register_user(email)
+    headers = {"Authorization": f"Bearer {login_user(email)['access_token']}"}
+    item_id = client.post("/api/v1/items/", json={"title": "One"}, headers=headers).json()["id"]
+    listed = client.get("/api/v1/items/", params={"limit": 1}, headers=headers).json()
+    assert listed["items"][0]["id"] == item_id
+
+    for params in (
+        {"after": "not-a-cursor"},
+        {"after": "djI6MQ"},
+        {"after": "djE6MQ", "before": "djE6MQ"},
+        {"after": "djE6MQ", "skip": 1},
+    ):
+        response = client.get("/api/v1/items/", params=params, headers=headers)
+        assert response.status_code == 400
+
+
+def test_item_listing_total_modes():
+    email = f"user-{uuid.uuid4().hex}@example.com"
+    register_user(email)
+    headers = {"Authorization": f"Bearer {login_user(email)['access_token']}"}
+    for i in range(3):
+        client.post("/api/v1/items/", json={"title": f"Item {i}"}, headers=headers)
+
+    default = client.get("/api/v1/items/", headers=headers).json()
+    assert (default["total"], default["total_kind"]) == (3, "maintained")
+
+    exact = client.get("/api/v1/items/", params={"total_mode": "exact"}, headers=headers).json()
+    assert (exact["total"], exact["total_kind"]) == (3, "exact")
+
+    skipped = client.get("/api/v1/items/", params={"include_total": False}, headers=headers)
+    assert (skipped.json()["total"], skipped.json()["total_kind"]) == (None, None)
+
+    first = client.get("/api/v1/items/", params={"limit": 1}, headers=headers).json()
+    cursor_page = client.get(
+        "/api/v1/items/",
+        params={"after": first["next_cursor"], "include_total": True},
+        headers=headers,
+    ).json()
+    assert len(cursor_page["items"]) == 2
+    assert cursor_page["total"] == 3
+
+    invalid = client.get("/api/v1/items/", params={"total_mode": "guess"}, headers=headers)
+    assert invalid.status_code == 422
+
+
+def test_bulk_item_endpoints_report_per_entry_results():
+    email_one = f"user-{uuid.uuid4().hex}@example.com"
+    email_two = f"user-{uuid.uuid4().hex}@example.com"
+    register_user(email_one)
+    register_user(email_two)
+    headers = {"Authorization": f"Bearer {login_user(email_one)['access_token']}"}
+    headers_other = {"Authorization": f"Bearer {login_user(email_two)['access_token']}"}
+    foreign_id = client.post("/api/v1/items/", json={"title": "Theirs"}, headers=headers_other)
+    foreign_id = foreign_id.json()["id"]
+
+    created = client.post(
+        "/api/v1/items/bulk",
+        json={"items": [{"title": f"Bulk {n}", "description": "d"} for n in range(3)]},
+        headers=headers,
+    )
+    assert created.status_code == 201
+    results = created.json()["results"]
+    assert [(r["index"], r["status"]) for r in results] == [(0, 201), (1, 201), (2, 201)]
+    assert [r["item"]["title"] for r in results] == ["Bulk 0", "Bulk 1", "Bulk 2"]
+    ids = [r["id"] for r in results]
+
+    updated = client.patch(
+        "/api/v1/items/bulk",
+        json={
+            "items": [
+                {"id": ids[0], "title": "Renamed"},
+                {"id": foreign_id, "title": "Hijacked"},
+                {"id": ids[1], "description": "New description"},
+            ]
+        },
+        headers=headers,
+    )
+    assert updated.status_code == 200
+    results = updated.json()["results"]
+    assert [r["status"] for r in results] == [200, 404, 200]
+    assert (results[0]["item"]["title"], results[0]["item"]["description"]) == ("Renamed", "d")
+    assert (results[2]["item"]["title"], results[2]["item"]["description"]) == (
+        "Bulk 1",
+        "New description",
+    )
+    theirs = client.get(f"/api/v1/items/{foreign_id}", headers=headers_other).json()
+    assert theirs["title"] == "Theirs"
+
+    deleted = client.request(
+        "DELETE", "/api/v1/items/bulk", json={"ids": [ids[2], foreign_id]}, headers=headers
+    )
+    assert deleted.status_code == 200
+    assert [r["status"] for r in deleted.json()["results"]] == [204, 404]
+    assert client.get(f"/api/v1/items/{ids[2]}", headers=headers).status_code == 404
+    assert client.get(f"/api/v1/items/{foreign_id}", headers=headers_other).status_code == 200
+    listed = client.get("/api/v1/items/", params={"total_mode": "maintained"}, headers=headers)
+    assert listed.json()["total"] == 2
+
+
+def test_bulk_item_update_clears_description_only_when_null_is_sent():
+    email = f"user-{uuid.uuid4().hex}@example.com"
+    register_user(email)
+    headers = {"Authorization": f"Bearer {login_user(email)['access_token']}"}
+    created = client.post(
+        "/api/v1/items/bulk",
+        json={
+            "items": [{"title": "Keep", "description": "d"}, {"title": "Clear", "description": "d"}]
+        },
+        headers=headers,
+    )
+    ids = [result["id"] for result in created.json()["results"]]
+
+    updated = client.patch(
+        "/api/v1/items/bulk",
+        json={"items": [{"id": ids[0], "title": "Kept"}, {"id": ids[1], "description": None}]},
+        headers=headers,
+    )
+    assert updated.status_code == 200
+    items = [result["item"] for result in updated.json()["results"]]
+    assert (items[0]["title"], items[0]["description"]) == ("Kept", "d")
+    assert (items[1]["title"], items[1]["description"]) == ("Clear", None)
+
+    null_title = client.patch(
+        "/api/v1/items/bulk", json={"items": [{"id": ids[0], "title": None}]}, headers=headers
+    )
+    assert null_title.status_code == 422
+
+
+def test_bulk_item_endpoints_validate_batches(monkeypatch):
+    email = f"user-{uuid.uuid4().hex}@example.com"
+    register_user(email)
+    headers = {"Authorization": f"Bearer {login_user(email)['access_token']}"}
+    monkeypatch.setattr(item_schemas.settings, "ITEMS_BULK_MAX_SIZE", 2)
+
+    too_many = client.post(
+        "/api/v1/items/bulk", json={"items": [{"title": "x"}] * 3}, headers=headers
+    )
+    assert too_many.status_code == 422
+    empty = client.post("/api/v1/items/bulk", json={"items": []}, headers=headers)
+    assert empty.status_code == 422
+    duplicates = client.request(
+        "DELETE", "/api/v1/items/bulk", json={"ids": [1, 1]}, headers=headers
+    )
+    assert duplicates.status_code == 422
+
+
+def test_item_export_streams_ndjson_and_csv(monkeypatch):
+    email = f"user-{uuid.uuid4().hex}@example.com"
+    register_user(email)
+    headers = {"Authorization": f"Bearer {login_user(email)['access_token']}"}
+    other_email = f"user-{uuid.uuid4().hex}@example.com"
+    register_user(other_email)
+    other_headers = {"Authorization": f"Bearer {login_user(other_email)['access_token']}"}
+    monkeypatch.setattr(items_endpoint.settings, "ITEMS_EXPORT_BATCH_SIZE", 2)
+    entries = [{"title": f"Export {n}", "description": "a,b" if n == 2 else None} for n in range(5)]
+    created = client.post("/api/v1/items/bulk", json={"items": entries}, headers=headers)
+    assert created.status_code == 201
+    client.post("/api/v1/items/", json={"title": "Not mine"}, headers=other_headers)
+    expected = [result["item"] for result in created.json()["results"]]
+
+    ndjson = client.get("/api/v1/items/export", headers=headers)
+    assert ndjson.status_code == 200
+    assert ndjson.headers["content-type"] == "application/x-ndjson"
+    assert "items.ndjson" in ndjson.headers["content-disposition"]
+    assert [json.loads(line) for line in ndjson.text.splitlines()] == expected
+
+    exported = client.get("/api/v1/items/export", params={"format": "csv"}, headers=headers)
+    assert exported.status_code == 200
+    assert exported.headers["content-type"].startswith("text/csv")
+    rows = list(csv.DictReader(io.StringIO(exported.text)))
+    assert [row["title"] for row in rows] == [item["title"] for item in expected]
+    assert rows[2]["description"] == "a,b"
+
+    assert (
+        client.get("/api/v1/items/export", params={"format": "xml"}, headers=headers).status_code
+        == 422
+    )
+    assert client.get("/api/v1/items/export").status_code == 401
+
+
+def test_item_search_endpoint_pages_ranked_hits():
+    email = f"user-{uuid.uuid4().hex}@example.com"
+    register_user(email)
+    headers = {"Authorization": f"Bearer {login_user(email)['access_token']}"}
+    entries = [
+        {"title": "Blue notebook"},
+        {"title": "Pen", "description": "blue ink"},
+        {"title": "Red notebook"},
+    ]
+    assert (
+        client.post("/api/v1/items/bulk", json={"items": entries}, headers=headers).status_code
+        == 201
+    )
+
+    first = client.get("/api/v1/items/search", params={"q": "blue", "limit": 1}, headers=headers)
+    assert first.status_code == 200
+    assert [item["title"] for item in first.json()["items"]] == ["Blue notebook"]
+    assert first.json()["has_more"] is True
+    second = client.get(
+        "/api/v1/items/search", params={"q": "blue", "skip": 1, "limit": 1}, headers=headers
+    )
+    assert [item["title"] for item in second.json()["items"]] == ["Pen"]
+    assert second.json()["has_more"] is False
+
+    assert client.get("/api/v1/items/search", params={"q": ""}, headers=headers).status_code == 422
+    assert client.get("/api/v1/items/search", params={"q": "blue"}).status_code == 401
+
+
+def _walk(
+    headers: dict, params: dict, direction: str = "after", cursor: str | None = None
+) -> list[dict]:
+    # Follow cursors to the end in one direction, collecting every page.
+    pages = []
+    while True:
+        query = dict(params, limit=2)
+        if cursor is not None:
+            query[direction] = cursor
+        page = client.get("/api/v1/items/", params=query, headers=headers)
+        assert page.status_code == 200
+        pages.append(page.json())
+        cursor = page.json()["next_cursor" if direction == "after" else "prev_cursor"]
+        if cursor is None:
+            return pages
+
+
+def test_item_listing_sorts_and_filters_with_cursors():
+    email = f"user-{uuid.uuid4().hex}@example.com"
+    register_user(email)
+    headers = {"Authorization": f"Bearer {login_user(email)['access_token']}"}
+    titles = ["pear", "Apple", "apple pie", "banana", "apple", "apple_x"]
+    created = client.post(
+        "/api/v1/items/bulk", json={"items": [{"title": t} for t in titles]}, headers=headers
+    )
+    ids = {result["item"]["title"]: result["id"] for result in created.json()["results"]}
+
+    ascending = sorted(titles)
+    pages = _walk(headers, {"sort": "title"})
+    assert [item["title"] for page in pages for item in page["items"]] == ascending
+    # Walking back from the last page's prev_cursor restores the same pages.
+    backwards = _walk(headers, {"sort": "title"}, "before", pages[-1]["prev_cursor"])
+    assert [page["items"] for page in backwards] == [page["items"] for page in pages[-2::-1]]
+    pages = _walk(headers, {"sort": "-title"})
+    assert [item["title"] for page in pages for item in page["items"]] == ascending[::-1]
+
+    prefixed = client.get(
+        "/api/v1/items/", params={"title_prefix": "apple", "sort": "-id"}, headers=headers
+    ).json()
+    assert [item["title"] for item in prefixed["items"]] == ["apple_x", "apple", "apple pie"]
+    assert prefixed["total"] is None
+    wildcard = client.get(
+        "/api/v1/items/",
+        params={"title_prefix": "apple_", "include_total": True, "total_mode": "maintained"},
+        headers=headers,
+    ).json()
+    assert [item["title"] for item in wildcard["items"]] == ["apple_x"]
+    assert (wildcard["total"], wildcard["total_kind"]) == (1, "exact")
+
+    cutoff = datetime.now(timezone.utc)
+    renamed = client.put(f"/api/v1/items/{ids['pear']}", json={"title": "plum"}, headers=headers)
+    assert renamed.status_code == 200
+    for params in (
+        {"updated_after": cutoff.isoformat()},
+        {"updated_after": cutoff.astimezone(timezone(timedelta(hours=5))).isoformat()},
+    ):
+        updated = client.get("/api/v1/items/", params=params, headers=headers).json()
+        assert [item["title"] for item in updated["items"]] == ["plum"]
+    recent = _walk(headers, {"created_after": "2000-01-01T00:00:00Z", "sort": "-created_at"})
+    assert sorted(item["id"] for page in recent for item in page["items"]) == sorted(ids.values())
+    future = client.get(
+        "/api/v1/items/", params={"created_after": "2999-01-01T00:00:00Z"}, headers=headers
+    )
+    assert future.json()["items"] == []
+
+    title_cursor = _walk(headers, {"sort": "title"})[0]["next_cursor"]
+    wrong_sort = client.get(
+        "/api/v1/items/", params={"sort": "created_at", "after": title_cursor}, headers=headers
+    )
+    assert wrong_sort.status_code == 400
+    unknown = client.get("/api/v1/items/", params={"sort": "owner_id"}, headers=headers)
+    assert unknown.status_code == 422
+
+
+def test_item_conditional_requests():
+    email = f"etag-{uuid.uuid4().hex}@example.com"
+    register_user(email)
+    tokens = login_user(email)
+    headers = {"Authorization": f"Bearer {tokens['access_token']}"}
+    created = client.post("/api/v1/items/", json={"title": "Tagged"}, headers=headers).json()
+    url = f"/api/v1/items/{created['id']}"
+
+    fetched = client.get(url, headers=headers)
+    etag = fetched.headers["ETag"]
+    assert fetched.headers["Cache-Control"] == "private, no-cache"
+    revalidated = client.get(url, headers={**headers, "If-None-Match": f"W/{etag}"})
+    assert revalidated.status_code == 304
+    assert revalidated.headers["ETag"] == etag
+    assert revalidated.content == b""
+    assert (
+        client.get(
+            "/api/v1/items/999999999", headers={**headers, "If-None-Match": etag}
+        ).status_code
+        == 404
+    )
+
+    listed = client.get("/api/v1/items/", headers=headers)
+    list_etag = listed.headers["ETag"]
+    assert (
+        client.get("/api/v1/items/", headers={**headers, "If-None-Match": list_etag}).status_code
+        == 304
+    )
+    # The validator covers the query: another page size is another representation.
+    assert (
+        client.get(
+            "/api/v1/items/", params={"limit": 5}, headers={**headers, "If-None-Match": list_etag}
+        ).status_code
+        == 200
+    )
+
+    updated = client.put(url, json={"title": "Retagged"}, headers={**headers, "If-Match": etag})
+    assert updated.status_code == 200
+    new_etag = updated.headers["ETag"]
+    assert new_etag != etag
+    assert client.get(url, headers={**headers, "If-None-Match": etag}).status_code == 200
+    assert (
+        client.get("/api/v1/items/", headers={**headers, "If-None-Match": list_etag}).status_code
+        == 200
+    )
+
+    # A stale If-Match is refused without writing anything.
+    stale = client.put(url, json={"title": "Lost update"}, headers={**headers, "If-Match": etag})
+    assert stale.status_code == 412
+    assert client.get(url, headers=headers).json()["title"] == "Retagged"
+    assert client.delete(url, headers={**headers, "If-Match": etag}).status_code == 412
+    assert client.delete(url, headers={**headers, "If-Match": '"not-a-version"'}).status_code == 412
+
+    list_etag = client.get("/api/v1/items/", headers=headers).headers["ETag"]
+    assert client.delete(url, headers={**headers, "If-Match": new_etag}).status_code == 204
+    assert (
+        client.put(url, json={"title": "x"}, headers={**headers, "If-Match": "*"}).status_code
+        == 404
+    )
+    assert (
+        client.get("/api/v1/items/", headers={**headers, "If-None-Match": list_etag}).status_code
+        == 200
+    )
+
+    # Estimated totals have no validator.
+    estimated = client.get(
+        "/api/v1/items/", params={"include_total": True, "total_mode": "estimated"}, headers=headers
+    )
+    assert "ETag" not in estimated.headers
+
+
+def test_profile_conditional_requests():
+    email = f"etag-me-{uuid.uuid4().hex}@example.com"
+    register_user(email)
+    tokens = login_user(email)
+    headers = {"Authorization": f"Bearer {tokens['access_token']}"}
+    me = client.get("/api/v1/users/me", headers=headers)
+    etag = me.headers["ETag"]
+    assert (
+        client.get("/api/v1/users/me", headers={**headers, "If-None-Match": etag}).status_code
+        == 304
+    )
+    assert (
+        client.get("/api/v1/users/me", headers={**headers, "If-None-Match": '"other"'}).status_code
+        == 200
+    )
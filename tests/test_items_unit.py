@@ -1,16 +1,31 @@
 # Unit tests for item endpoint functions.
 
 import asyncio
+import json
+from collections.abc import Awaitable
+from typing import Any
 import uuid
 
 import pytest
-from fastapi import HTTPException, status
+from fastapi import HTTPException, Request, Response, status
+from sqlalchemy import event
 
 from app.api.v1.endpoints import items as items_endpoint
+from app.core.metrics import ITEM_EXPORTS_ABORTED
 from app.core.security import get_password_hash
-from app.db.models import User
-from app.db.session import SessionLocal
-from app.schemas.item import ItemCreate, ItemUpdate
+from app.db.models import Item, User
+from app.db.session import SessionLocal, engine
+from app.schemas.auth import Principal
+from app.schemas.item import (
+    ItemBulkCreate,
+    ItemBulkDelete,
+    ItemBulkUpdate,
+    ItemBulkUpdateEntry,
+    ItemCreate,
+    ItemListResponse,
+    ItemUpdate,
+)
+from app.services import item_service
 
 
 def _run(coro):
@@ -35,15 +50,17 @@ def test_items_endpoint_functions_cover_success_and_not_found_paths():
             await db.commit()
             await db.refresh(owner)
             await db.refresh(other)
-            owner_user = User(
+            owner_user = Principal(
                 id=owner.id,
                 email=_email("items-owner-stub"),
-                hashed_password=get_password_hash("StrongPass123!"),
+                is_active=True,
+                is_admin=False,
             )
-            other_user = User(
+            other_user = Principal(
                 id=other.id,
                 email=_email("items-other-stub"),
-                hashed_password=get_password_hash("StrongPass123!"),
+                is_active=True,
+                is_admin=False,
             )
 
             created = await items_endpoint.create_item(
@@ -53,29 +70,33 @@ def test_items_endpoint_functions_cover_success_and_not_found_paths():
             )
             assert created.id is not None
 
-            page = await items_endpoint.read_items(0, 10, db, owner_user)
-            assert page.total >= 1
+            page = await items_endpoint.read_items(Response(), 0, 10, db, owner_user)
+            assert isinstance(page, ItemListResponse)
+            assert page.total is not None and page.total >= 1
             assert any(item.id == created.id for item in page.items)
 
-            fetched = await items_endpoint.read_item(created.id, db, owner_user)
+            fetched = await items_endpoint.read_item(created.id, Response(), db, owner_user)
+            assert isinstance(fetched, Item)
             assert fetched.id == created.id
 
             updated = await items_endpoint.update_item(
                 created.id,
                 ItemUpdate(description="Updated description"),
+                Response(),
                 db,
                 owner_user,
             )
             assert updated.description == "Updated description"
 
             with pytest.raises(HTTPException) as read_forbidden:
-                await items_endpoint.read_item(created.id, db, other_user)
+                await items_endpoint.read_item(created.id, Response(), db, other_user)
             assert read_forbidden.value.status_code == status.HTTP_404_NOT_FOUND
 
             with pytest.raises(HTTPException) as update_missing:
                 await items_endpoint.update_item(
                     999999999,
                     ItemUpdate(title="x"),
+                    Response(),
                     db,
                     owner_user,
                 )
@@ -88,3 +109,182 @@ def test_items_endpoint_functions_cover_success_and_not_found_paths():
             assert delete_missing.value.status_code == status.HTTP_404_NOT_FOUND
 
     _run(_scenario())
+
+
+class _StatementCounter:
+    def __init__(self) -> None:
+        self.count = 0
+
+    def __call__(self, *args: object) -> None:
+        self.count += 1
+
+    async def run(self, coro: Awaitable[Any]) -> Any:
+        self.count = 0
+        event.listen(engine.sync_engine, "before_cursor_execute", self)
+        try:
+            return await coro
+        finally:
+            event.remove(engine.sync_engine, "before_cursor_execute", self)
+
+
+async def _owner_and_stranger(db) -> tuple[Principal, Principal]:
+    users = [
+        User(email=_email("writes"), hashed_password=get_password_hash("StrongPass123!"))
+        for _ in range(2)
+    ]
+    db.add_all(users)
+    await db.commit()
+    principals = []
+    for user in users:
+        await db.refresh(user)
+        principals.append(Principal(id=user.id, email=user.email, is_active=True, is_admin=False))
+    return principals[0], principals[1]
+
+
+def test_item_writes_take_one_statement_each():
+    async def _scenario() -> None:
+        counter = _StatementCounter()
+        async with SessionLocal() as db:
+            owner, stranger = await _owner_and_stranger(db)
+
+            created = await counter.run(
+                items_endpoint.create_item(ItemCreate(title="Counted"), db, owner)
+            )
+            assert counter.count == 1
+            assert created.title == "Counted"
+
+            updated = await counter.run(
+                items_endpoint.update_item(
+                    created.id, ItemUpdate(title="Renamed"), Response(), db, owner
+                )
+            )
+            assert counter.count == 1
+            assert updated.title == "Renamed"
+
+            with pytest.raises(HTTPException) as update_other:
+                await counter.run(
+                    items_endpoint.update_item(
+                        created.id, ItemUpdate(title="x"), Response(), db, stranger
+                    )
+                )
+            assert update_other.value.status_code == status.HTTP_404_NOT_FOUND
+            assert counter.count == 1
+
+            with pytest.raises(HTTPException) as delete_other:
+                await counter.run(items_endpoint.delete_item(created.id, db, stranger))
+            assert delete_other.value.status_code == status.HTTP_404_NOT_FOUND
+            assert counter.count == 1
+
+            await counter.run(items_endpoint.delete_item(created.id, db, owner))
+            assert counter.count == 1
+
+    _run(_scenario())
+
+
+def test_item_writes_without_returning(monkeypatch):
+    monkeypatch.setattr(engine.dialect, "insert_returning", False)
+    monkeypatch.setattr(engine.dialect, "update_returning", False)
+
+    async def _scenario() -> None:
+        async with SessionLocal() as db:
+            owner, stranger = await _owner_and_stranger(db)
+            created = await items_endpoint.create_item(ItemCreate(title="Fallback"), db, owner)
+            assert created.id is not None
+
+            updated = await items_endpoint.update_item(
+                created.id, ItemUpdate(description="Changed"), Response(), db, owner
+            )
+            assert (updated.title, updated.description) == ("Fallback", "Changed")
+
+            with pytest.raises(HTTPException) as update_other:
+                await items_endpoint.update_item(
+                    created.id, ItemUpdate(title="x"), Response(), db, stranger
+                )
+            assert update_other.value.status_code == status.HTTP_404_NOT_FOUND
+
+            unchanged = await items_endpoint.update_item(
+                created.id, ItemUpdate(), Response(), db, owner
+            )
+            assert unchanged.description == "Changed"
+
+    _run(_scenario())
+
+
+def test_bulk_item_writes_take_one_statement_per_batch():
+    async def _scenario() -> None:
+        counter = _StatementCounter()
+        async with SessionLocal() as db:
+            owner, _ = await _owner_and_stranger(db)
+            created = await counter.run(
+                items_endpoint.create_items(
+                    ItemBulkCreate(items=[ItemCreate(title=f"Bulk {n}") for n in range(20)]),
+                    db,
+                    owner,
+                )
+            )
+            assert counter.count == 1
+            ids = [result.id for result in created.results]
+
+            entries = [ItemBulkUpdateEntry(id=item_id, title="Renamed") for item_id in ids]
+            await counter.run(items_endpoint.update_items(ItemBulkUpdate(items=entries), db, owner))
+            assert counter.count == 1
+
+            await counter.run(items_endpoint.delete_items(ItemBulkDelete(ids=ids), db, owner))
+            assert counter.count == 1
+
+    _run(_scenario())
+
+
+def test_bulk_create_fails_loudly_when_returned_ids_do_not_follow_values_order(monkeypatch):
+    class _Rows:
+        def all(self) -> list[Item]:
+            # Ids assigned in reverse VALUES order.
+            return [
+                Item(id=2, title="First", description=None, owner_id=0),
+                Item(id=1, title="Second", description=None, owner_id=0),
+            ]
+
+    async def _scenario() -> None:
+        async with SessionLocal() as db:
+
+            async def _scalars(*args: Any, **kwargs: Any) -> _Rows:
+                return _Rows()
+
+            monkeypatch.setattr(db, "scalars", _scalars)
+            with pytest.raises(RuntimeError, match="VALUES order"):
+                await item_service.create_items(
+                    db, 0, [ItemCreate(title="First"), ItemCreate(title="Second")]
+                )
+
+    _run(_scenario())
+
+
+def test_item_export_stops_when_client_disconnects(monkeypatch):
+    monkeypatch.setattr(items_endpoint.settings, "ITEMS_EXPORT_BATCH_SIZE", 2)
+    messages = iter([{"type": "http.request", "body": b""}])
+
+    async def _receive() -> dict[str, Any]:
+        # Connected for the first batch, gone afterwards.
+        return next(messages, {"type": "http.disconnect"})
+
+    async def _scenario() -> None:
+        async with SessionLocal() as db:
+            owner, _ = await _owner_and_stranger(db)
+            await items_endpoint.create_items(
+                ItemBulkCreate(items=[ItemCreate(title=f"Stream {n}") for n in range(6)]),
+                db,
+                owner,
+            )
+        request = Request({"type": "http", "method": "GET", "headers": []}, _receive)
+        aborted = ITEM_EXPORTS_ABORTED._value.get()
+        response = await items_endpoint.export_items(request, owner)
+        chunks = [chunk async for chunk in response.body_iterator]
+        assert len(chunks) == 1
+        assert isinstance(chunks[0], bytes)
+        assert [json.loads(line)["title"] for line in chunks[0].splitlines()] == [
+            "Stream 0",
+            "Stream 1",
+        ]
+        assert ITEM_EXPORTS_ABORTED._value.get() == aborted + 1
+
+    _run(_scenario())
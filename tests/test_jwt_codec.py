@@ -0,0 +1,115 @@
+# Tests for the HS256 access token codec and its interoperability with jose.
+
+import time
+
+from jose import jwt
+import pytest
+
+from app.core.config import settings
+from app.core.jwt_codec import HS256Codec, InvalidTokenError, access_token_codec
+from app.core.security import ALGORITHM, create_access_token
+
+SECRET = "codec-secret-key-32-chars-min-0000000"
+
+
+def _codec(leeway_seconds: int = 30) -> HS256Codec:
+    return HS256Codec(SECRET, issuer="issuer", audience="audience", leeway_seconds=leeway_seconds)
+
+
+def _claims(**overrides: object) -> dict[str, object]:
+    now = int(time.time())
+    claims: dict[str, object] = {
+        "sub": "42",
+        "exp": now + 600,
+        "iat": now,
+        "iss": "issuer",
+        "aud": "audience",
+    }
+    claims.update(overrides)
+    return claims
+
+
+def _jose_decode(token: str) -> dict:
+    return jwt.decode(token, SECRET, algorithms=[ALGORITHM], audience="audience", issuer="issuer")
+
+
+def test_codec_tokens_decode_with_jose():
+    claims = _claims(email="user@example.com", is_admin=False)
+    assert _jose_decode(_codec().encode(claims)) == claims
+
+
+def test_jose_tokens_decode_with_codec():
+    claims = _claims(sep=3)
+    assert _codec().decode(jwt.encode(claims, SECRET, algorithm=ALGORITHM)) == claims
+
+
+def test_create_access_token_matches_settings():
+    token = create_access_token(subject="7", extra_claims={"is_active": True})
+    claims = jwt.decode(
+        token,
+        settings.SECRET_KEY,
+        algorithms=[ALGORITHM],
+        audience=settings.JWT_AUDIENCE,
+        issuer=settings.JWT_ISSUER,
+    )
+    assert claims["sub"] == "7"
+    assert claims["is_active"] is True
+    assert access_token_codec.decode(token) == claims
+
+
+def test_expiry_honours_leeway():
+    token = _codec().encode(_claims(exp=int(time.time()) - 10))
+    assert _codec(leeway_seconds=30).decode(token)["sub"] == "42"
+    with pytest.raises(InvalidTokenError):
+        _codec(leeway_seconds=0).decode(token)
+
+
+@pytest.mark.parametrize(
+    "overrides",
+    [
+        {"exp": None},
+        {"iat": None},
+        {"iat": int(time.time()) + 3600},
+        {"nbf": int(time.time()) + 3600},
+        {"iss": "someone-else"},
+        {"aud": "someone-else"},
+        {"aud": ["someone-else"]},
+    ],
+)
+def test_invalid_registered_claims_are_rejected(overrides):
+    claims = {key: value for key, value in _claims(**overrides).items() if value is not None}
+    with pytest.raises(InvalidTokenError):
+        _codec().decode(_codec().encode(claims))
+
+
+def test_audience_list_is_accepted():
+    token = _codec().encode(_claims(aud=["other", "audience"]))
+    assert _codec().decode(token)["aud"] == ["other", "audience"]
+
+
+@pytest.mark.parametrize(
+    "token",
+    [
+        "not-a-token",
+        "a.b",
+        "a.b.c.d",
+        "eyJhbGciOiJIUzI1NiJ9.!!!.sig",
+    ],
+)
+def test_malformed_tokens_are_rejected(token):
+    with pytest.raises(InvalidTokenError):
+        _codec().decode(token)
+
+
+def test_tampered_and_foreign_tokens_are_rejected():
+    token = _codec().encode(_claims())
+    header, payload, signature = token.split(".")
+    tampered = _codec().encode(_claims(sub="43")).split(".")[1]
+    with pytest.raises(InvalidTokenError):
+        _codec().decode(f"{header}.{tampered}.{signature}")
+    with pytest.raises(InvalidTokenError):
+        _codec().decode(jwt.encode(_claims(), "another-secret-32-chars-min-000000", "HS256"))
+    with pytest.raises(InvalidTokenError):
+        _codec().decode(jwt.encode(_claims(), SECRET, algorithm="HS512"))
+    with pytest.raises(InvalidTokenError):
+        _codec().decode(f"eyJhbGciOiJub25lIiwidHlwIjoiSldUIn0.{payload}.")
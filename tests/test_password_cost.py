@@ -0,0 +1,104 @@
+# Tests for bcrypt cost calibration and rehash-on-login.
+
+import asyncio
+import uuid
+
+from passlib.hash import bcrypt
+
+from app.commands import calibrate_password_hash
+from app.core.config import settings
+from app.core.metrics import PASSWORD_REHASHES
+from app.core.security import get_password_hash, password_needs_rehash, verify_password
+from app.db.models import User
+from app.db.session import SessionLocal
+from app.services import password_rehash
+from app.services.auth_service import authenticate_user
+from app.services.user_service import get_user_by_id
+
+PASSWORD = "StrongPass123!"
+
+
+def _run(coro):
+    return asyncio.run(coro)
+
+
+async def _create_user(hashed_password: str, email: str | None = None) -> int:
+    async with SessionLocal() as db:
+        user = User(
+            email=email or f"rehash-{uuid.uuid4().hex}@example.com",
+            hashed_password=hashed_password,
+        )
+        db.add(user)
+        await db.commit()
+        await db.refresh(user)
+        return user.id
+
+
+async def _stored_hash(user_id: int) -> str:
+    async with SessionLocal() as db:
+        user = await get_user_by_id(db, user_id)
+        assert user is not None
+        return user.hashed_password
+
+
+def _rounds(hashed_password: str) -> int:
+    return int(hashed_password.split("$")[2])
+
+
+def test_needs_rehash_only_for_other_costs():
+    assert password_needs_rehash(get_password_hash(PASSWORD)) is False
+    assert password_needs_rehash(bcrypt.using(rounds=4).hash(PASSWORD)) is True
+
+
+def test_login_upgrades_hash_in_background():
+    email = f"rehash-login-{uuid.uuid4().hex}@example.com"
+    old_hash = bcrypt.using(rounds=4).hash(PASSWORD)
+    user_id = _run(_create_user(old_hash, email))
+    upgraded_before = PASSWORD_REHASHES.labels(result="upgraded")._value.get()
+
+    async def _login() -> None:
+        async with SessionLocal() as db:
+            user = await authenticate_user(db, email, PASSWORD)
+            assert user is not None
+        await password_rehash.drain_password_rehashes()
+
+    _run(_login())
+
+    new_hash = _run(_stored_hash(user_id))
+    assert new_hash != old_hash
+    assert _rounds(new_hash) == settings.PASSWORD_HASH_ROUNDS
+    assert verify_password(PASSWORD, new_hash)
+    assert PASSWORD_REHASHES.labels(result="upgraded")._value.get() - upgraded_before == 1
+
+
+def test_rehash_skips_when_password_changed_meanwhile():
+    user_id = _run(_create_user(get_password_hash(PASSWORD)))
+    current_hash = _run(_stored_hash(user_id))
+    skipped_before = PASSWORD_REHASHES.labels(result="skipped")._value.get()
+
+    async def _scenario() -> None:
+        password_rehash.schedule_password_rehash(user_id, "stale-hash", PASSWORD)
+        await password_rehash.drain_password_rehashes()
+
+    _run(_scenario())
+    assert _run(_stored_hash(user_id)) == current_hash
+    assert PASSWORD_REHASHES.labels(result="skipped")._value.get() - skipped_before == 1
+
+
+def test_calibration_picks_highest_cost_within_target():
+    timings = {10: 60.0, 11: 120.0, 12: 240.0, 13: 480.0}
+    chosen, measured = calibrate_password_hash.calibrate_rounds(
+        250, min_rounds=10, max_rounds=16, samples=1, measure=timings.__getitem__
+    )
+    assert chosen == 12
+    assert list(measured) == [10, 11, 12, 13]
+
+
+def test_calibration_keeps_minimum_cost_on_slow_hosts(capsys):
+    chosen, _ = calibrate_password_hash.calibrate_rounds(
+        10, min_rounds=10, max_rounds=12, samples=1, measure=lambda rounds: 500.0
+    )
+    assert chosen == 10
+
+    assert calibrate_password_hash.main(["--min-rounds", "4", "--max-rounds", "5"]) == 0
+    assert "PASSWORD_HASH_ROUNDS=" in capsys.readouterr().out
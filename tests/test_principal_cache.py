@@ -0,0 +1,168 @@
+# Tests for the principal cache used by get_current_user.
+
+import asyncio
+import uuid
+
+import pytest
+from fastapi import HTTPException, status
+from sqlalchemy import delete
+
+from app.api import deps
+from app.core.cache import MemoryCache, RedisCache
+import app.core.cache as cache_module
+from app.core.security import create_access_token, get_password_hash
+from app.db.models import Item, User
+from app.db.session import SessionLocal
+from app.schemas.auth import Principal
+from app.services import user_service
+from app.services.principal_cache import PrincipalCache, principal_cache
+
+
+def _run(coro):
+    return asyncio.run(coro)
+
+
+def _email(prefix: str) -> str:
+    return f"{prefix}-{uuid.uuid4().hex}@example.com"
+
+
+async def _create_user(email: str) -> User:
+    async with SessionLocal() as db:
+        user = User(email=email, hashed_password=get_password_hash("StrongPass123!"))
+        db.add(user)
+        await db.commit()
+        await db.refresh(user)
+        return user
+
+
+async def _current_user(user_id: int) -> Principal:
+    async with SessionLocal() as db:
+        return await deps.get_current_user(db=db, token=create_access_token(str(user_id)))
+
+
+def test_memory_cache_expires_and_bounds_entries(monkeypatch):
+    cache = MemoryCache(max_entries=2)
+    now = 1000.0
+    monkeypatch.setattr(cache_module.time, "monotonic", lambda: now)
+
+    async def _scenario() -> None:
+        await cache.set("a", b"1", ttl_seconds=10)
+        await cache.set("b", b"2", ttl_seconds=10)
+        await cache.set("c", b"3", ttl_seconds=10)
+        assert await cache.get("a") is None
+        assert await cache.get("b") == b"2"
+
+    _run(_scenario())
+    now = 1011.0
+    assert _run(cache.get("b")) is None
+
+
+def test_redis_cache_fails_open_when_unreachable():
+    cache = RedisCache("redis://127.0.0.1:1/0")
+
+    async def _scenario() -> None:
+        assert await cache.get("key") is None
+        await cache.set("key", b"value", ttl_seconds=10)
+        await cache.delete("key")
+
+    _run(_scenario())
+
+
+def test_get_current_user_serves_repeat_requests_from_cache(monkeypatch):
+    created = _run(_create_user(_email("principal-hit")))
+    first = _run(_current_user(created.id))
+    assert first.email == created.email
+
+    async def _fail_get_user_by_id(db, user_id):
+        raise AssertionError("users table should not be queried on a cache hit")
+
+    monkeypatch.setattr(deps, "get_user_by_id", _fail_get_user_by_id)
+    second = _run(_current_user(created.id))
+    assert second == first
+
+
+def test_admin_and_active_changes_invalidate_cached_principal():
+    created = _run(_create_user(_email("principal-flags")))
+    assert _run(_current_user(created.id)).is_admin is False
+
+    async def _update(is_admin: bool, is_active: bool) -> None:
+        async with SessionLocal() as db:
+            user = await user_service.get_user_by_id(db, created.id)
+            assert user is not None
+            await user_service.set_user_admin(db, user, is_admin)
+            await user_service.set_user_active(db, user, is_active)
+
+    _run(_update(True, True))
+    assert _run(_current_user(created.id)).is_admin is True
+
+    _run(_update(True, False))
+    assert _run(principal_cache.get(created.id)) is None
+    with pytest.raises(HTTPException) as exc:
+        _run(_current_user(created.id))
+    assert exc.value.status_code == status.HTTP_401_UNAUTHORIZED
+    # The refreshed, inactive snapshot is cached and keeps being rejected.
+    cached = _run(principal_cache.get(created.id))
+    assert cached is not None and cached.is_active is False
+
+
+def test_password_change_invalidates_cached_principal():
+    created = _run(_create_user(_email("principal-password")))
+    _run(_current_user(created.id))
+
+    async def _change() -> bool:
+        async with SessionLocal() as db:
+            user = await user_service.get_user_by_id(db, created.id)
+            assert user is not None
+            return await user_service.change_user_password(
+                db, user, "StrongPass123!", "NewStrongPass123!"
+            )
+
+    assert _run(_change()) is True
+    assert _run(principal_cache.get(created.id)) is None
+
+
+def test_deleted_user_is_rejected_after_invalidation():
+    created = _run(_create_user(_email("principal-deleted")))
+    _run(_current_user(created.id))
+
+    async def _delete() -> None:
+        async with SessionLocal() as db:
+            await db.execute(delete(User).where(User.id == created.id))
+            await db.commit()
+        await principal_cache.invalidate(created.id)
+
+    _run(_delete())
+    with pytest.raises(HTTPException) as exc:
+        _run(_current_user(created.id))
+    assert exc.value.status_code == status.HTTP_401_UNAUTHORIZED
+
+
+def test_delete_user_invalidates_cached_principal():
+    created = _run(_create_user(_email("principal-delete")))
+    _run(_current_user(created.id))
+    assert _run(principal_cache.get(created.id)) is not None
+
+    async def _delete() -> None:
+        async with SessionLocal() as db:
+            user = await user_service.get_user_by_id(db, created.id)
+            assert user is not None
+            db.add(Item(title="owned", owner_id=user.id))
+            await db.commit()
+            await user_service.delete_user(db, user)
+
+    _run(_delete())
+    assert _run(principal_cache.get(created.id)) is None
+    with pytest.raises(HTTPException) as exc:
+        _run(_current_user(created.id))
+    assert exc.value.status_code == status.HTTP_401_UNAUTHORIZED
+
+
+def test_disabled_principal_cache_never_stores():
+    cache = PrincipalCache(None, ttl_seconds=30)
+    principal = Principal(id=1, email="x@example.com", is_active=True, is_admin=False)
+
+    async def _scenario() -> None:
+        await cache.set(principal)
+        assert await cache.get(1) is None
+
+    _run(_scenario())
@@ -78,6 +78,26 @@ def test_login_rate_limit_enforced():
     assert "Rate limit exceeded" in body["error"]
 
 
+def test_rate_limited_login_does_not_take_an_admission_slot():
+    app = build_app_with_limits("1/minute", "1000/minute")
+    client = TestClient(app)
+    admission = sys.modules["app.core.admission"].auth_admission
+    acquired = []
+    original_acquire = admission.acquire
+
+    async def _acquire(client_key: str) -> None:
+        acquired.append(client_key)
+        await original_acquire(client_key)
+
+    admission.acquire = _acquire
+    payload = {"email": "invalid@example.com", "password": "wrong"}
+
+    assert client.post("/api/v1/auth/login", json=payload).status_code == 401
+    assert client.post("/api/v1/auth/login", json=payload).status_code == 429
+    assert len(acquired) == 1
+    assert admission.active == 0 and admission.queued == 0
+
+
 def test_refresh_rate_limit_enforced():
     app = build_app_with_limits("1000/minute", "1/minute")
     client = TestClient(app)
@@ -0,0 +1,127 @@
+# Tests for the refresh token purge job.
+
+import asyncio
+from datetime import timedelta
+import uuid
+
+from sqlalchemy import select
+
+from app.commands import purge_refresh_tokens as purge_command
+from app.core.metrics import REFRESH_TOKENS_PURGED
+from app.core.security import get_password_hash, hash_refresh_token
+from app.db.models import RefreshToken, User
+from app.db.session import SessionLocal
+from app.services.auth_service import rotate_refresh_token
+from app.services.refresh_token_purge import purge_refresh_tokens
+from app.utils.time import utcnow
+
+
+def _run(coro):
+    return asyncio.run(coro)
+
+
+async def _create_user() -> int:
+    async with SessionLocal() as db:
+        user = User(
+            email=f"purge-{uuid.uuid4().hex}@example.com",
+            hashed_password=get_password_hash("StrongPass123!"),
+        )
+        db.add(user)
+        await db.commit()
+        await db.refresh(user)
+        return user.id
+
+
+async def _insert_token(
+    user_id: int,
+    raw_token: str,
+    *,
+    revoked: bool = False,
+    expires_delta: timedelta = timedelta(days=1),
+    updated_delta: timedelta = timedelta(0),
+) -> None:
+    now = utcnow()
+    async with SessionLocal() as db:
+        db.add(
+            RefreshToken(
+                user_id=user_id,
+                token_hash=hash_refresh_token(raw_token),
+                revoked=revoked,
+                created_at=now + updated_delta,
+                updated_at=now + updated_delta,
+                expires_at=now + expires_delta,
+            )
+        )
+        await db.commit()
+
+
+async def _existing_hashes(raw_tokens: list[str]) -> set[str]:
+    hashes = [hash_refresh_token(token) for token in raw_tokens]
+    async with SessionLocal() as db:
+        result = await db.execute(
+            select(RefreshToken.token_hash).where(RefreshToken.token_hash.in_(hashes))
+        )
+        return set(result.scalars().all())
+
+
+def test_purge_deletes_only_tokens_past_the_grace_window():
+    user_id = _run(_create_user())
+    old_expired = [f"old-expired-{i}-{uuid.uuid4().hex}" for i in range(3)]
+    old_revoked = f"old-revoked-{uuid.uuid4().hex}"
+    recent_revoked = f"recent-revoked-{uuid.uuid4().hex}"
+    recent_expired = f"recent-expired-{uuid.uuid4().hex}"
+    active = f"active-{uuid.uuid4().hex}"
+
+    for token in old_expired:
+        _run(_insert_token(user_id, token, expires_delta=timedelta(days=-3)))
+    _run(_insert_token(user_id, old_revoked, revoked=True, updated_delta=timedelta(days=-3)))
+    _run(_insert_token(user_id, recent_revoked, revoked=True))
+    _run(_insert_token(user_id, recent_expired, expires_delta=timedelta(hours=-1)))
+    _run(_insert_token(user_id, active))
+
+    purged_before = REFRESH_TOKENS_PURGED._value.get()
+    purged = _run(purge_refresh_tokens(batch_size=2, throttle_seconds=0, grace=timedelta(days=1)))
+
+    assert purged >= 4
+    assert REFRESH_TOKENS_PURGED._value.get() - purged_before == purged
+    remaining = _run(_existing_hashes([*old_expired, old_revoked, recent_revoked, active]))
+    assert remaining == {
+        hash_refresh_token(recent_revoked),
+        hash_refresh_token(active),
+    }
+    assert _run(_existing_hashes([recent_expired])) == {hash_refresh_token(recent_expired)}
+
+
+def test_reuse_detection_survives_purge_within_grace_window():
+    user_id = _run(_create_user())
+    reused = f"reused-{uuid.uuid4().hex}"
+    active = f"active-{uuid.uuid4().hex}"
+    _run(_insert_token(user_id, reused, revoked=True))
+    _run(_insert_token(user_id, active))
+
+    _run(purge_refresh_tokens(throttle_seconds=0, grace=timedelta(days=1)))
+
+    async def _replay() -> None:
+        async with SessionLocal() as db:
+            assert await rotate_refresh_token(db, reused) is None
+
+    _run(_replay())
+
+    async def _active_revoked() -> bool:
+        async with SessionLocal() as db:
+            result = await db.execute(
+                select(RefreshToken.revoked).where(
+                    RefreshToken.token_hash == hash_refresh_token(active)
+                )
+            )
+            return bool(result.scalar_one())
+
+    assert _run(_active_revoked()) is True
+
+
+def test_purge_command_reports_count(capsys):
+    user_id = _run(_create_user())
+    _run(_insert_token(user_id, f"cli-{uuid.uuid4().hex}", expires_delta=timedelta(days=-30)))
+
+    assert purge_command.main(["--grace-days", "1", "--throttle-seconds", "0"]) == 0
+    assert "Purged" in capsys.readouterr().out
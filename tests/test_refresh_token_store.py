@@ -0,0 +1,237 @@
+# Contract tests shared by the refresh token store backends.
+
+import asyncio
+from datetime import timedelta
+import os
+import uuid
+
+import pytest
+from sqlalchemy import delete, event, select
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.core.config import settings
+from app.core.security import get_password_hash
+from app.db.models import RefreshToken, User
+from app.db.session import SessionLocal, build_engine
+from app.services import auth_service
+from app.services.refresh_token_store import (
+    MemoryRefreshTokenStore,
+    RedisRefreshTokenStore,
+    RefreshTokenStore,
+    SqlRefreshTokenStore,
+)
+from app.utils.time import utcnow
+
+_STORES = ["sql", "memory"]
+if os.getenv("TEST_REDIS_URL"):
+    _STORES.append("redis")
+
+
+def _run(coro):
+    return asyncio.run(coro)
+
+
+def _build_store(name: str) -> RefreshTokenStore:
+    if name == "redis":
+        return RedisRefreshTokenStore(
+            os.environ["TEST_REDIS_URL"], prefix=f"test-refresh-{uuid.uuid4().hex}:"
+        )
+    if name == "memory":
+        return MemoryRefreshTokenStore()
+    return SqlRefreshTokenStore()
+
+
+@pytest.fixture(params=_STORES)
+def store(request) -> RefreshTokenStore:
+    return _build_store(request.param)
+
+
+async def _create_user_id() -> int:
+    async with SessionLocal() as db:
+        user = User(
+            email=f"store-{uuid.uuid4().hex}@example.com",
+            hashed_password=get_password_hash("StrongPass123!"),
+        )
+        db.add(user)
+        await db.commit()
+        await db.refresh(user)
+        return user.id
+
+
+def _hash() -> str:
+    return uuid.uuid4().hex
+
+
+def _expiry(days: int = 1):
+    return utcnow() + timedelta(days=days)
+
+
+def test_rotate_claims_token_once(store):
+    user_id = _run(_create_user_id())
+    old_hash, new_hash = _hash(), _hash()
+
+    async def _scenario() -> tuple[int | None, int | None]:
+        async with SessionLocal() as db:
+            await store.store(db, user_id, old_hash, _expiry())
+        async with SessionLocal() as db:
+            first = await store.rotate(db, old_hash, new_hash, _expiry())
+        async with SessionLocal() as db:
+            second = await store.rotate(db, new_hash, _hash(), _expiry())
+        return first, second
+
+    assert _run(_scenario()) == (user_id, user_id)
+
+
+def test_rotate_rejects_unknown_and_expired_tokens(store):
+    user_id = _run(_create_user_id())
+    expired_hash = _hash()
+
+    async def _scenario() -> tuple[int | None, int | None]:
+        async with SessionLocal() as db:
+            await store.store(db, user_id, expired_hash, utcnow() - timedelta(minutes=1))
+        async with SessionLocal() as db:
+            unknown = await store.rotate(db, _hash(), _hash(), _expiry())
+        async with SessionLocal() as db:
+            expired = await store.rotate(db, expired_hash, _hash(), _expiry())
+        return unknown, expired
+
+    assert _run(_scenario()) == (None, None)
+
+
+def test_replayed_token_revokes_all_user_tokens(store):
+    user_id = _run(_create_user_id())
+    first_hash, rotated_hash, other_hash = _hash(), _hash(), _hash()
+
+    async def _scenario() -> int | None:
+        async with SessionLocal() as db:
+            await store.store(db, user_id, first_hash, _expiry())
+            await store.store(db, user_id, other_hash, _expiry())
+        async with SessionLocal() as db:
+            assert await store.rotate(db, first_hash, rotated_hash, _expiry()) == user_id
+        async with SessionLocal() as db:
+            assert await store.rotate(db, first_hash, _hash(), _expiry()) is None
+        async with SessionLocal() as db:
+            assert await store.rotate(db, other_hash, _hash(), _expiry()) is None
+        async with SessionLocal() as db:
+            return await store.rotate(db, rotated_hash, _hash(), _expiry())
+
+    assert _run(_scenario()) is None
+
+
+def test_concurrent_rotation_has_one_winner(store):
+    user_id = _run(_create_user_id())
+    shared_hash = _hash()
+
+    async def _rotate_once() -> int | None:
+        async with SessionLocal() as db:
+            return await store.rotate(db, shared_hash, _hash(), _expiry())
+
+    async def _scenario() -> list[int | None]:
+        async with SessionLocal() as db:
+            await store.store(db, user_id, shared_hash, _expiry())
+        return list(await asyncio.gather(_rotate_once(), _rotate_once()))
+
+    results = _run(_scenario())
+    assert results.count(user_id) == 1
+
+
+def test_revoke_and_revoke_all(store):
+    user_id = _run(_create_user_id())
+    single_hash, other_hash = _hash(), _hash()
+
+    async def _scenario() -> None:
+        async with SessionLocal() as db:
+            await store.store(db, user_id, single_hash, _expiry())
+            await store.store(db, user_id, other_hash, _expiry())
+        async with SessionLocal() as db:
+            assert await store.revoke(db, single_hash) is True
+            assert await store.revoke(db, single_hash) is False
+            assert await store.revoke(db, _hash()) is False
+        async with SessionLocal() as db:
+            await store.revoke_all(db, user_id)
+            await db.commit()
+        async with SessionLocal() as db:
+            assert await store.rotate(db, other_hash, _hash(), _expiry()) is None
+
+    _run(_scenario())
+
+
+def test_auth_service_uses_configured_store(monkeypatch):
+    memory_store = MemoryRefreshTokenStore()
+    monkeypatch.setattr(auth_service, "get_refresh_token_store", lambda: memory_store)
+    user_id = _run(_create_user_id())
+    refresh = auth_service.create_refresh_token()
+
+    async def _scenario() -> str:
+        async with SessionLocal() as db:
+            await auth_service.store_refresh_token(db, user_id, refresh)
+            rotated = await auth_service.rotate_refresh_token(db, refresh)
+            assert rotated is not None
+            assert rotated.refresh_token is not None
+            assert await auth_service.revoke_refresh_token(db, rotated.refresh_token)
+            return rotated.refresh_token
+
+    rotated_refresh = _run(_scenario())
+    assert memory_store.is_revoked(auth_service.hash_refresh_token(refresh)) is True
+    assert memory_store.is_revoked(auth_service.hash_refresh_token(rotated_refresh)) is True
+
+
+@pytest.mark.postgresql
+@pytest.mark.skipif(not os.getenv("TEST_POSTGRES_URL"), reason="TEST_POSTGRES_URL is not set")
+def test_single_statement_rotation_on_postgresql(monkeypatch):
+    # Runs the WITH claimed AS (UPDATE ... RETURNING) INSERT ... SELECT path,
+    # which SQLite cannot execute.
+    monkeypatch.setattr(settings, "REFRESH_ROTATION_SINGLE_STATEMENT", True)
+    engine = build_engine(os.environ["TEST_POSTGRES_URL"], "test-postgresql")
+    sessions = async_sessionmaker(bind=engine, expire_on_commit=False)
+    store = SqlRefreshTokenStore()
+    old_hash, new_hash = _hash(), _hash()
+    statements: list[str] = []
+
+    def _count(conn, cursor, statement, parameters, context, executemany) -> None:
+        statements.append(statement)
+
+    async def _token(db, token_hash: str) -> RefreshToken | None:
+        result = await db.execute(select(RefreshToken).where(RefreshToken.token_hash == token_hash))
+        return result.scalars().first()
+
+    async def _scenario() -> None:
+        async with engine.begin() as conn:
+            # Only the tables this test touches, without the metadata hooks.
+            for name in (User.__tablename__, RefreshToken.__tablename__):
+                await conn.run_sync(User.metadata.tables[name].create, checkfirst=True)
+        async with sessions() as db:
+            user = User(
+                email=f"store-pg-{uuid.uuid4().hex}@example.com",
+                hashed_password=get_password_hash("StrongPass123!"),
+            )
+            db.add(user)
+            await db.commit()
+            user_id = user.id
+            await store.store(db, user_id, old_hash, _expiry())
+        try:
+            event.listen(engine.sync_engine, "before_cursor_execute", _count)
+            try:
+                async with sessions() as db:
+                    assert await store.rotate(db, old_hash, new_hash, _expiry()) == user_id
+            finally:
+                event.remove(engine.sync_engine, "before_cursor_execute", _count)
+            assert len(statements) == 1
+            assert statements[0].lstrip().upper().startswith("WITH")
+
+            async with sessions() as db:
+                old = await _token(db, old_hash)
+                new = await _token(db, new_hash)
+                assert old is not None and old.revoked is True
+                assert new is not None and new.revoked is False
+                assert new.user_id == user_id
+            async with sessions() as db:
+                assert await store.rotate(db, old_hash, _hash(), _expiry()) is None
+        finally:
+            async with sessions() as db:
+                await db.execute(delete(RefreshToken).where(RefreshToken.user_id == user_id))
+                await db.execute(delete(User).where(User.id == user_id))
+                await db.commit()
+            await engine.dispose()
+
+    _run(_scenario())
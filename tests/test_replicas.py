@@ -0,0 +1,227 @@
+# Tests for read-replica routing, health checks, and read-your-writes pinning.
+
+import asyncio
+import uuid
+
+from fastapi.testclient import TestClient
+from sqlalchemy import select, update
+
+from app.core.cache import MemoryCache
+from app.core.config import settings
+from app.core.security import get_password_hash
+from app.db import replicas as replicas_module
+from app.db.models import User
+from app.db.replicas import PRINCIPAL_ID_KEY, Replica, ReplicaRouter, replica_router
+from app.db.session import SessionLocal, build_engine
+from app.main import app
+
+client = TestClient(app)
+
+
+def _run(coro):
+    return asyncio.run(coro)
+
+
+def _replica(name: str, uri: str = settings.SQLALCHEMY_DATABASE_URI) -> Replica:
+    # The test database doubles as an always-in-sync "replica".
+    return Replica(name, build_engine(uri, name))
+
+
+def _router(*replicas: Replica, max_lag_seconds: float = 5.0) -> ReplicaRouter:
+    return ReplicaRouter(list(replicas), max_lag_seconds=max_lag_seconds, pin_seconds=5.0)
+
+
+async def _create_user() -> int:
+    async with SessionLocal() as db:
+        user = User(
+            email=f"replica-{uuid.uuid4().hex}@example.com",
+            hashed_password=get_password_hash("StrongPass123!"),
+        )
+        db.add(user)
+        await db.commit()
+        await db.refresh(user)
+        return user.id
+
+
+def test_reads_use_healthy_replicas_round_robin():
+    async def _scenario() -> None:
+        first, second = _replica("test-replica-a"), _replica("test-replica-b")
+        router = _router(first, second)
+        try:
+            engines = []
+            for _ in range(4):
+                db = await router.read_session(1)
+                engines.append(db.bind)
+                await db.close()
+            assert engines == [first.engine, second.engine] * 2
+
+            second.set_status("lagging", 30.0)
+            db = await router.read_session(1)
+            assert db.bind is first.engine
+            await db.close()
+
+            first.set_status("down")
+            db = await router.read_session(1)
+            assert db.bind is SessionLocal.kw["bind"]
+            await db.close()
+        finally:
+            await router.dispose()
+
+    _run(_scenario())
+
+
+def test_unreachable_replica_falls_back_to_primary(tmp_path):
+    async def _scenario() -> None:
+        broken = _replica("test-replica-broken", f"sqlite:///{tmp_path}/missing/replica.db")
+        router = _router(broken)
+        try:
+            db = await router.read_session(1)
+            assert db.bind is SessionLocal.kw["bind"]
+            await db.close()
+            assert broken.status == "down"
+        finally:
+            await router.dispose()
+
+    _run(_scenario())
+
+
+def test_health_check_marks_lagging_and_recovered_replicas():
+    async def _scenario() -> None:
+        replica = _replica("test-replica-lag")
+        router = _router(replica, max_lag_seconds=1.0)
+        lag = 12.5
+
+        async def _measure_lag() -> float:
+            return lag
+
+        replica.measure_lag = _measure_lag  # type: ignore[method-assign]
+        try:
+            await router.check_all(1.0)
+            assert replica.status == "lagging"
+            assert replica.lag_seconds == 12.5
+            assert router.choose() is None
+
+            lag = 0.2
+            await router.check_all(1.0)
+            assert replica.status == "healthy"
+            assert router.choose() is replica
+        finally:
+            await router.dispose()
+
+    _run(_scenario())
+
+
+def test_health_check_marks_unreachable_replica_down(tmp_path):
+    async def _scenario() -> None:
+        replica = _replica("test-replica-down", f"sqlite:///{tmp_path}/missing/replica.db")
+        router = _router(replica)
+        try:
+            await router.check_all(1.0)
+            assert replica.status == "down"
+            assert router.statuses() == {"test-replica-down": "down"}
+        finally:
+            await router.dispose()
+
+    _run(_scenario())
+
+
+def test_primary_commits_with_writes_pin_the_user(monkeypatch):
+    async def _scenario() -> None:
+        replica = _replica("test-replica-pin")
+        monkeypatch.setattr(replica_router, "replicas", [replica])
+        try:
+            user_id = await _create_user()
+            async with SessionLocal() as db:
+                db.info[PRINCIPAL_ID_KEY] = user_id
+                await db.execute(select(User).where(User.id == user_id))
+                await db.commit()
+            assert not await replica_router.is_pinned(user_id)
+
+            async with SessionLocal() as db:
+                db.info[PRINCIPAL_ID_KEY] = user_id
+                await db.execute(update(User).where(User.id == user_id).values(is_active=True))
+                await db.commit()
+            assert await replica_router.is_pinned(user_id)
+
+            read_db = await replica_router.read_session(user_id)
+            assert read_db.bind is SessionLocal.kw["bind"]
+            await read_db.close()
+        finally:
+            await replica.engine.dispose()
+
+    _run(_scenario())
+
+
+def test_shared_pin_is_written_before_commit_returns(monkeypatch):
+    shared = MemoryCache(max_entries=10)
+    replica = _replica("test-replica-shared-commit")
+    monkeypatch.setattr(replica_router, "replicas", [replica])
+    monkeypatch.setattr(replica_router, "_pin_backend", shared)
+    other_worker = ReplicaRouter([replica], max_lag_seconds=5, pin_seconds=5, pin_backend=shared)
+
+    async def _scenario() -> None:
+        try:
+            user_id = await _create_user()
+            async with SessionLocal() as db:
+                db.info[PRINCIPAL_ID_KEY] = user_id
+                await db.execute(update(User).where(User.id == user_id).values(is_active=True))
+                await db.commit()
+                # Other workers see the pin as soon as commit() returns.
+                assert await other_worker.is_pinned(user_id)
+        finally:
+            await replica.engine.dispose()
+
+    _run(_scenario())
+
+
+def test_pins_expire(monkeypatch):
+    now = 1000.0
+    monkeypatch.setattr(replicas_module.time, "monotonic", lambda: now)
+    router = ReplicaRouter([_replica("test-replica-expiry")], max_lag_seconds=5, pin_seconds=2)
+    router.pin(42)
+    assert _run(router.is_pinned(42))
+    now = 1003.0
+    assert not _run(router.is_pinned(42))
+
+
+def test_pins_are_shared_between_routers():
+    shared = MemoryCache(max_entries=10)
+    writer = ReplicaRouter(
+        [_replica("test-replica-writer")], max_lag_seconds=5, pin_seconds=2, pin_backend=shared
+    )
+    reader = ReplicaRouter(
+        [_replica("test-replica-reader")], max_lag_seconds=5, pin_seconds=2, pin_backend=shared
+    )
+
+    async def _scenario() -> None:
+        writer.pin(42)
+        assert not await reader.is_pinned(42)
+        await writer.share_pin(42)
+        assert await reader.is_pinned(42)
+        assert not await reader.is_pinned(43)
+
+    _run(_scenario())
+
+
+def test_item_write_pins_owner_for_following_reads(monkeypatch):
+    replica = _replica("test-replica-api")
+    monkeypatch.setattr(replica_router, "replicas", [replica])
+    email = f"replica-api-{uuid.uuid4().hex}@example.com"
+    password = "StrongPass123!"
+    assert (
+        client.post("/api/v1/users/", json={"email": email, "password": password}).status_code
+        == 201
+    )
+    tokens = client.post("/api/v1/auth/login", json={"email": email, "password": password}).json()
+    headers = {"Authorization": f"Bearer {tokens['access_token']}"}
+    user_id = client.get("/api/v1/users/me", headers=headers).json()["id"]
+
+    listed = client.get("/api/v1/items/", headers=headers)
+    assert listed.status_code == 200
+    assert not _run(replica_router.is_pinned(user_id))
+
+    created = client.post("/api/v1/items/", json={"title": "Pinned"}, headers=headers)
+    assert created.status_code == 201
+    assert _run(replica_router.is_pinned(user_id))
+    assert client.get(f"/api/v1/items/{created.json()['id']}", headers=headers).status_code == 200
+    _run(replica.engine.dispose())
@@ -0,0 +1,176 @@
+# Tests for stateless access tokens and session epoch revocation.
+
+import asyncio
+import uuid
+
+import pytest
+from fastapi import HTTPException, status
+from jose import jwt
+
+from app.api import deps
+from app.core.config import settings
+from app.core.security import SESSION_EPOCH_CLAIM, get_password_hash
+from app.db.models import User
+from app.db.session import SessionLocal
+from app.schemas.auth import Principal
+from app.services import auth_service, user_service
+from app.services.session_epoch_service import get_session_epoch
+
+
+def _run(coro):
+    return asyncio.run(coro)
+
+
+def _email(prefix: str) -> str:
+    return f"{prefix}-{uuid.uuid4().hex}@example.com"
+
+
+@pytest.fixture
+def stateless(monkeypatch):
+    monkeypatch.setattr(settings, "ACCESS_TOKEN_STATELESS", True)
+
+
+async def _create_user(email: str) -> User:
+    async with SessionLocal() as db:
+        user = User(email=email, hashed_password=get_password_hash("StrongPass123!"))
+        db.add(user)
+        await db.commit()
+        await db.refresh(user)
+        return user
+
+
+async def _login(user: User) -> str:
+    async with SessionLocal() as db:
+        token = await auth_service.create_user_token(db, user)
+        return token.access_token
+
+
+async def _current_user(access_token: str) -> Principal:
+    async with SessionLocal() as db:
+        return await deps.get_current_user(db=db, token=access_token)
+
+
+def _claims(access_token: str) -> dict:
+    return jwt.get_unverified_claims(access_token)
+
+
+def test_stateless_token_carries_authorization_claims(stateless):
+    user = _run(_create_user(_email("stateless-claims")))
+    claims = _claims(_run(_login(user)))
+    assert claims["email"] == user.email
+    assert claims["is_active"] is True
+    assert claims["is_admin"] is False
+    assert claims[SESSION_EPOCH_CLAIM] == 0
+
+
+def test_stateless_token_authorizes_without_loading_user(stateless, monkeypatch):
+    user = _run(_create_user(_email("stateless-no-db")))
+    access_token = _run(_login(user))
+
+    async def _fail_get_user_by_id(db, user_id):
+        raise AssertionError("users table should not be queried for stateless tokens")
+
+    monkeypatch.setattr(deps, "get_user_by_id", _fail_get_user_by_id)
+    principal = _run(_current_user(access_token))
+    assert principal.id == user.id
+    assert principal.email == user.email
+
+
+def test_revoke_all_refresh_tokens_bumps_epoch_and_rejects_old_tokens(stateless):
+    user = _run(_create_user(_email("stateless-revoke")))
+    access_token = _run(_login(user))
+    assert _run(_current_user(access_token)).id == user.id
+
+    async def _revoke() -> None:
+        async with SessionLocal() as db:
+            await auth_service.revoke_all_refresh_tokens(db, user.id)
+
+    _run(_revoke())
+    with pytest.raises(HTTPException) as exc:
+        _run(_current_user(access_token))
+    assert exc.value.status_code == status.HTTP_401_UNAUTHORIZED
+
+    fresh_token = _run(_login(user))
+    assert _claims(fresh_token)[SESSION_EPOCH_CLAIM] == 1
+    assert _run(_current_user(fresh_token)).id == user.id
+
+
+def test_stateless_token_of_inactive_user_is_rejected(stateless):
+    user = _run(_create_user(_email("stateless-inactive")))
+    user.is_active = False
+    access_token = _run(_login(user))
+    assert _claims(access_token)["is_active"] is False
+
+    with pytest.raises(HTTPException) as exc:
+        _run(_current_user(access_token))
+    assert exc.value.status_code == status.HTTP_401_UNAUTHORIZED
+
+
+def test_deleted_users_stateless_token_is_rejected(stateless):
+    user = _run(_create_user(_email("stateless-deleted")))
+    access_token = _run(_login(user))
+    assert _run(_current_user(access_token)).id == user.id
+
+    async def _delete() -> None:
+        async with SessionLocal() as db:
+            stored = await user_service.get_user_by_id(db, user.id)
+            assert stored is not None
+            await user_service.delete_user(db, stored)
+
+    _run(_delete())
+    with pytest.raises(HTTPException) as exc:
+        _run(_current_user(access_token))
+    assert exc.value.status_code == status.HTTP_401_UNAUTHORIZED
+
+
+def test_password_change_bumps_epoch(stateless):
+    user = _run(_create_user(_email("stateless-password")))
+    access_token = _run(_login(user))
+
+    async def _change() -> int | None:
+        async with SessionLocal() as db:
+            stored = await user_service.get_user_by_id(db, user.id)
+            assert stored is not None
+            assert await user_service.change_user_password(
+                db, stored, "StrongPass123!", "NewStrongPass123!"
+            )
+            return await get_session_epoch(db, user.id)
+
+    assert _run(_change()) == 1
+    with pytest.raises(HTTPException):
+        _run(_current_user(access_token))
+
+
+def test_rotated_token_keeps_claims(stateless):
+    user = _run(_create_user(_email("stateless-rotate")))
+
+    async def _rotate() -> str:
+        async with SessionLocal() as db:
+            token = await auth_service.create_user_token(db, user)
+        assert token.refresh_token is not None
+        async with SessionLocal() as db:
+            rotated = await auth_service.rotate_refresh_token(db, token.refresh_token)
+        assert rotated is not None
+        return rotated.access_token
+
+    claims = _claims(_run(_rotate()))
+    assert claims["email"] == user.email
+    assert SESSION_EPOCH_CLAIM in claims
+
+
+def test_claims_are_ignored_when_stateless_mode_is_off(monkeypatch):
+    user = _run(_create_user(_email("stateless-off")))
+    monkeypatch.setattr(settings, "ACCESS_TOKEN_STATELESS", True)
+    access_token = _run(_login(user))
+    monkeypatch.setattr(settings, "ACCESS_TOKEN_STATELESS", False)
+
+    calls = []
+    real_get_user_by_id = deps.get_user_by_id
+
+    async def _tracking_get_user_by_id(db, user_id):
+        calls.append(user_id)
+        return await real_get_user_by_id(db, user_id)
+
+    monkeypatch.setattr(deps, "get_user_by_id", _tracking_get_user_by_id)
+    assert _run(_current_user(access_token)).id == user.id
+    assert calls == [user.id]
@@ -0,0 +1,56 @@
+# Statement-count regression tests for the auth hot paths.
+
+import uuid
+
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+
+from app.db.session import engine
+from app.main import app
+
+client = TestClient(app)
+
+
+class _Statements:
+    def __init__(self) -> None:
+        self.executed: list[str] = []
+
+    def __call__(self, conn, cursor, statement, *args) -> None:
+        self.executed.append(statement.split(None, 1)[0].upper())
+
+    def __enter__(self) -> "_Statements":
+        event.listen(engine.sync_engine, "before_cursor_execute", self)
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        event.remove(engine.sync_engine, "before_cursor_execute", self)
+
+
+def test_auth_flows_issue_no_follow_up_selects():
+    email = f"statements-{uuid.uuid4().hex}@example.com"
+    password = "StrongPass123!"
+
+    with _Statements() as register:
+        response = client.post("/api/v1/users/", json={"email": email, "password": password})
+    assert response.status_code == 201
+    # Email check, then INSERT ... RETURNING; no refresh SELECT.
+    assert register.executed == ["SELECT", "INSERT"]
+
+    with _Statements() as login:
+        response = client.post("/api/v1/auth/login", json={"email": email, "password": password})
+    assert response.status_code == 200
+    assert login.executed == ["SELECT", "INSERT"]
+
+    headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+    # Warm the principal cache so the count covers only the endpoint itself.
+    assert client.get("/api/v1/users/me", headers=headers).status_code == 200
+
+    with _Statements() as change:
+        response = client.post(
+            "/api/v1/users/me/password",
+            json={"current_password": password, "new_password": "StrongPass456!"},
+            headers=headers,
+        )
+    assert response.status_code == 204
+    # Load the stored hash, bump the session epoch, update the password.
+    assert change.executed == ["SELECT", "INSERT", "UPDATE"]
@@ -0,0 +1,109 @@
+# Tests for the verified access token cache.
+
+import asyncio
+import time
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api import deps
+from app.core.metrics import JWT_DECODE_CACHE_HITS, JWT_DECODE_CACHE_MISSES
+from app.core.security import create_access_token, get_password_hash
+from app.core.token_cache import VerifiedTokenCache
+import app.core.token_cache as token_cache_module
+from app.db.models import User
+from app.services.principal_cache import PrincipalCache
+
+
+def _run(coro):
+    return asyncio.run(coro)
+
+
+def _claims(exp_offset: float = 3600) -> dict:
+    return {"sub": "1", "exp": int(time.time() + exp_offset), "iat": int(time.time())}
+
+
+def test_cache_returns_claims_after_put():
+    cache = VerifiedTokenCache(max_bytes=1024 * 1024, leeway_seconds=0)
+    claims = _claims()
+    assert cache.get("token-a") is None
+    cache.put("token-a", claims)
+    assert cache.get("token-a") == claims
+    assert cache.get("token-b") is None
+
+
+def test_cache_entry_expires_at_exp_plus_leeway(monkeypatch):
+    cache = VerifiedTokenCache(max_bytes=1024 * 1024, leeway_seconds=30)
+    claims = _claims(exp_offset=10)
+    cache.put("token", claims)
+
+    now = time.time()
+    monkeypatch.setattr(token_cache_module.time, "time", lambda: now + 35)
+    assert cache.get("token") == claims
+
+    monkeypatch.setattr(token_cache_module.time, "time", lambda: now + 45)
+    assert cache.get("token") is None
+    assert len(cache) == 0
+
+
+def test_cache_skips_claims_without_exp():
+    cache = VerifiedTokenCache(max_bytes=1024 * 1024, leeway_seconds=0)
+    cache.put("token", {"sub": "1"})
+    assert len(cache) == 0
+
+
+def test_cache_evicts_least_recently_used_within_memory_cap():
+    probe = VerifiedTokenCache(max_bytes=1024 * 1024, leeway_seconds=0)
+    probe.put("probe", _claims())
+    entry_size = probe.size_bytes
+
+    cache = VerifiedTokenCache(max_bytes=entry_size * 2, leeway_seconds=0)
+    cache.put("token-1", _claims())
+    cache.put("token-2", _claims())
+    assert cache.get("token-1") is not None
+    cache.put("token-3", _claims())
+
+    assert len(cache) == 2
+    assert cache.size_bytes <= entry_size * 2
+    assert cache.get("token-2") is None
+    assert cache.get("token-1") is not None
+    assert cache.get("token-3") is not None
+
+
+def test_cache_disabled_with_zero_budget():
+    cache = VerifiedTokenCache(max_bytes=0, leeway_seconds=0)
+    cache.put("token", _claims())
+    assert cache.get("token") is None
+
+
+def test_get_current_user_decodes_each_token_once(monkeypatch):
+    user = User(
+        id=987,
+        email="cache@example.com",
+        hashed_password=get_password_hash("x"),
+        is_active=True,
+        is_admin=False,
+    )
+    token = create_access_token(subject="987")
+    decode_calls = []
+    real_decode = deps.access_token_codec.decode
+
+    def _counting_decode(*args, **kwargs):
+        decode_calls.append(args[0])
+        return real_decode(*args, **kwargs)
+
+    async def _fake_get_user_by_id(db, user_id):
+        return user
+
+    monkeypatch.setattr(deps.access_token_codec, "decode", _counting_decode)
+    monkeypatch.setattr(deps, "get_user_by_id", _fake_get_user_by_id)
+    monkeypatch.setattr(deps, "principal_cache", PrincipalCache(None, ttl_seconds=0))
+    hits_before = JWT_DECODE_CACHE_HITS._value.get()
+    misses_before = JWT_DECODE_CACHE_MISSES._value.get()
+
+    for _ in range(3):
+        returned = _run(deps.get_current_user(db=AsyncSession(), token=token))
+        assert returned.id == 987
+
+    assert decode_calls == [token]
+    assert JWT_DECODE_CACHE_HITS._value.get() - hits_before == 2
+    assert JWT_DECODE_CACHE_MISSES._value.get() - misses_before == 1
@@ -4,19 +4,26 @@ import asyncio
 import uuid
 
 import pytest
-from fastapi import HTTPException, status
+from fastapi import HTTPException, Request, Response, status
+from sqlalchemy import select, text
 
 from app.api.v1.endpoints import users as users_endpoint
-from app.core.security import verify_password
+from app.core.security import get_password_hash, verify_password
+from app.db.models import User
 from app.db.session import SessionLocal
+from app.schemas.auth import Principal
 from app.schemas.user import UserCreate, UserPasswordChange
-from app.services.user_service import get_user_by_id
+from app.services.user_service import email_prefix_filter, get_user_by_id
 
 
 def _run(coro):
     return asyncio.run(coro)
 
 
+def _request() -> Request:
+    return Request({"type": "http", "headers": [], "client": ("127.0.0.1", 50000)})
+
+
 def _email(prefix: str) -> str:
     return f"{prefix}-{uuid.uuid4().hex}@example.com"
 
@@ -25,6 +32,7 @@ def test_users_endpoint_functions_cover_register_list_and_password_change():
     async def _scenario() -> None:
         async with SessionLocal() as db:
             created = await users_endpoint.register_user(
+                _request(),
                 UserCreate(email=_email("users-register"), password="StrongPass123!"),
                 db,
             )
@@ -34,19 +42,22 @@ def test_users_endpoint_functions_cover_register_list_and_password_change():
             await db.commit()
             await db.refresh(created)
 
-            users = await users_endpoint.read_users(db, created)
+            principal = Principal.model_validate(created)
+            users = await users_endpoint.read_users(Response(), db, principal)
             assert any(user.id == created.id for user in users)
 
-            me = users_endpoint.read_me(created)
+            me = users_endpoint.read_me(Response(), principal)
+            assert isinstance(me, Principal)
             assert me.id == created.id
 
             await users_endpoint.change_password(
+                _request(),
                 UserPasswordChange(
                     current_password="StrongPass123!",
                     new_password="NewStrongPass123!",
                 ),
                 db,
-                created,
+                principal,
             )
 
             refreshed = await get_user_by_id(db, created.id)
@@ -60,11 +71,12 @@ def test_read_users_rejects_non_admin():
     async def _scenario() -> None:
         async with SessionLocal() as db:
             created = await users_endpoint.register_user(
+                _request(),
                 UserCreate(email=_email("users-non-admin"), password="StrongPass123!"),
                 db,
             )
             with pytest.raises(HTTPException) as exc:
-                await users_endpoint.read_users(db, created)
+                await users_endpoint.read_users(Response(), db, Principal.model_validate(created))
             assert exc.value.status_code == status.HTTP_403_FORBIDDEN
 
     _run(_scenario())
@@ -75,12 +87,67 @@ def test_register_user_rejects_duplicate_email():
         email = _email("users-duplicate")
         async with SessionLocal() as db:
             await users_endpoint.register_user(
-                UserCreate(email=email, password="StrongPass123!"), db
+                _request(), UserCreate(email=email, password="StrongPass123!"), db
             )
             with pytest.raises(HTTPException) as exc:
                 await users_endpoint.register_user(
-                    UserCreate(email=email, password="StrongPass123!"), db
+                    _request(), UserCreate(email=email, password="StrongPass123!"), db
                 )
             assert exc.value.status_code == status.HTTP_400_BAD_REQUEST
 
     _run(_scenario())
+
+
+def test_read_users_filters_searches_and_pages_by_cursor():
+    async def _scenario() -> None:
+        tag = uuid.uuid4().hex[:12]
+        hashed = get_password_hash("StrongPass123!")
+        async with SessionLocal() as db:
+            admin = User(email=f"Page-{tag}-admin@example.com", hashed_password=hashed)
+            admin.is_admin = True
+            users = [admin] + [
+                User(email=f"page-{tag}-{n}@example.com", hashed_password=hashed) for n in range(4)
+            ]
+            users[1].is_active = False
+            # Wildcards in the prefix match literally.
+            decoy = User(email=f"pagex{tag}-decoy@example.com", hashed_password=hashed)
+            db.add_all(users + [decoy])
+            await db.commit()
+            principal = Principal.model_validate(admin)
+            ids = sorted((user.id for user in users), reverse=True)
+
+            async def _page(**params) -> tuple[list[User], str | None]:
+                response = Response()
+                page = await users_endpoint.read_users(response, db, principal, **params)
+                return page, response.headers.get(users_endpoint.NEXT_CURSOR_HEADER)
+
+            page, cursor = await _page(limit=2, email_prefix=f"PAGE_{tag}")
+            assert page == [] and cursor is None
+            page, cursor = await _page(limit=2, email_prefix=f"PAGE-{tag}")
+            seen = [user.id for user in page]
+            while cursor is not None:
+                page, cursor = await _page(limit=2, after=cursor, email_prefix=f"page-{tag}")
+                seen += [user.id for user in page]
+            assert seen == ids
+
+            inactive, _ = await _page(is_active=False, email_prefix=f"page-{tag}")
+            assert [user.id for user in inactive] == [users[1].id]
+            admins, _ = await _page(is_admin=True, email_prefix=f"page-{tag}")
+            assert [user.id for user in admins] == [admin.id]
+
+            with pytest.raises(HTTPException) as exc:
+                await users_endpoint.read_users(Response(), db, principal, after="not-a-cursor")
+            assert exc.value.status_code == status.HTTP_400_BAD_REQUEST
+
+    _run(_scenario())
+
+
+def test_email_prefix_search_uses_lower_email_index():
+    async def _scenario() -> None:
+        async with SessionLocal() as db:
+            statement = select(User.id).where(*email_prefix_filter("abc", "sqlite"))
+            compiled = statement.compile(db.get_bind(), compile_kwargs={"literal_binds": True})
+            plan = await db.execute(text(f"EXPLAIN QUERY PLAN {compiled}"))
+            assert any("ix_users_email_lower" in row[-1] for row in plan)
+
+    _run(_scenario())